@@ -1,9 +1,13 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from fastapi import Request
 import os
 from dotenv import load_dotenv
 
+from app.lib.cache import cache
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -11,12 +15,87 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# Optional read replica. GET/HEAD requests are served from it (see get_db);
+# everything that writes stays on the primary.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+# How far the replica may trail the primary. For this long after a cache
+# invalidation, reads go to the primary (see get_db).
+REPLICA_LAG_SECONDS = float(os.getenv("DB_REPLICA_LAG_SECONDS", "5"))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def engine_options() -> dict:
+    """Pool settings from the environment.
+
+    - ``DB_POOL_SIZE`` / ``DB_MAX_OVERFLOW`` — persistent and burst connections
+      per worker (defaults 5 / 10, SQLAlchemy's own).
+    - ``DB_POOL_RECYCLE`` — seconds before a connection is replaced; set it
+      below any idle timeout between here and the database (default: never,
+      SQLAlchemy's own).
+    - ``DB_POOL_TIMEOUT`` — seconds to wait for a free connection (default 30).
+    - ``DB_POOL_PRE_PING`` — test each connection on checkout (default on).
+      That costs a round-trip per request; with a sensible recycle time and a
+      stable network it can be turned off.
+    - ``DB_PGBOUNCER`` — the app sits behind PgBouncer (transaction pooling),
+      which already pools. The app then holds no connections of its own
+      (``NullPool``) and skips pre-ping, since every checkout is a fresh
+      connection to the bouncer.
+    """
+    if _env_bool("DB_PGBOUNCER", False):
+        return {"poolclass": NullPool, "pool_pre_ping": False}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE") or "-1"),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+engine = create_engine(DATABASE_URL, **engine_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if DATABASE_READ_URL:
+    read_engine = create_engine(DATABASE_READ_URL, **engine_options())
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+
 Base = declarative_base()
 
-def get_db():
+READ_METHODS = {"GET", "HEAD"}
+
+def get_db(request: Request):
+    """Session for the request: the read replica for GET/HEAD, else the primary.
+
+    Reads can lag a write by the replica's replication delay. Nothing here
+    writes on a GET, so the split is safe; a GET that must see its own writes
+    should depend on ``get_primary_db`` instead.
+
+    Cached routes rebuild their entry from this session, and a write
+    invalidates the cache as soon as it commits: a rebuild on the replica
+    right after would store the old rows under the new generation. So for
+    ``DB_REPLICA_LAG_SECONDS`` after this worker sees an invalidation, GETs
+    read the primary. A replica lagging by more than that can still leave an
+    entry stale for up to one cache TTL.
+    """
+    session_factory = SessionLocal
+    if request.method in READ_METHODS and not cache.recently_invalidated(REPLICA_LAG_SECONDS):
+        session_factory = ReadSessionLocal
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_primary_db():
     db = SessionLocal()
     try:
         yield db
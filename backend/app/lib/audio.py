@@ -0,0 +1,183 @@
+"""Waveform peaks, duration and bitrate for audio uploads.
+
+A music tile that wants to show more than a play button needs the track's
+shape and length. Getting those in the browser means downloading and decoding
+the whole file, so they are computed once here, after the upload:
+
+    {"duration": 214.3, "bitrate": 320000, "sample_rate": 44100,
+     "channels": 2, "peaks_url": "https://.../<id>.peaks.json"}
+
+goes into the post's ``media_meta["audio"]``, and the sidecar at ``peaks_url``
+holds the waveform itself: ``PEAK_BUCKETS`` values, each the loudest sample in
+its slice of the track scaled to 0–255, normalized so the loudest slice is 255.
+That is a couple of KB of JSON however long the track is.
+
+Decoding:
+
+- WAV (PCM, 8/16/24/32-bit) is read with the standard library's ``wave`` and
+  reduced with NumPy; nothing else is needed.
+- MP3, FLAC and Ogg Vorbis need the optional ``miniaudio`` package (a wheel with
+  its decoders compiled in, no ffmpeg). Without it those formats get no peaks,
+  and :func:`can_analyze` says so up front.
+
+Decoding runs at ``DECODE_SAMPLE_RATE`` in mono: a few hundred peaks don't need
+more, and it keeps a ten-minute track to a few MB of samples.
+
+NumPy and miniaudio are imported on first use, like Pillow for images: only the
+workers that analyze an upload ever load them.
+"""
+
+import importlib.util
+import io
+import json
+import os
+import wave
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+PEAK_BUCKETS = 512
+DECODE_SAMPLE_RATE = 11025
+PEAKS_VERSION = 1
+
+WAV_EXTENSIONS = {".wav", ".wave"}
+MINIAUDIO_EXTENSIONS = {".mp3", ".flac", ".ogg", ".oga"}
+
+
+class UnsupportedAudio(ValueError):
+    """No decoder here for this format."""
+
+
+@lru_cache(maxsize=1)
+def _has_miniaudio() -> bool:
+    return importlib.util.find_spec("miniaudio") is not None
+
+
+def can_analyze(filename: str) -> bool:
+    extension = os.path.splitext(filename or "")[1].lower()
+    return extension in WAV_EXTENSIONS or (extension in MINIAUDIO_EXTENSIONS and _has_miniaudio())
+
+
+def peaks(samples: "np.ndarray", buckets: int = PEAK_BUCKETS) -> List[int]:
+    """Loudest absolute sample per bucket, scaled so the loudest bucket is 255."""
+    import numpy as np
+
+    if samples.size == 0:
+        return [0] * buckets
+    # int32: abs() of the most negative int16 sample overflows int16.
+    magnitudes = np.abs(samples.astype(np.int32, copy=False))
+    # Fewer samples than buckets (a click of a file): pad with silence.
+    if magnitudes.size < buckets:
+        magnitudes = np.pad(magnitudes, (0, buckets - magnitudes.size))
+    usable = magnitudes.size - magnitudes.size % buckets
+    loudest = magnitudes[:usable].reshape(buckets, -1).max(axis=1)
+    if usable < magnitudes.size:
+        loudest[-1] = max(loudest[-1], magnitudes[usable:].max())
+    top = float(loudest.max())
+    if top <= 0:
+        return [0] * buckets
+    return np.rint(loudest.astype(np.float64) * (255.0 / top)).astype(np.uint8).tolist()
+
+
+def _decode_wav(content: bytes):
+    import numpy as np
+
+    with wave.open(io.BytesIO(content)) as reader:
+        channels = reader.getnchannels()
+        width = reader.getsampwidth()
+        sample_rate = reader.getframerate()
+        raw = reader.readframes(reader.getnframes())
+
+    if width == 1:
+        samples = np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2")
+    elif width == 3:
+        # 24-bit little-endian: widen each sample to 32 bits, keeping the sign.
+        triplets = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = (triplets[:, 0] << 8 | triplets[:, 1] << 16 | triplets[:, 2] << 24) >> 8
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4")
+    else:
+        raise UnsupportedAudio(f"{width * 8}-bit WAV")
+
+    frames = samples.size // channels
+    # Mono by loudest channel, so a hard-panned part still shows.
+    mono = np.abs(samples[: frames * channels].reshape(frames, channels).astype(np.int32)).max(axis=1)
+    return mono, frames / sample_rate if sample_rate else 0.0, sample_rate, channels
+
+
+def _decode_miniaudio(content: bytes, extension: str):
+    import miniaudio
+    import numpy as np
+
+    get_info = {
+        ".mp3": miniaudio.mp3_get_info,
+        ".flac": miniaudio.flac_get_info,
+        ".ogg": miniaudio.vorbis_get_info,
+        ".oga": miniaudio.vorbis_get_info,
+    }[extension]
+    info = get_info(content)
+    decoded = miniaudio.decode(
+        content,
+        output_format=miniaudio.SampleFormat.SIGNED16,
+        nchannels=1,
+        sample_rate=DECODE_SAMPLE_RATE,
+    )
+    samples = np.frombuffer(decoded.samples, dtype=np.int16)
+    duration = decoded.num_frames / decoded.sample_rate if decoded.sample_rate else 0.0
+    return samples, duration, info.sample_rate, info.nchannels
+
+
+def analyze(content: bytes, filename: str) -> dict:
+    """Decode ``content`` and describe it: duration, bitrate, format and peaks.
+
+    Blocking (decoding is CPU-bound); run it off the event loop. Raises
+    :class:`UnsupportedAudio` for formats there is no decoder for.
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension in WAV_EXTENSIONS:
+        try:
+            samples, duration, sample_rate, channels = _decode_wav(content)
+        except wave.Error as exc:
+            raise UnsupportedAudio(f"Unreadable WAV: {exc}") from exc
+    elif extension in MINIAUDIO_EXTENSIONS and _has_miniaudio():
+        from miniaudio import DecodeError
+
+        try:
+            samples, duration, sample_rate, channels = _decode_miniaudio(content, extension)
+        except DecodeError as exc:
+            raise UnsupportedAudio(f"Undecodable {extension}: {exc}") from exc
+    else:
+        raise UnsupportedAudio(f"No decoder for {extension or 'extensionless'} audio")
+
+    return {
+        "duration": round(duration, 3),
+        # Average over the file, so right for VBR too; includes tags and cover
+        # art, which is what a listener actually downloads.
+        "bitrate": int(len(content) * 8 / duration) if duration else None,
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "peaks": peaks(samples),
+    }
+
+
+def sidecar(analysis: dict) -> bytes:
+    """The peaks document served next to the audio file."""
+    document = {
+        "version": PEAKS_VERSION,
+        "duration": analysis["duration"],
+        "length": len(analysis["peaks"]),
+        "peaks": analysis["peaks"],
+    }
+    return json.dumps(document, separators=(",", ":")).encode("utf-8")
+
+
+def summary(analysis: dict, peaks_url: Optional[str]) -> dict:
+    """What goes in ``media_meta["audio"]``: everything but the peaks themselves."""
+    meta = {key: value for key, value in analysis.items() if key != "peaks" and value is not None}
+    if peaks_url:
+        meta["peaks_url"] = peaks_url
+    return meta
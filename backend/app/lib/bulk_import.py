@@ -0,0 +1,418 @@
+"""Bulk import of posts and albums through Postgres ``COPY``.
+
+Restoring a backup one ``create_post`` at a time pays an auth check, a slug
+probe and a commit per row. This path instead:
+
+1. parses NDJSON (the format ``/api/export.ndjson`` writes) or CSV,
+2. validates every row with the same ``PostCreate``/``AlbumCreate`` schemas the
+   API uses,
+3. allocates slugs for the whole batch from one read of the existing slugs,
+4. ``COPY``s the rows into a temp staging table, and
+5. moves them into place with one ``INSERT ... ON CONFLICT`` per table,
+
+all inside a single transaction, so an import lands completely or not at all.
+
+Rows that carry an ``id`` (as exported rows do) update the existing post with
+that id, which makes replaying a backup idempotent. Album rows are keyed by
+``(subject_id, slug)``. Subject rows from an export are matched to this
+database's subjects by slug, and album ``subject_id``\\s are remapped to match,
+since a freshly seeded database gives its subjects new ids.
+
+When one batch holds a key twice, the later row wins and the earlier one counts
+as skipped: ``ON CONFLICT DO UPDATE`` refuses to touch a row twice in one
+statement.
+"""
+
+import csv
+import io
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.lib.html_text import text_stats
+from app.models.album import Album
+from app.models.post import Post
+from app.schemas.album import AlbumCreate
+from app.schemas.post import PostCreate
+from app.routes.posts import apply_default_splash, slugify
+
+logger = logging.getLogger(__name__)
+
+# Columns written for each table, in COPY order.
+POST_COLUMNS = [
+    "id", "slug", "post_type", "category", "album", "title", "description",
+    "content_url", "thumbnail_url", "splash_image_url", "date", "tags", "price",
+    "gallery_urls", "is_major", "is_active", "is_favorite", "cross_post_albums",
+    "source", "source_id", "created_at", "updated_at", "media_meta",
+    "excerpt", "word_count", "reading_minutes",
+]
+ALBUM_COLUMNS = [
+    "subject_id", "name", "slug", "description", "cover_image", "order",
+    "is_active", "created_at", "updated_at",
+]
+ARRAY_COLUMNS = {"tags", "gallery_urls", "cross_post_albums"}
+JSON_COLUMNS = {"media_meta"}
+KEEP_EMPTY_COLUMNS = {"content_url", "thumbnail_url"}
+# Post columns PostCreate doesn't carry, kept from the record: provenance,
+# identity, and a note's stored text stats (see app/lib/html_text.py).
+CARRIED_POST_COLUMNS = (
+    "source", "source_id", "created_at", "updated_at",
+    "excerpt", "word_count", "reading_minutes",
+)
+
+# Cap on how many row errors are reported back; the count is always exact.
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFailed(Exception):
+    """Raised when a strict import finds invalid rows. Nothing is written."""
+
+    def __init__(self, result: "ImportResult"):
+        super().__init__(f"{result.error_count} invalid row(s)")
+        self.result = result
+
+
+@dataclass
+class ImportResult:
+    subjects: int = 0
+    albums: int = 0
+    posts: int = 0
+    skipped: int = 0
+    error_count: int = 0
+    errors: List[dict] = field(default_factory=list)
+
+    def add_error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "subjects": self.subjects,
+            "albums": self.albums,
+            "posts": self.posts,
+            "skipped": self.skipped,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def _parse_list(value) -> list:
+    """CSV list cells are JSON arrays (``["a", "b"]``) or ``|``-separated."""
+    if value is None or isinstance(value, list):
+        return value or []
+    value = value.strip()
+    if not value:
+        return []
+    if value.startswith("["):
+        return json.loads(value)
+    return [item.strip() for item in value.split("|") if item.strip()]
+
+
+def _parse_bool(value) -> Optional[bool]:
+    if value is None or isinstance(value, bool):
+        return value
+    value = value.strip().lower()
+    if not value:
+        return None
+    return value in {"1", "true", "t", "yes", "y"}
+
+
+def iter_ndjson(stream: TextIO) -> Iterator[tuple]:
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, exc
+
+
+def iter_csv(stream: TextIO, default_kind: str = "post") -> Iterator[tuple]:
+    """CSV rows as dicts.
+
+    Empty cells are treated as absent, except in the URL columns, where an empty
+    string is meaningful (an empty ``thumbnail_url`` is how a post says "no
+    image"). ``media_meta`` cells hold a JSON object.
+    """
+    reader = csv.DictReader(stream)
+    for line_no, row in enumerate(reader, start=2):
+        record = {
+            key: value for key, value in row.items()
+            if key and value is not None and (value != "" or key in KEEP_EMPTY_COLUMNS)
+        }
+        record.setdefault("kind", default_kind)
+        try:
+            for key in ARRAY_COLUMNS & record.keys():
+                record[key] = _parse_list(record[key])
+            for key in JSON_COLUMNS & record.keys():
+                record[key] = json.loads(record[key])
+        except json.JSONDecodeError as exc:
+            yield line_no, exc
+            continue
+        for key in ("is_major", "is_active", "is_favorite"):
+            if key in record:
+                record[key] = _parse_bool(record[key])
+        yield line_no, record
+
+
+def iter_records(stream: TextIO, fmt: str, default_kind: str = "post") -> Iterator[tuple]:
+    if fmt == "csv":
+        return iter_csv(stream, default_kind)
+    if fmt == "ndjson":
+        return iter_ndjson(stream)
+    raise ValueError(f"Unsupported import format '{fmt}' (expected ndjson or csv)")
+
+
+# ---------------------------------------------------------------------------
+# COPY helpers
+# ---------------------------------------------------------------------------
+
+def _pg_array(values: Iterable[str]) -> str:
+    items = []
+    for value in values:
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        items.append(f'"{escaped}"')
+    return "{" + ",".join(items) + "}"
+
+
+def _copy_value(column: str, value) -> str:
+    """One field in COPY's text format: ``\\N`` for NULL, specials escaped."""
+    if value is None:
+        return r"\N"
+    if column in ARRAY_COLUMNS:
+        value = _pg_array(value)
+    elif column in JSON_COLUMNS:
+        value = json.dumps(value)
+    elif isinstance(value, bool):
+        value = "t" if value else "f"
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    else:
+        value = str(value)
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_rows(db: Session, table: str, columns: List[str], rows: List[dict]) -> None:
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(column, row.get(column)) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({column_list}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+
+
+def _upsert_from_staging(db: Session, table: str, staging: str, columns: List[str], conflict: List[str]) -> int:
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    updates = ", ".join(
+        f'"{column}" = EXCLUDED."{column}"' for column in columns if column not in conflict
+    )
+    conflict_list = ", ".join(conflict)
+    result = db.execute(text(
+        f"INSERT INTO {table} ({column_list}) "
+        f"SELECT {column_list} FROM {staging} "
+        f"ON CONFLICT ({conflict_list}) DO UPDATE SET {updates}"
+    ))
+    return result.rowcount
+
+
+# ---------------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------------
+
+def post_row(record: dict) -> dict:
+    """The ``posts`` row for a post record. Raises ``ValidationError``/``ValueError``.
+
+    A note without stored text stats (a hand-written CSV, an export from before
+    they existed) gets them computed from its body, as ingest would.
+    """
+    row = PostCreate(**record).dict()
+    for key in CARRIED_POST_COLUMNS:
+        if record.get(key) is not None:
+            row[key] = record[key]
+    if row.get("post_type") == "note" and row.get("excerpt") is None:
+        row.update(text_stats(row["content_url"] or ""))
+    row["id"] = uuid.UUID(str(record["id"])) if record.get("id") else uuid.uuid4()
+    return row
+
+
+def _last_wins(rows: List[dict], key) -> List[dict]:
+    """``rows`` with one row per ``key(row)``: the last. ``None`` keys all stay."""
+    latest = {}
+    for row in rows:
+        row_key = key(row)
+        if row_key is None:
+            row_key = object()
+        # Re-inserted, so rows keep the order of their last occurrence.
+        latest.pop(row_key, None)
+        latest[row_key] = row
+    return list(latest.values())
+
+
+class SlugAllocator:
+    """Hands out post slugs for a whole batch from one read of the table.
+
+    Follows ``generate_unique_slug``'s scheme (``base``, ``base-1``, …, then a
+    random suffix past 50) so imported and hand-made posts look alike.
+    """
+
+    def __init__(self, db: Session):
+        self.owner = {slug: post_id for slug, post_id in db.execute(text("SELECT slug, id FROM posts WHERE slug IS NOT NULL"))}
+
+    def claim(self, wanted: Optional[str], title: str, post_id) -> str:
+        if wanted and self.owner.get(wanted, post_id) == post_id:
+            self.owner[wanted] = post_id
+            return wanted
+        base = slugify(wanted or title) or f"post-{uuid.uuid4().hex[:8]}"
+        slug = base
+        counter = 1
+        while self.owner.get(slug, post_id) != post_id:
+            slug = f"{base}-{counter}" if counter < 50 else f"{base}-{uuid.uuid4().hex[:4]}"
+            counter += 1
+        self.owner[slug] = post_id
+        return slug
+
+
+def _upsert_subject(db: Session, record: dict) -> Optional[uuid.UUID]:
+    slug = record.get("slug")
+    if not slug:
+        return None
+    row = db.execute(
+        text(
+            'INSERT INTO subjects (name, slug, description, cover_image, "order", is_active) '
+            "VALUES (:name, :slug, :description, :cover_image, COALESCE(:order, 0), COALESCE(:is_active, true)) "
+            "ON CONFLICT (slug) DO UPDATE SET name = EXCLUDED.name "
+            "RETURNING id"
+        ),
+        {
+            "name": record.get("name") or slug,
+            "slug": slug,
+            "description": record.get("description"),
+            "cover_image": record.get("cover_image"),
+            "order": record.get("order"),
+            "is_active": record.get("is_active"),
+        },
+    ).first()
+    return row[0] if row else None
+
+
+def import_records(db: Session, records: Iterable[tuple], strict: bool = False) -> ImportResult:
+    """Validate and load ``(line_no, record)`` pairs in one transaction.
+
+    With ``strict``, any invalid row aborts the whole import before anything is
+    written; otherwise invalid rows are skipped and reported.
+    """
+    result = ImportResult()
+    subjects = {}
+    albums: List[dict] = []
+    posts: List[dict] = []
+    now = datetime.utcnow()
+
+    for line_no, record in records:
+        if isinstance(record, Exception):
+            result.add_error(line_no, f"Unparseable row: {record}")
+            continue
+        kind = record.get("kind", "post")
+        try:
+            if kind == "subject":
+                # Resolved below, once the batch is known to be valid.
+                subjects[str(record.get("id"))] = record
+            elif kind == "album":
+                AlbumCreate(**record)
+                albums.append(record)
+            elif kind == "post":
+                posts.append(post_row(record))
+            else:
+                result.add_error(line_no, f"Unknown kind '{kind}'")
+        except ValidationError as exc:
+            result.add_error(line_no, "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+            ))
+        except ValueError as exc:
+            # A malformed id; everything else is caught by the schemas above.
+            result.add_error(line_no, str(exc))
+
+    if strict and result.error_count:
+        raise ImportFailed(result)
+
+    try:
+        # Exported subjects are matched by slug; albums follow their subject.
+        remap = {}
+        for exported_id, record in subjects.items():
+            local_id = _upsert_subject(db, record)
+            if local_id:
+                remap[exported_id] = local_id
+                result.subjects += 1
+
+        if albums:
+            album_rows = []
+            for record in albums:
+                row = {column: record.get(column) for column in ALBUM_COLUMNS}
+                row["subject_id"] = remap.get(str(row["subject_id"]), row["subject_id"])
+                row["order"] = row["order"] or 0
+                row["is_active"] = True if row["is_active"] is None else row["is_active"]
+                row["created_at"] = row["created_at"] or now
+                row["updated_at"] = row["updated_at"] or now
+                album_rows.append(row)
+            # A NULL slug never conflicts, so those rows are all kept.
+            deduped = _last_wins(album_rows, lambda row: (str(row["subject_id"]), row["slug"]) if row["slug"] else None)
+            result.skipped += len(album_rows) - len(deduped)
+            album_rows = deduped
+            db.execute(text(
+                "CREATE TEMP TABLE albums_import (LIKE albums INCLUDING DEFAULTS) ON COMMIT DROP"
+            ))
+            _copy_rows(db, "albums_import", ALBUM_COLUMNS, album_rows)
+            result.albums = _upsert_from_staging(
+                db, Album.__tablename__, "albums_import", ALBUM_COLUMNS, ["subject_id", "slug"]
+            )
+
+        if posts:
+            deduped = _last_wins(posts, lambda data: data["id"])
+            result.skipped += len(posts) - len(deduped)
+            posts = deduped
+            slugs = SlugAllocator(db)
+            post_rows = []
+            for data in posts:
+                data["slug"] = slugs.claim(data.get("slug"), data["title"], data["id"])
+                apply_default_splash(data)
+                data.setdefault("created_at", now)
+                data.setdefault("updated_at", now)
+                post_rows.append(data)
+            db.execute(text(
+                "CREATE TEMP TABLE posts_import (LIKE posts INCLUDING DEFAULTS) ON COMMIT DROP"
+            ))
+            _copy_rows(db, "posts_import", POST_COLUMNS, post_rows)
+            result.posts = _upsert_from_staging(
+                db, Post.__tablename__, "posts_import", POST_COLUMNS, ["id"]
+            )
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info("[Import] Imported %s", result.as_dict())
+    return result
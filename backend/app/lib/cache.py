@@ -0,0 +1,426 @@
+"""Shared response cache for the public read routes.
+
+Every worker (and every replica) used to rebuild the same feed JSON for the same
+query. This module stores the *serialized* response body — bytes, ready to send
+— in a backend all workers share, so one of them does the work and the rest
+serve the result.
+
+Backends:
+
+- :class:`RedisCache` — anything that speaks the Redis protocol. Picked when
+  ``REDIS_URL`` is set. Pass ``client=`` to use an already-built client, e.g. a
+  ``fakeredis.aioredis.FakeRedis`` in a local script.
+- :class:`MemoryCache` — a dict in this process. The default, and fine for a
+  single worker; with several, each keeps its own copy.
+
+``CACHE_BACKEND=off`` disables caching altogether. ``CACHE_TTL`` (seconds,
+default 60) bounds how long an entry lives. ``CACHE_MAX_ENTRIES`` (default
+5000) bounds the in-memory backend; Redis is bounded by its own ``maxmemory``.
+
+**Invalidation** is by namespace (``posts``, ``albums``, ``subjects``). Keys embed the
+namespace's generation number; a write bumps the generation (``INCR``) and
+publishes the new number, so every entry under the old one is unreachable at
+once, on every worker, without enumerating keys. Each worker keeps the current
+generations in memory, refreshed by the pub/sub message. Without a running
+subscriber (a script, a test client without lifespan) the generation is read
+from the backend on every lookup instead, so correctness never depends on a
+message arriving. A missed message costs at most one TTL of staleness.
+
+A worker also notes *when* it last saw a generation move
+(:meth:`ResponseCache.recently_invalidated`), so ``get_db`` can send reads,
+and the rebuilds they feed, to the primary until a read replica has caught up
+with the write; otherwise a rebuild could cache the replica's stale rows under
+the new generation for a whole TTL.
+
+**Stampede protection.** When an entry expires under load, only one caller
+rebuilds it. Inside a worker, concurrent misses for a key await the same
+in-flight build. Across workers, the builder takes a short ``SET NX`` lock and
+the others poll for its result, falling back to building it themselves if the
+lock holder takes longer than ``LOCK_WAIT_SECONDS``.
+
+Cache failures are logged and treated as misses; a dead Redis makes the site
+slower, never broken.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 5000
+# How often MemoryCache sweeps out expired entries on write.
+SWEEP_SECONDS = 30
+# How long a rebuild may hold the cross-worker lock, and how long the others
+# wait for it before building the entry themselves.
+LOCK_TTL_SECONDS = 10
+LOCK_WAIT_SECONDS = 5.0
+LOCK_POLL_SECONDS = 0.05
+
+KEY_PREFIX = "portfolio:cache"
+CHANNEL = f"{KEY_PREFIX}:invalidate"
+
+Producer = Callable[[], Union[bytes, Awaitable[bytes]]]
+
+
+class CacheBackend:
+    """Storage a :class:`ResponseCache` runs on. All methods are coroutines."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Set ``key`` only if it is absent; return whether it was set."""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def publish(self, channel: str, message: str) -> None:
+        raise NotImplementedError
+
+    async def listen(self, channel: str, callback: Callable[[str], None]) -> None:
+        """Call ``callback`` with every message on ``channel``; runs until cancelled."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """Process-local backend: an LRU of at most ``max_entries`` entries.
+
+    Expired entries are dropped when read, and swept out on write every
+    ``SWEEP_SECONDS``. Reads alone wouldn't free them: after an invalidation
+    the old generation's keys are never asked for again. Counters (the
+    generation numbers) live apart, never expire and don't count towards the
+    bound, so eviction can't reset a generation.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._subscribers: Dict[str, list] = {}
+        self._next_sweep = time.monotonic() + SWEEP_SECONDS
+
+    def _live(self, key: str) -> Optional[bytes]:
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires and expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def _sweep(self, now: float) -> None:
+        expired = [key for key, (_, expires) in self._data.items() if expires and expires < now]
+        for key in expired:
+            del self._data[key]
+        self._next_sweep = now + SWEEP_SECONDS
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key):
+        return self._live(key)
+
+    async def set(self, key, value, ttl):
+        now = time.monotonic()
+        self._data[key] = (value, now + ttl if ttl else 0)
+        self._data.move_to_end(key)
+        if now >= self._next_sweep:
+            self._sweep(now)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def add(self, key, value, ttl):
+        if self._live(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key):
+        self._data.pop(key, None)
+        self._counters.pop(key, None)
+
+    async def incr(self, key):
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def publish(self, channel, message):
+        for callback in self._subscribers.get(channel, []):
+            callback(message)
+
+    async def listen(self, channel, callback):
+        self._subscribers.setdefault(channel, []).append(callback)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self._subscribers[channel].remove(callback)
+
+
+class RedisCache(CacheBackend):
+    """Backend for Redis or anything speaking its protocol (Valkey, KeyDB, fakeredis)."""
+
+    def __init__(self, url: Optional[str] = None, client=None):
+        if client is None:
+            # Imported here so the dependency is only needed when it is used.
+            import redis.asyncio as redis
+
+            client = redis.from_url(url)
+        self.client = client
+
+    async def get(self, key):
+        return await self.client.get(key)
+
+    async def set(self, key, value, ttl):
+        await self.client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    async def add(self, key, value, ttl):
+        return bool(await self.client.set(key, value, px=max(1, int(ttl * 1000)), nx=True))
+
+    async def delete(self, key):
+        await self.client.delete(key)
+
+    async def incr(self, key):
+        return int(await self.client.incr(key))
+
+    async def publish(self, channel, message):
+        await self.client.publish(channel, message)
+
+    async def listen(self, channel, callback):
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                data = message["data"]
+                callback(data.decode() if isinstance(data, bytes) else data)
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class ResponseCache:
+    """Generation-versioned, single-flight cache of serialized responses."""
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float = DEFAULT_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._generations: Dict[str, int] = {}
+        # time.monotonic() when a generation last moved, as far as this worker knows.
+        self._invalidated_at = float("-inf")
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    # -- generations --------------------------------------------------------
+
+    def _advance(self, namespace: str, generation: int, first_seen_is_new: bool) -> int:
+        known = self._generations.get(namespace)
+        if generation > (known or 0) and (known is not None or first_seen_is_new):
+            self._invalidated_at = time.monotonic()
+        generation = max(generation, known or 0)
+        self._generations[namespace] = generation
+        return generation
+
+    def _on_invalidate(self, message: str) -> None:
+        namespace, _, generation = message.partition(":")
+        if generation.isdigit():
+            # A message always means a write, even for a namespace not looked up yet.
+            self._advance(namespace, int(generation), first_seen_is_new=True)
+
+    def recently_invalidated(self, seconds: float) -> bool:
+        """Whether this worker saw any namespace invalidated in the last ``seconds``."""
+        return time.monotonic() - self._invalidated_at < seconds
+
+    async def _generation(self, namespace: str) -> int:
+        if self._listener is not None and namespace in self._generations:
+            return self._generations[namespace]
+        raw = await self.backend.get(f"{KEY_PREFIX}:gen:{namespace}")
+        # _advance keeps the max: an invalidation message may have landed while
+        # we were reading.
+        return self._advance(namespace, int(raw or 0), first_seen_is_new=False)
+
+    async def generation(self, namespace: str) -> int:
+        """The namespace's current generation, for in-process caches to compare.
+
+        0 with caching off; the last known value if the backend is unreachable.
+        """
+        if not self.enabled:
+            return 0
+        try:
+            return await self._generation(namespace)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("[Cache] Reading the %s generation failed: %s", namespace, exc)
+            return self._generations.get(namespace, 0)
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """Drop every entry in ``namespaces``, on every worker. Call after the commit."""
+        if not self.enabled:
+            return
+        for namespace in namespaces:
+            try:
+                generation = await self.backend.incr(f"{KEY_PREFIX}:gen:{namespace}")
+                self._generations[namespace] = generation
+                self._invalidated_at = time.monotonic()
+                await self.backend.publish(CHANNEL, f"{namespace}:{generation}")
+            except Exception as exc:  # noqa: BLE001 - the write already succeeded
+                logger.warning("[Cache] Invalidating %s failed: %s", namespace, exc)
+
+    # -- lookups ------------------------------------------------------------
+
+    async def get_or_build(self, namespace: str, key: str, build: Producer, ttl: Optional[float] = None) -> Tuple[bytes, bool]:
+        """Return ``(body, hit)``, building and storing the body on a miss.
+
+        ``build`` returns the serialized body (or an awaitable of it). It runs at
+        most once per key per worker at a time, and — lock permitting — once
+        across all workers.
+        """
+        if not self.enabled:
+            return await _call(build), False
+        ttl = self.ttl if ttl is None else ttl
+
+        try:
+            full_key = f"{KEY_PREFIX}:{namespace}:{await self._generation(namespace)}:{key}"
+            cached = await self.backend.get(full_key)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("[Cache] Lookup failed, serving uncached: %s", exc)
+            return await _call(build), False
+        if cached is not None:
+            return cached, True
+
+        pending = self._inflight.get(full_key)
+        if pending is not None:
+            return await asyncio.shield(pending), False
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            body = await self._build_once(full_key, build, ttl)
+            future.set_result(body)
+            return body, False
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark it retrieved, so a failure nobody else was waiting on isn't
+            # reported a second time as "exception never retrieved".
+            future.exception()
+            raise
+        finally:
+            del self._inflight[full_key]
+
+    async def _build_once(self, full_key: str, build: Producer, ttl: float) -> bytes:
+        lock_key = f"{full_key}:lock"
+        token = uuid.uuid4().hex.encode()
+        try:
+            locked = await self.backend.add(lock_key, token, LOCK_TTL_SECONDS)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("[Cache] Lock failed, building anyway: %s", exc)
+            locked = True
+
+        if not locked:
+            # Another worker is building this entry; wait for it to land.
+            deadline = time.monotonic() + LOCK_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                await asyncio.sleep(LOCK_POLL_SECONDS)
+                try:
+                    cached = await self.backend.get(full_key)
+                except Exception:  # noqa: BLE001
+                    break
+                if cached is not None:
+                    return cached
+
+        body = await _call(build)
+        try:
+            await self.backend.set(full_key, body, ttl)
+            if locked:
+                await self.backend.delete(lock_key)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("[Cache] Storing %s failed: %s", full_key, exc)
+        return body
+
+    # -- lifecycle ----------------------------------------------------------
+
+    async def start(self) -> None:
+        """Subscribe to invalidations. Called from the app's lifespan."""
+        if not self.enabled or self._listener is not None:
+            return
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                await self.backend.listen(CHANNEL, self._on_invalidate)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                # Generations may have moved while we were deaf; re-read them.
+                self._generations.clear()
+                logger.warning("[Cache] Invalidation listener dropped, retrying: %s", exc)
+                await asyncio.sleep(1)
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self.enabled:
+            await self.backend.close()
+
+
+def cached_json(body: bytes, hit: bool, headers: Optional[Dict[str, str]] = None):
+    """Wrap a cached body in a response, with ``X-Cache: HIT|MISS`` for debugging."""
+    from fastapi import Response
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"X-Cache": "HIT" if hit else "MISS", **(headers or {})},
+    )
+
+
+async def _call(build: Producer) -> bytes:
+    result = build()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def backend_from_env() -> Optional[CacheBackend]:
+    choice = os.getenv("CACHE_BACKEND", "").strip().lower()
+    if choice in {"off", "none", "0", "false"}:
+        return None
+    redis_url = os.getenv("REDIS_URL")
+    if choice == "redis" or (not choice and redis_url):
+        return RedisCache(redis_url or "redis://localhost:6379/0")
+    return MemoryCache(max_entries=int(os.getenv("CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES))))
+
+
+cache = ResponseCache(backend_from_env(), ttl=float(os.getenv("CACHE_TTL", str(DEFAULT_TTL))))
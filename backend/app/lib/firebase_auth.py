@@ -4,14 +4,9 @@ from functools import lru_cache
 
 from fastapi import Depends, HTTPException, Header, status
 
-try:
-    import firebase_admin
-    from firebase_admin import auth, credentials
-except ImportError as exc:  # pragma: no cover - for environments without firebase_admin
-    firebase_admin = None
-    auth = None
-    credentials = None
-    raise exc
+# firebase_admin (and the Google client stack under it) is imported on first
+# use, not at module import: every router depends on this module, and public
+# read-only workers should not pay for the SDK until an admin request arrives.
 
 
 class FirebaseNotConfigured(Exception):
@@ -20,8 +15,11 @@ class FirebaseNotConfigured(Exception):
 
 @lru_cache(maxsize=1)
 def initialize_firebase_app():
-    if not firebase_admin:
-        raise FirebaseNotConfigured('firebase_admin library is not installed')
+    try:
+        import firebase_admin
+        from firebase_admin import credentials
+    except ImportError as exc:  # pragma: no cover - for environments without firebase_admin
+        raise FirebaseNotConfigured('firebase_admin library is not installed') from exc
 
     if firebase_admin._apps:  # type: ignore[attr-defined]
         return firebase_admin.get_app()  # type: ignore[attr-defined]
@@ -58,6 +56,8 @@ async def verify_firebase_token(authorization: str = Header(..., alias='Authoriz
     if not id_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Missing Firebase ID token')
 
+    from firebase_admin import auth
+
     try:
         decoded_token = auth.verify_id_token(id_token)  # type: ignore[call-arg]
     except Exception as exc:  # noqa: BLE001
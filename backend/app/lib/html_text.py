@@ -0,0 +1,114 @@
+"""Plain text, excerpts and reading time for note bodies.
+
+A port of ``frontend/src/lib/html-text.ts`` (itself ported from w_notes), run
+once when a note is embedded or ingested instead of on every render. The feed
+card shows the stored ``posts.excerpt``, so the feed no longer needs the note's
+whole HTML body to draw it. Keep the rules here and in the TypeScript in step:
+a note's preview should read the same wherever it was computed.
+
+Pure string work, like the original: note bodies are already sanitized to a
+small tag subset (see ``notes_ingest.ALLOWED_TAGS``) by the time they get here.
+"""
+
+import math
+import re
+from typing import Tuple
+
+# Average adult silent-reading speed; what "3 min read" is based on.
+WORDS_PER_MINUTE = 200
+
+PREVIEW_MAX_LINES = 8
+PREVIEW_MAX_LENGTH = 320
+
+_CHECKBOX_LIST = re.compile(r"<ul\b[^>]*\bdata-type=[\"']?checkbox[\"']?[^>]*>([\s\S]*?)</ul>", re.I)
+_CHECKED_ITEM = re.compile(r"<li\b[^>]*\bchecked\b[^>]*>", re.I)
+_ITEM = re.compile(r"<li\b[^>]*>", re.I)
+_BLOCK_END = re.compile(r"</(p|div|h[1-6]|blockquote|pre|li|ul|ol)>", re.I)
+_BREAK = re.compile(r"<br\s*/?>", re.I)
+_TAG = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"[ \t]+")
+
+# Line markers html_to_plain_text adds; not words.
+_MARKERS = {"•", "☑", "☐"}
+
+
+def _checkbox_items(match: "re.Match[str]") -> str:
+    inner = _CHECKED_ITEM.sub("\n☑ ", match.group(1))
+    return _ITEM.sub("\n☐ ", inner)
+
+
+def html_to_plain_text(html: str) -> str:
+    """Flatten rich-text HTML to lines of text, with bullets and checkboxes."""
+    if not html:
+        return ""
+    # Checkbox lists first, while the data-type="checkbox" wrapper is intact.
+    text = _CHECKBOX_LIST.sub(_checkbox_items, html)
+    text = _ITEM.sub("\n• ", text)
+    # Closing tags break lines too, so what follows a list doesn't run into it.
+    text = _BLOCK_END.sub("\n", text)
+    text = _BREAK.sub("\n", text)
+    text = _TAG.sub("", text)
+    text = (
+        text.replace("&nbsp;", " ")
+        .replace("&lt;", "<")
+        .replace("&gt;", ">")
+        .replace("&quot;", '"')
+        .replace("&#39;", "'")
+        # &amp; last, or "&amp;lt;" would decode twice.
+        .replace("&amp;", "&")
+    )
+    text = _SPACES.sub(" ", text)
+    lines = (line.strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line).strip()
+
+
+def note_excerpt(html: str, max_length: int = 220) -> str:
+    """A single-paragraph excerpt, truncated on a word boundary."""
+    text = re.sub(r"\n+", " ", html_to_plain_text(html))
+    if len(text) <= max_length:
+        return text
+    clipped = text[:max_length]
+    last_space = clipped.rfind(" ")
+    return f"{clipped[:last_space if last_space > 0 else max_length].rstrip()}…"
+
+
+def note_preview(
+    html: str,
+    max_lines: int = PREVIEW_MAX_LINES,
+    max_length: int = PREVIEW_MAX_LENGTH,
+) -> Tuple[str, bool]:
+    """A multi-line card preview keeping the body's line structure.
+
+    Returns ``(text, truncated)``; a clipped preview ends with an ellipsis.
+    """
+    text = html_to_plain_text(html)
+    if not text:
+        return "", False
+
+    all_lines = text.split("\n")
+    out = "\n".join(all_lines[:max_lines])
+    truncated = len(all_lines) > max_lines
+
+    if len(out) > max_length:
+        clipped = out[:max_length]
+        cut = max(clipped.rfind(" "), clipped.rfind("\n"))
+        out = clipped[:cut if cut > 0 else max_length].rstrip()
+        truncated = True
+
+    return (f"{out}…" if truncated else out), truncated
+
+
+def word_count(text: str) -> int:
+    return sum(1 for word in text.split() if word not in _MARKERS)
+
+
+def reading_minutes(words: int) -> int:
+    """Whole minutes, rounded up; 0 only for an empty note."""
+    return math.ceil(words / WORDS_PER_MINUTE) if words else 0
+
+
+def text_stats(html: str) -> dict:
+    """``excerpt``, ``word_count`` and ``reading_minutes`` for a post body."""
+    excerpt, _ = note_preview(html)
+    words = word_count(html_to_plain_text(html))
+    return {"excerpt": excerpt, "word_count": words, "reading_minutes": reading_minutes(words)}
@@ -0,0 +1,132 @@
+"""Facts about an image that the feed needs before the image itself arrives.
+
+:func:`describe` returns the ``media_meta`` stored on a post (see
+``database/migration_add_post_media_meta.sql``):
+
+- ``width`` / ``height`` — so the tile has its final shape from the first paint,
+- ``color`` — the dominant colour, as ``#rrggbb``, for the empty tile,
+- ``lqip`` — a tiny WebP preview as a data URL, shown blurred while the real
+  image loads.
+
+An LQIP rather than a blurhash: the browser decodes it natively (``next/image``
+takes it as ``blurDataURL``), so the frontend needs no decoder, and at 16px it
+costs a few hundred bytes per post in the feed JSON.
+
+Callers pass an already-decoded Pillow image; both the upload path and the
+backfill have one in hand, and decoding is the expensive part.
+
+The WebP encoding shared by every upload path lives here too: :func:`fit_width`
+and :func:`encode_webp` produce the stored image and its narrower renditions,
+and :func:`encode` the on-demand ones (see ``app/lib/resize_cache.py``).
+"""
+
+import base64
+import io
+
+# Stored images are at most this wide; renditions are narrower copies for
+# srcset, so a phone doesn't download the desktop image.
+MAX_WIDTH = 1920
+RENDITION_WIDTHS = (480, 960)
+WEBP_QUALITY = 85
+
+# Longest side of the preview. Larger previews look sharper but every post in
+# the feed payload carries one.
+LQIP_SIZE = 16
+LQIP_QUALITY = 40
+# Sample size for the dominant colour; more pixels change nothing visible.
+COLOR_SAMPLE_SIZE = 64
+PALETTE_COLORS = 5
+
+
+def prepare(img):
+    """Convert modes WebP can't store (CMYK, palette) to RGB; keep alpha."""
+    if img.mode in ('CMYK', 'P'):
+        return img.convert('RGB')
+    return img
+
+
+def fit_width(img, max_width: int):
+    """``img`` scaled down to ``max_width`` (never up), keeping its aspect ratio."""
+    from PIL import Image
+
+    if img.width <= max_width:
+        return img
+    height = max(1, int(img.height * max_width / img.width))
+    return img.resize((max_width, height), Image.Resampling.LANCZOS)
+
+
+def encode_webp(img, quality: int = WEBP_QUALITY) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format='WEBP', quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+# Formats :func:`encode` writes, with their content types.
+FORMATS = {
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+}
+
+
+def encode(img, fmt: str, quality: int = WEBP_QUALITY) -> bytes:
+    """``img`` encoded as one of :data:`FORMATS`; JPEG loses alpha onto white."""
+    if fmt == 'webp':
+        return encode_webp(img, quality)
+    buffer = io.BytesIO()
+    if fmt == 'jpeg':
+        _flatten(img).save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
+    elif fmt == 'png':
+        img.save(buffer, format='PNG', optimize=True)
+    else:
+        raise ValueError(f"Unsupported image format {fmt!r}")
+    return buffer.getvalue()
+
+
+def _flatten(img):
+    """RGB copy of ``img``, with transparency composited onto white."""
+    from PIL import Image
+
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def dominant_color(img) -> str:
+    """The most common colour after quantizing to a small palette, as ``#rrggbb``.
+
+    Unlike the mean, this picks a colour that is actually in the image: a red
+    flower on a green field comes out green or red, never brown.
+    """
+    from PIL import Image
+
+    sample = _flatten(img)
+    sample.thumbnail((COLOR_SAMPLE_SIZE, COLOR_SAMPLE_SIZE), Image.Resampling.BILINEAR)
+    quantized = sample.quantize(colors=PALETTE_COLORS, method=Image.Quantize.MEDIANCUT)
+    palette = quantized.getpalette()
+    _, index = max(quantized.getcolors())
+    red, green, blue = palette[index * 3:index * 3 + 3]
+    return f"#{red:02x}{green:02x}{blue:02x}"
+
+
+def lqip_data_url(img) -> str:
+    from PIL import Image
+
+    preview = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+    preview.thumbnail((LQIP_SIZE, LQIP_SIZE), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    preview.save(buffer, format="WEBP", quality=LQIP_QUALITY)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def describe(img) -> dict:
+    """``media_meta`` for a decoded Pillow image."""
+    return {
+        "width": img.width,
+        "height": img.height,
+        "color": dominant_color(img),
+        "lqip": lqip_data_url(img),
+    }
@@ -0,0 +1,494 @@
+"""Durable background jobs, run by workers inside the API process.
+
+Request handlers used to do everything inline: Pillow encodes, S3 deletes,
+anything slow a caller never needed to wait for. A job moves that work out of
+the request and makes it survive a restart:
+
+    @jobs.handler("uploads.process", max_attempts=3)
+    def process(payload): ...
+
+    jobs.enqueue(db, "uploads.process", {"key": key})
+    db.commit()   # the job exists iff the write that needed it committed
+
+Jobs are rows in the ``jobs`` table (database/migration_add_jobs.sql). Every API
+process runs ``JOB_WORKERS`` asyncio workers (default 2, started from the app's
+lifespan). A worker claims the next due job with ``SELECT ... FOR UPDATE SKIP
+LOCKED``, so workers across processes share one queue without double-claiming
+and without blocking on each other.
+
+- **Handlers** take the job's JSON payload. Plain functions run in a worker
+  thread (they are usually blocking: S3, Pillow); ``async def`` handlers run on
+  the loop. A return value is stored as the job's ``result``.
+- **Retries.** A handler that raises is retried with exponential backoff (5s,
+  10s, 20s, … capped at 15 minutes, with jitter) until ``max_attempts``; then
+  the job is ``failed`` and the handler's ``on_give_up`` hook, if any, runs.
+- **Leases.** A job still ``running`` after ``JOB_LEASE_SECONDS`` (default 300)
+  belonged to a worker that died; it is claimed again, unless that was its last
+  attempt, in which case it is ``failed`` (a job that kills its worker, say by
+  running out of memory, would otherwise be re-run forever). Delivery is
+  at-least-once: handlers must be idempotent. A worker only records the outcome
+  of a job it still holds, so one that outlived its lease can't overwrite the
+  run that replaced it.
+- **Latency.** Workers poll every ``JOB_POLL_SECONDS`` (default 1). A job
+  enqueued in this process wakes them as soon as its transaction commits.
+- **Coalescing.** :func:`enqueue_coalesced` folds bursts of pushes for the same
+  thing (a note being autosaved) into one pending job carrying the newest
+  payload, debounced.
+
+``JOB_WORKERS=0`` runs no workers in this process; jobs then wait for a process
+that does. ``GET /api/jobs/{id}`` reports a job's progress.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import anyio
+from sqlalchemy import event, func, text
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.lib import metrics
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 5.0
+BACKOFF_MAX_SECONDS = 15 * 60
+# How long a worker gets to finish its current job on shutdown.
+SHUTDOWN_GRACE_SECONDS = 10.0
+
+JOB_RUNS = metrics.Counter(
+    "jobs_runs_total", "Background job attempts by kind and outcome (done, retry, failed).",
+    ("kind", "outcome"),
+)
+JOB_DURATION = metrics.Histogram(
+    "jobs_run_duration_seconds", "Time spent running one attempt of a background job.",
+    ("kind",), buckets=metrics.DEFAULT_BUCKETS + (30.0, 60.0, 300.0),
+)
+
+
+@dataclass
+class JobHandler:
+    kind: str
+    func: Callable[[dict], Any]
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    on_give_up: Optional[Callable[[dict, str], None]] = None
+
+
+HANDLERS: Dict[str, JobHandler] = {}
+
+
+def handler(kind: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS, on_give_up: Optional[Callable[[dict, str], None]] = None):
+    """Register ``func`` as the handler for jobs of ``kind``.
+
+    ``on_give_up(payload, error)`` runs (in a worker thread) once the last
+    attempt has failed, e.g. to leave a marker a status check can report.
+    """
+    def register(func):
+        if kind in HANDLERS:
+            raise ValueError(f"Duplicate job handler for {kind!r}")
+        HANDLERS[kind] = JobHandler(kind, func, max_attempts, on_give_up)
+        return func
+
+    return register
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[dict] = None,
+    delay: float = 0,
+    max_attempts: Optional[int] = None,
+) -> Job:
+    """Add a job to ``db``'s transaction; it runs once the caller commits.
+
+    The returned job's ``id`` is set immediately, so it can go back in the
+    response before the commit.
+    """
+    registered = HANDLERS.get(kind)
+    if registered is None:
+        raise ValueError(f"No job handler registered for {kind!r}")
+    job = Job(
+        id=uuid.uuid4(),
+        kind=kind,
+        payload=payload or {},
+        status="pending",
+        attempts=0,
+        max_attempts=max_attempts or registered.max_attempts,
+        # Database time throughout: the claim query compares against now().
+        run_at=func.now() + timedelta(seconds=delay) if delay else func.now(),
+    )
+    db.add(job)
+    if not delay:
+        _wake_after_commit(db)
+    return job
+
+
+_COALESCE = text(
+    """
+    INSERT INTO jobs (id, kind, payload, dedupe_key, status, attempts, max_attempts, run_at)
+    VALUES (CAST(:id AS UUID), :kind, CAST(:payload AS JSONB), :dedupe_key, 'pending', 0, :max_attempts,
+            now() + make_interval(secs => :delay))
+    ON CONFLICT (dedupe_key) WHERE status = 'pending' AND dedupe_key IS NOT NULL
+    DO UPDATE SET
+        -- Keep whichever payload is newer by :newest_by, whatever order they arrived in.
+        payload = CASE
+            WHEN (jobs.payload ->> :newest_by)::numeric > (EXCLUDED.payload ->> :newest_by)::numeric
+                THEN jobs.payload
+            ELSE EXCLUDED.payload
+        END,
+        -- Debounce, but never starve: a steady stream of pushes still runs
+        -- within :max_delay of the first one.
+        run_at = LEAST(EXCLUDED.run_at, jobs.created_at + make_interval(secs => :max_delay)),
+        updated_at = now()
+    RETURNING id, (xmax = 0) AS created
+    """
+)
+
+
+def enqueue_coalesced(
+    db: Session,
+    kind: str,
+    dedupe_key: str,
+    payload: dict,
+    newest_by: str,
+    delay: float,
+    max_delay: float,
+    max_attempts: Optional[int] = None,
+) -> Tuple[str, bool]:
+    """Enqueue, or fold into the pending job with the same ``dedupe_key``.
+
+    For bursts where only the latest state matters. The pending job keeps the
+    payload with the larger ``payload[newest_by]`` (numeric) and runs ``delay``
+    seconds after the last push, or ``max_delay`` after the first, whichever
+    is sooner. Returns ``(job_id, created)``; like :func:`enqueue`, it takes
+    effect when the caller commits.
+    """
+    registered = HANDLERS.get(kind)
+    if registered is None:
+        raise ValueError(f"No job handler registered for {kind!r}")
+    row = db.execute(
+        _COALESCE,
+        {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "payload": json.dumps(payload),
+            "dedupe_key": dedupe_key,
+            "max_attempts": max_attempts or registered.max_attempts,
+            "delay": delay,
+            "max_delay": max_delay,
+            "newest_by": newest_by,
+        },
+    ).one()
+    return str(row.id), row.created
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number ``attempts`` (1-based), with ±20% jitter."""
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _wake_after_commit(db: Session) -> None:
+    if not runner.running or db.info.get("jobs_wake_pending"):
+        return
+    db.info["jobs_wake_pending"] = True
+
+    def wake(session):
+        session.info.pop("jobs_wake_pending", None)
+        runner.wake()
+
+    def forget(session):
+        session.info.pop("jobs_wake_pending", None)
+
+    event.listen(db, "after_commit", wake, once=True)
+    event.listen(db, "after_rollback", forget, once=True)
+
+
+# ---------------------------------------------------------------------------
+# Claiming and finishing (blocking; run in a worker thread)
+# ---------------------------------------------------------------------------
+
+_CLAIM = text(
+    """
+    UPDATE jobs
+       SET status = 'running',
+           attempts = attempts + 1,
+           locked_at = now(),
+           locked_by = :worker,
+           updated_at = now()
+     WHERE id = (
+            SELECT id
+              FROM jobs
+             WHERE (status = 'pending' AND run_at <= now())
+                OR (status = 'running' AND locked_at < now() - make_interval(secs => :lease)
+                    AND attempts < max_attempts)
+             ORDER BY run_at
+             LIMIT 1
+               FOR UPDATE SKIP LOCKED
+           )
+    RETURNING id, kind, payload, attempts, max_attempts, locked_by
+    """
+)
+
+# Jobs whose lease ran out on their last attempt: the worker died running it
+# (see _CLAIM, which no longer picks these up).
+_GIVE_UP_EXPIRED = text(
+    """
+    UPDATE jobs
+       SET status = 'failed',
+           last_error = concat_ws(E'\\n', 'Lease expired on the last attempt (its worker died?)', last_error),
+           locked_at = NULL,
+           locked_by = NULL,
+           finished_at = now(),
+           updated_at = now()
+     WHERE status = 'running'
+       AND locked_at < now() - make_interval(secs => :lease)
+       AND attempts >= max_attempts
+    RETURNING id, kind, payload, last_error
+    """
+)
+
+
+def claim(worker: str, lease_seconds: float) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        row = db.execute(_CLAIM, {"worker": worker, "lease": lease_seconds}).mappings().first()
+        db.commit()
+        return dict(row) if row else None
+    finally:
+        db.close()
+
+
+def give_up_expired(lease_seconds: float) -> list:
+    """Fail the jobs that died on their last attempt; returns them."""
+    db = SessionLocal()
+    try:
+        rows = db.execute(_GIVE_UP_EXPIRED, {"lease": lease_seconds}).mappings().all()
+        db.commit()
+        return [dict(row) for row in rows]
+    finally:
+        db.close()
+
+
+def _held(db: Session, job_id, worker: str):
+    """The job, if ``worker`` still holds it: not reclaimed after its lease."""
+    return db.query(Job).filter(Job.id == job_id, Job.locked_by == worker, Job.status == "running")
+
+
+def mark_done(job_id, worker: str, result: Any) -> bool:
+    """Record success; False if ``worker`` no longer holds the job."""
+    db = SessionLocal()
+    try:
+        updated = _held(db, job_id, worker).update(
+            {
+                Job.status: "done",
+                Job.result: result,
+                Job.last_error: None,
+                Job.locked_at: None,
+                Job.locked_by: None,
+                Job.finished_at: func.now(),
+                Job.updated_at: func.now(),
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        return bool(updated)
+    finally:
+        db.close()
+
+
+def mark_failed(job_id, worker: str, error: str, retry_in: Optional[float]) -> bool:
+    """Schedule a retry in ``retry_in`` seconds, or fail the job for good if ``None``.
+
+    False if ``worker`` no longer holds the job.
+    """
+    values = {
+        Job.last_error: error,
+        Job.locked_at: None,
+        Job.locked_by: None,
+        Job.updated_at: func.now(),
+    }
+    db = SessionLocal()
+    try:
+        if retry_in is not None:
+            dedupe_key = db.query(Job.dedupe_key).filter(Job.id == job_id).scalar()
+            if dedupe_key and db.query(Job.id).filter(
+                Job.dedupe_key == dedupe_key, Job.status == "pending", Job.id != job_id
+            ).first():
+                # A newer push for the same key is already waiting and carries
+                # newer state; retrying this one would only repeat it (and
+                # couldn't go back to pending next to it anyway).
+                values.update({Job.status: "done", Job.result: {"superseded": True}, Job.finished_at: func.now()})
+            else:
+                values.update({Job.status: "pending", Job.run_at: func.now() + timedelta(seconds=retry_in)})
+        else:
+            values.update({Job.status: "failed", Job.finished_at: func.now()})
+        updated = _held(db, job_id, worker).update(values, synchronize_session=False)
+        db.commit()
+        return bool(updated)
+    finally:
+        db.close()
+
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name, "").strip()
+    return float(value) if value else default
+
+
+class JobRunner:
+    """The asyncio workers of one process. Started and stopped by the lifespan."""
+
+    def __init__(self, workers: int, poll_seconds: float, lease_seconds: float):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self._tasks: list = []
+        self._stopping = False
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._name = f"{socket.gethostname()}:{os.getpid()}"
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def wake(self) -> None:
+        """Have idle workers poll now. Safe to call from any thread."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start(self) -> None:
+        if self.workers <= 0 or self._tasks:
+            return
+        self._stopping = False
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._work(f"{self._name}/{index}")) for index in range(self.workers)
+        ]
+        logger.info("[Jobs] Started %d worker(s)", self.workers)
+
+    async def stop(self) -> None:
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        # Let a job that is mid-run finish; one that doesn't in time is picked
+        # up again once its lease runs out.
+        done, pending = await asyncio.wait(self._tasks, timeout=SHUTDOWN_GRACE_SECONDS)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        self._loop = self._wakeup = None
+
+    async def _work(self, worker: str) -> None:
+        while not self._stopping:
+            try:
+                job = await anyio.to_thread.run_sync(claim, worker, self.lease_seconds)
+            except Exception as exc:  # noqa: BLE001 - e.g. the database is down, or not migrated
+                logger.warning("[Jobs] Claiming failed, backing off: %s", exc)
+                await self._idle(self.poll_seconds * 10)
+                continue
+            if job is None:
+                await self._give_up_expired()
+                await self._idle(self.poll_seconds)
+                continue
+            try:
+                await run_job(job)
+            except Exception:  # noqa: BLE001 - recording the outcome failed; the lease will expire
+                logger.exception("[Jobs] Recording the outcome of %s %s failed", job["kind"], job["id"])
+
+    async def _give_up_expired(self) -> None:
+        try:
+            expired = await anyio.to_thread.run_sync(give_up_expired, self.lease_seconds)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("[Jobs] Failing expired jobs failed: %s", exc)
+            return
+        for job in expired:
+            JOB_RUNS.inc(kind=job["kind"], outcome="failed")
+            logger.error("[Jobs] %s %s died on its last attempt; failed", job["kind"], job["id"])
+            await _on_give_up(HANDLERS.get(job["kind"]), job, job["last_error"])
+
+    async def _idle(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            return
+        if not self._stopping:
+            self._wakeup.clear()
+
+
+async def run_job(job: dict) -> None:
+    """Run one claimed job's handler and record the outcome."""
+    kind = job["kind"]
+    registered = HANDLERS.get(kind)
+    started = time.perf_counter()
+    try:
+        if registered is None:
+            raise LookupError(f"No job handler registered for {kind!r}")
+        if inspect.iscoroutinefunction(registered.func):
+            result = await registered.func(job["payload"])
+        else:
+            result = await anyio.to_thread.run_sync(registered.func, job["payload"])
+    except Exception as exc:  # noqa: BLE001 - recorded on the job
+        error = f"{type(exc).__name__}: {exc}"
+        exhausted = job["attempts"] >= job["max_attempts"] or registered is None
+        JOB_RUNS.inc(kind=kind, outcome="failed" if exhausted else "retry")
+        if exhausted:
+            logger.error("[Jobs] %s %s failed after %d attempt(s): %s", kind, job["id"], job["attempts"], error)
+        else:
+            logger.warning("[Jobs] %s %s attempt %d failed, retrying: %s", kind, job["id"], job["attempts"], error)
+        recorded = await anyio.to_thread.run_sync(
+            mark_failed, job["id"], job["locked_by"], error, None if exhausted else backoff_seconds(job["attempts"])
+        )
+        if not recorded:
+            _lost_lease(job)
+        elif exhausted:
+            await _on_give_up(registered, job, error)
+        return
+    finally:
+        JOB_DURATION.observe(time.perf_counter() - started, kind=kind)
+
+    JOB_RUNS.inc(kind=kind, outcome="done")
+    if not await anyio.to_thread.run_sync(mark_done, job["id"], job["locked_by"], result):
+        _lost_lease(job)
+
+
+def _lost_lease(job: dict) -> None:
+    logger.warning(
+        "[Jobs] %s %s outlived its lease and was claimed again; outcome of this run discarded",
+        job["kind"], job["id"],
+    )
+
+
+async def _on_give_up(registered: Optional[JobHandler], job: dict, error: str) -> None:
+    if registered is None or registered.on_give_up is None:
+        return
+    try:
+        await anyio.to_thread.run_sync(registered.on_give_up, job["payload"], error)
+    except Exception:  # noqa: BLE001
+        logger.exception("[Jobs] on_give_up for %s %s raised", job["kind"], job["id"])
+
+
+runner = JobRunner(
+    workers=int(os.getenv("JOB_WORKERS", "2")),
+    poll_seconds=_env_float("JOB_POLL_SECONDS", 1.0),
+    lease_seconds=_env_float("JOB_LEASE_SECONDS", 300.0),
+)
@@ -0,0 +1,289 @@
+"""Request, database and external-call metrics in Prometheus text format.
+
+Three layers feed one registry:
+
+- an HTTP middleware that times every request and counts responses by route
+  template and status,
+- SQLAlchemy cursor hooks that count statements and database time, both
+  globally and for the request that issued them, and
+- :func:`timed`, wrapped around calls out of the process (S3, Pillow, w_notes)
+  so their cost shows up next to the route that paid it.
+
+Per-request figures live on a :class:`RequestStats` held in a context variable
+for the duration of the request; the middleware folds them into the route's
+histograms when the response goes out, and can echo them to the browser in a
+``Server-Timing`` header (``SERVER_TIMING=1``).
+
+The registry is per-process. With several uvicorn workers each one exposes its
+own figures, which Prometheus scrapes and sums as separate targets.
+
+Deliberately dependency-free: the metric types here are the small subset the
+app needs, and the per-request plumbing would be custom either way.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from collections import Counter as _Tally
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+INF_LABEL = 'le="+Inf"'
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+    def _samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[len(self.buckets)] += 1
+            state[-1] += value
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            for index, bound in enumerate(self.buckets):
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                yield f"{self.name}_bucket{labels} {state[index]}"
+            count = state[len(self.buckets)]
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, key, INF_LABEL)} {count}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-1]}"
+
+
+REGISTRY: list = []
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP responses by route template and status.",
+    ("method", "route", "status"),
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to response headers, by route template.",
+    ("method", "route"),
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements issued while serving one request.",
+    ("method", "route"), buckets=COUNT_BUCKETS,
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Time spent in the database while serving one request.",
+    ("method", "route"),
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Latency of individual SQL statements.",
+)
+EXTERNAL_LATENCY = Histogram(
+    "external_call_duration_seconds", "Latency of calls out of the process.",
+    ("service", "operation"),
+)
+EXTERNAL_ERRORS = Counter(
+    "external_call_errors_total", "Calls out of the process that raised.",
+    ("service", "operation"),
+)
+
+
+def render() -> str:
+    """The whole registry in Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Per-request state
+# ---------------------------------------------------------------------------
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    # Statement text -> times issued.
+    statements: _Tally = field(default_factory=_Tally)
+    # "service" -> seconds, for Server-Timing.
+    external: Dict[str, float] = field(default_factory=dict)
+
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats for the request being served, or ``None`` outside a request."""
+    return _current.get()
+
+
+@contextmanager
+def track_request():
+    """Collect :class:`RequestStats` for everything run inside the block."""
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(service: str, operation: str):
+    """Time a call out of the process, e.g. ``with timed("s3", "put_object"):``."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        EXTERNAL_ERRORS.inc(service=service, operation=operation)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        EXTERNAL_LATENCY.observe(elapsed, service=service, operation=operation)
+        stats = _current.get()
+        if stats is not None:
+            stats.external[service] = stats.external.get(service, 0.0) + elapsed
+
+
+# ---------------------------------------------------------------------------
+# SQLAlchemy hooks
+# ---------------------------------------------------------------------------
+
+_hooks_installed = False
+
+
+def install_db_hooks() -> None:
+    """Count statements and database time on every engine. Idempotent."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    _hooks_installed = True
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        DB_QUERY_LATENCY.observe(elapsed)
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            stats.statements[statement] += 1
+
+
+# ---------------------------------------------------------------------------
+# HTTP middleware
+# ---------------------------------------------------------------------------
+
+def server_timing_enabled() -> bool:
+    return os.getenv("SERVER_TIMING", "").lower() in {"1", "true", "yes"}
+
+
+def server_timing_header(stats: RequestStats, total_seconds: float) -> str:
+    parts = [
+        f"app;dur={total_seconds * 1000:.1f}",
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"',
+    ]
+    for service, seconds in sorted(stats.external.items()):
+        parts.append(f"{service.replace('_', '-')};dur={seconds * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def route_label(request) -> str:
+    """The matched route template (``/api/posts/{post_id}``), never the raw path.
+
+    Raw paths would give every slug its own time series.
+    """
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+async def metrics_middleware(request, call_next):
+    start = time.perf_counter()
+    with track_request() as stats:
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        finally:
+            elapsed = time.perf_counter() - start
+            method = request.method
+            route = route_label(request)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+            HTTP_LATENCY.observe(elapsed, method=method, route=route)
+            DB_QUERIES_PER_REQUEST.observe(stats.queries, method=method, route=route)
+            DB_TIME_PER_REQUEST.observe(stats.db_seconds, method=method, route=route)
+    if server_timing_enabled():
+        response.headers["Server-Timing"] = server_timing_header(stats, elapsed)
+    return response
@@ -0,0 +1,150 @@
+"""Slow-query log and per-request N+1 detector.
+
+Off by default. ``QUERY_AUDIT`` turns it on:
+
+- ``log``   — log slow statements and repeated statements as warnings.
+- ``raise`` — as ``log``, but a request that repeats a statement too often
+  fails with :class:`QueryBudgetExceeded`. Meant for tests and CI, where a
+  query-count regression should break the build rather than scroll past.
+
+A statement is *slow* when it takes at least ``SLOW_QUERY_MS`` (default 200).
+Slow statements are logged with their bound parameters and, for reads, the
+``EXPLAIN`` plan, fetched on the same connection inside a savepoint so a failed
+``EXPLAIN`` cannot poison the request's transaction.
+
+A statement is *repeated* when the same SQL text runs more than
+``QUERY_REPEAT_LIMIT`` (default 5) times while serving one request — the
+signature of a per-row lookup inside a loop. The count comes from the
+per-request stats that :mod:`app.lib.metrics` already keeps.
+
+For tests and benchmarks that drive code outside a request, :func:`query_budget`
+applies the same checks to a block.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.lib.metrics import RequestStats, current_stats, route_label, track_request
+
+logger = logging.getLogger(__name__)
+
+MODES = {"off", "log", "raise"}
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request (or :func:`query_budget` block) issued too many queries."""
+
+
+def audit_mode() -> str:
+    mode = os.getenv("QUERY_AUDIT", "off").lower()
+    return mode if mode in MODES else "off"
+
+
+def slow_query_ms() -> float:
+    return float(os.getenv("SLOW_QUERY_MS", "200"))
+
+
+def repeat_limit() -> int:
+    return int(os.getenv("QUERY_REPEAT_LIMIT", "5"))
+
+
+def _explain(cursor, statement: str, parameters) -> Optional[str]:
+    """EXPLAIN a read on the connection that ran it, without disturbing it."""
+    if not statement.lstrip().lower().startswith(("select", "with")):
+        return None
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute("SAVEPOINT query_audit_explain")
+        try:
+            explain_cursor.execute(f"EXPLAIN {statement}", parameters)
+            plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+            explain_cursor.execute("RELEASE SAVEPOINT query_audit_explain")
+            return plan
+        except Exception as exc:  # noqa: BLE001 - diagnostics must never break the request
+            explain_cursor.execute("ROLLBACK TO SAVEPOINT query_audit_explain")
+            return f"<EXPLAIN failed: {exc}>"
+    except Exception as exc:  # noqa: BLE001
+        return f"<EXPLAIN unavailable: {exc}>"
+    finally:
+        explain_cursor.close()
+
+
+_hooks_installed = False
+
+
+def install_query_audit() -> None:
+    """Attach the slow-query hooks to every engine. Idempotent."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    _hooks_installed = True
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("audit_start", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("audit_start")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        if audit_mode() == "off" or elapsed_ms < slow_query_ms():
+            return
+        plan = None if executemany else _explain(cursor, statement, parameters)
+        logger.warning(
+            "[QueryAudit] Slow query (%.1f ms): %s\nparams=%r%s",
+            elapsed_ms,
+            statement,
+            parameters,
+            f"\nplan:\n{plan}" if plan else "",
+        )
+
+
+def repeated_statements(stats: RequestStats, limit: int) -> List[Tuple[str, int]]:
+    return [(statement, count) for statement, count in stats.statements.most_common() if count > limit]
+
+
+def check_repeats(stats: RequestStats, where: str, mode: Optional[str] = None, limit: Optional[int] = None) -> None:
+    """Warn about (or, in ``raise`` mode, fail on) statements repeated past the limit."""
+    mode = mode or audit_mode()
+    limit = repeat_limit() if limit is None else limit
+    offenders = repeated_statements(stats, limit)
+    if not offenders:
+        return
+    summary = "\n".join(f"  {count}x {statement}" for statement, count in offenders)
+    message = f"[QueryAudit] {where} repeated {len(offenders)} statement(s) more than {limit} times:\n{summary}"
+    if mode == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+@contextmanager
+def query_budget(max_repeats: Optional[int] = None, max_queries: Optional[int] = None):
+    """Fail the block if it repeats a statement, or runs queries, past a budget.
+
+        with query_budget(max_repeats=1):
+            generate_unique_slug("Untitled note", db)
+
+    Always raises on a breach, whatever ``QUERY_AUDIT`` says.
+    """
+    with track_request() as stats:
+        yield stats
+    if max_queries is not None and stats.queries > max_queries:
+        raise QueryBudgetExceeded(f"[QueryAudit] {stats.queries} queries, budget was {max_queries}")
+    check_repeats(stats, "block", mode="raise", limit=repeat_limit() if max_repeats is None else max_repeats)
+
+
+async def query_audit_middleware(request, call_next):
+    """Check the finished request's statement counts. Must run inside the metrics middleware."""
+    response = await call_next(request)
+    stats = current_stats()
+    if stats is not None and audit_mode() != "off":
+        check_repeats(stats, f"{request.method} {route_label(request)}")
+    return response
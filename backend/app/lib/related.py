@@ -0,0 +1,306 @@
+"""Related posts: a precomputed top-K neighbour table.
+
+"More like this" for a post means scoring it against every other post, which
+is far too much work for a page view. The scores are computed ahead of time
+instead and the best ``TOP_K`` kept per post in ``post_related``
+(database/migration_add_post_related.sql), so ``GET /api/posts/{id}/related``
+is one indexed read.
+
+A pair of posts scores::
+
+    W_TAGS * jaccard(tags) + W_ALBUM * (share an album) + W_CATEGORY * (same category)
+
+where sharing an album counts primary albums and cross-posts alike, and only
+within a category (album slugs repeat across categories). Only pairs with a tag
+or an album in common are candidates at all; the category term ranks among
+those, it doesn't make strangers related. The score is symmetric, which the
+incremental update relies on.
+
+Keeping it current:
+
+- **Incrementally**, for writes: create, update (tags, album, cross-posts or
+  category), embed and delete enqueue a ``related.recompute`` job with the
+  post ids involved, in the write's transaction. The job rebuilds the lists of
+  those posts, of every post whose list contained one of them, and of every
+  post one of them now beats the weakest entry of. It is set-based SQL; no
+  post is loaded into Python. Past ``REBUILD_THRESHOLD`` affected posts it
+  falls back to the full rebuild.
+- **One writer at a time.** Recomputes and rebuilds take a transaction-level
+  advisory lock first. Two jobs refilling overlapping lists would otherwise
+  both delete, then both insert the same pairs, and the second would fail on
+  the primary key.
+- **In full**, with :func:`rebuild_all` (``python rebuild_related.py``, or a
+  ``related.rebuild`` job): every pair is scored at once with NumPy, as matrix
+  products over a post x tag incidence matrix, a chunk of rows at a time.
+  NumPy is imported there only.
+"""
+
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Iterable, List, Set
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.lib import jobs
+from app.lib.cache import cache
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOP_K = int(os.getenv("RELATED_TOP_K", "12"))
+W_TAGS = 1.0
+W_ALBUM = 0.5
+W_CATEGORY = 0.1
+# An incremental update touching more posts than this rebuilds everything.
+REBUILD_THRESHOLD = int(os.getenv("RELATED_REBUILD_THRESHOLD", "2000"))
+# Rows scored per NumPy block in the full rebuild: CHUNK x posts float32s.
+CHUNK_ROWS = 1024
+INSERT_BATCH = 5000
+
+RECOMPUTE_JOB = "related.recompute"
+REBUILD_JOB = "related.rebuild"
+
+# Every candidate pair for the posts in :ids, scored. Candidates share a tag
+# (idx_posts_tags) or, within the category, an album.
+_SCORED = """
+    SELECT t.id AS post_id,
+           c.id AS related_id,
+           (
+               :w_tags * COALESCE(
+                   (SELECT count(*) FROM (SELECT unnest(t.tags) INTERSECT SELECT unnest(c.tags)) shared)::real
+                   / NULLIF((SELECT count(*) FROM (SELECT unnest(t.tags) UNION SELECT unnest(c.tags)) either), 0),
+                   0)
+               + CASE WHEN t.category = c.category
+                       AND (ARRAY[t.album::text] || t.cross_post_albums) && (ARRAY[c.album::text] || c.cross_post_albums)
+                      THEN :w_album ELSE 0 END
+               + CASE WHEN t.category = c.category THEN :w_category ELSE 0 END
+           )::real AS score
+      FROM posts t
+      JOIN posts c
+        ON c.id <> t.id
+       AND (
+            c.tags && t.tags
+            OR (c.category = t.category
+                AND (ARRAY[t.album::text] || t.cross_post_albums) && (ARRAY[c.album::text] || c.cross_post_albums))
+       )
+     WHERE t.id = ANY(CAST(:ids AS UUID[]))
+"""
+
+# Serializes writers of post_related; released when the transaction ends.
+_LOCK_LISTS = text("SELECT pg_advisory_xact_lock(hashtext('post_related'))")
+
+_DELETE_LISTS = text("DELETE FROM post_related WHERE post_id = ANY(CAST(:ids AS UUID[]))")
+
+_INSERT_LISTS = text(
+    f"""
+    INSERT INTO post_related (post_id, related_id, score, rank)
+    SELECT post_id, related_id, score, rank
+      FROM (
+        SELECT s.*, row_number() OVER (PARTITION BY s.post_id ORDER BY s.score DESC, s.related_id) AS rank
+          FROM ({_SCORED}) s
+      ) ranked
+     WHERE rank <= :k
+    """
+)
+
+# Posts whose list names one of :ids.
+_REFERRERS = text(
+    "SELECT DISTINCT post_id FROM post_related WHERE related_id = ANY(CAST(:ids AS UUID[]))"
+)
+
+# Posts one of :ids now belongs in the list of: it outscores the weakest entry
+# there, or the list isn't full. Symmetry lets the pair's score be read from
+# the :ids side.
+_CONTENDERS = text(
+    f"""
+    SELECT DISTINCT s.related_id
+      FROM ({_SCORED}) s
+      LEFT JOIN LATERAL (
+          SELECT count(*) AS entries, min(r.score) AS weakest
+            FROM post_related r
+           WHERE r.post_id = s.related_id
+      ) current ON true
+     WHERE current.entries < :k OR s.score > current.weakest
+    """
+)
+
+_WEIGHTS = {"w_tags": W_TAGS, "w_album": W_ALBUM, "w_category": W_CATEGORY}
+
+
+def _uuid_array(ids: Iterable) -> List[str]:
+    return sorted({str(post_id) for post_id in ids})
+
+
+def rebuild_lists(db: Session, post_ids: Iterable) -> None:
+    """Recompute the lists of exactly these posts (no commit)."""
+    ids = _uuid_array(post_ids)
+    if not ids:
+        return
+    db.execute(_LOCK_LISTS)
+    db.execute(_DELETE_LISTS, {"ids": ids})
+    db.execute(_INSERT_LISTS, {"ids": ids, "k": TOP_K, **_WEIGHTS})
+
+
+def affected_by(db: Session, post_ids: Iterable) -> Set[str]:
+    """The posts whose lists a change to ``post_ids`` can alter, themselves included."""
+    ids = _uuid_array(post_ids)
+    affected = set(ids)
+    affected.update(str(row[0]) for row in db.execute(_REFERRERS, {"ids": ids}))
+    affected.update(str(row[0]) for row in db.execute(_CONTENDERS, {"ids": ids, "k": TOP_K, **_WEIGHTS}))
+    return affected
+
+
+def recompute(db: Session, post_ids: Iterable) -> dict:
+    """Bring ``post_related`` up to date after ``post_ids`` changed, and commit.
+
+    Deleted posts may be among the ids: their own rows went with them (ON
+    DELETE CASCADE), but the posts that listed them still need refilling, so
+    pass a deleted post's referrers too (see :func:`referrers`).
+    """
+    # Before reading the lists: a recompute that was holding the lock has
+    # committed by the time this gets it, and its lists count.
+    db.execute(_LOCK_LISTS)
+    affected = affected_by(db, post_ids)
+    if len(affected) > REBUILD_THRESHOLD:
+        db.rollback()
+        return {"rebuilt": True, **rebuild_all(db)}
+    rebuild_lists(db, affected)
+    db.commit()
+    return {"rebuilt": False, "posts": len(affected)}
+
+
+def referrers(db: Session, post_id) -> List[str]:
+    """Posts listing ``post_id``; read these before deleting it."""
+    return [str(row[0]) for row in db.execute(_REFERRERS, {"ids": [str(post_id)]})]
+
+
+def enqueue_recompute(db: Session, post_ids: Iterable) -> None:
+    """Queue a recompute in ``db``'s transaction; it runs after the commit."""
+    ids = _uuid_array(post_ids)
+    if ids:
+        jobs.enqueue(db, RECOMPUTE_JOB, {"post_ids": ids})
+
+
+# -- full rebuild -------------------------------------------------------------
+
+
+def _incidence(rows: list, key) -> "np.ndarray":
+    """Post x value 0/1 matrix (float32) for the values ``key(row)`` returns."""
+    import numpy as np
+
+    vocabulary = {}
+    for row in rows:
+        for value in key(row):
+            vocabulary.setdefault(value, len(vocabulary))
+    matrix = np.zeros((len(rows), max(1, len(vocabulary))), dtype=np.float32)
+    for index, row in enumerate(rows):
+        columns = [vocabulary[value] for value in set(key(row))]
+        matrix[index, columns] = 1.0
+    return matrix
+
+
+def score_all(rows: list, top_k: int = TOP_K):
+    """Yield ``(post_index, related_index, score, rank)`` for every post's top K.
+
+    ``rows`` carry ``tags``, ``album``, ``cross_post_albums`` and ``category``.
+    Tag intersections are one matrix product per chunk of rows; unions follow
+    from the tag counts (|A| + |B| - |A & B|). Memory is the tag and album
+    matrices plus a few CHUNK_ROWS x posts blocks.
+    """
+    import numpy as np
+
+    count = len(rows)
+    if count < 2:
+        return
+    tags = _incidence(rows, lambda row: row.tags or [])
+    albums = _incidence(
+        rows, lambda row: [(row.category, album) for album in [row.album, *(row.cross_post_albums or [])]]
+    )
+    category_codes = {category: code for code, category in enumerate(sorted({row.category for row in rows}))}
+    categories = np.array([category_codes[row.category] for row in rows])
+    tag_totals = tags.sum(axis=1)
+    keep = min(top_k, count - 1)
+
+    for start in range(0, count, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, count)
+        shared = tags[start:stop] @ tags.T
+        union = tag_totals[start:stop, None] + tag_totals[None, :] - shared
+        jaccard = np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+        same_album = (albums[start:stop] @ albums.T) > 0
+        same_category = categories[start:stop, None] == categories[None, :]
+
+        score = W_TAGS * jaccard + W_ALBUM * same_album + W_CATEGORY * same_category
+        # Strangers and the post itself are never related.
+        score[~((shared > 0) | same_album)] = -np.inf
+        score[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+        best = np.argpartition(-score, keep - 1, axis=1)[:, :keep]
+        best_scores = np.take_along_axis(score, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+
+        for offset in range(stop - start):
+            rank = 0
+            for related, value in zip(best[offset], best_scores[offset]):
+                if not np.isfinite(value):
+                    break
+                rank += 1
+                yield start + offset, int(related), float(value), rank
+
+
+def rebuild_all(db: Session, dry_run: bool = False) -> dict:
+    """Recompute every post's list from scratch, in one transaction."""
+    started = time.monotonic()
+    rows = db.execute(
+        text("SELECT id, tags, album, cross_post_albums, category FROM posts ORDER BY id")
+    ).all()
+    pairs = [
+        {"post_id": str(rows[post].id), "related_id": str(rows[related].id), "score": score, "rank": rank}
+        for post, related, score, rank in score_all(rows)
+    ]
+    if not dry_run:
+        db.execute(_LOCK_LISTS)
+        # Readers keep seeing the old table until the commit swaps it.
+        db.execute(text("DELETE FROM post_related"))
+        insert = text(
+            "INSERT INTO post_related (post_id, related_id, score, rank) "
+            "VALUES (CAST(:post_id AS UUID), CAST(:related_id AS UUID), :score, :rank)"
+        )
+        for batch in range(0, len(pairs), INSERT_BATCH):
+            db.execute(insert, pairs[batch:batch + INSERT_BATCH])
+        db.commit()
+    elapsed = time.monotonic() - started
+    logger.info("[Related] Rebuilt %d pairs for %d posts in %.1fs", len(pairs), len(rows), elapsed)
+    return {"posts": len(rows), "pairs": len(pairs), "seconds": round(elapsed, 2)}
+
+
+# -- jobs ---------------------------------------------------------------------
+
+
+def _in_own_session(work, *args):
+    db = SessionLocal()
+    try:
+        return work(db, *args)
+    finally:
+        db.close()
+
+
+@jobs.handler(RECOMPUTE_JOB)
+async def recompute_job(payload: dict) -> dict:
+    result = await run_in_threadpool(_in_own_session, recompute, payload.get("post_ids") or [])
+    await cache.invalidate("posts")
+    return result
+
+
+@jobs.handler(REBUILD_JOB, max_attempts=1)
+async def rebuild_job(payload: dict) -> dict:
+    result = await run_in_threadpool(_in_own_session, rebuild_all)
+    await cache.invalidate("posts")
+    return result
@@ -0,0 +1,257 @@
+"""Resized images on demand, cached on local disk.
+
+Posts uploaded before renditions existed have one image, the 1920px WebP the
+old upload path stored. ``GET /api/img/{key}?w=&fmt=`` serves any stored image
+at a smaller width or another format without re-uploading anything: the
+original is fetched from S3, resized with Pillow and the result kept on disk.
+
+- **Widths** snap up to one of :data:`WIDTHS`, so arbitrary ``?w=`` values
+  can't fill the cache with near-identical copies. Images are never enlarged.
+- **Disk cache.** Renditions live under ``IMAGE_CACHE_DIR`` (default: a
+  directory in the system temp dir), one file each, named by a hash of key,
+  width, format and :data:`VERSION`. The total is kept under
+  ``IMAGE_CACHE_MAX_BYTES`` (default 512 MB) by evicting least recently used
+  files. A hit refreshes the file's mtime, so recency is shared by every worker
+  process using the directory. Eviction rescans it, so files other workers
+  wrote count too. Files are written to a temp name and renamed into place, so
+  a reader never sees half a file.
+- **Worker pool.** Fetching and encoding run on a pool of
+  ``IMAGE_RESIZE_WORKERS`` threads (default 2), off the event loop. Pillow
+  releases the GIL while it resizes and encodes, and the small pool bounds how
+  many images are in memory at once.
+- **Coalescing.** Concurrent misses for one rendition in a process await a
+  single encode.
+
+S3 keys are never reused (every upload gets a fresh UUID), so a rendition can
+be cached forever: the route sends ``Cache-Control: immutable``.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from app.lib import images, metrics, s3
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("IMAGE_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "portfolio-img-cache")
+MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+WORKERS = int(os.getenv("IMAGE_RESIZE_WORKERS", "2"))
+
+WIDTHS = (160, 320, 480, 640, 960, 1280, images.MAX_WIDTH)
+SOURCE_EXTENSIONS = (".webp", ".jpg", ".jpeg", ".png", ".gif")
+# Bump to orphan every cached rendition after changing how they're encoded.
+VERSION = 1
+# Eviction frees down to this fraction of MAX_BYTES, so it doesn't run on
+# every write once the cache is full.
+EVICT_TO = 0.9
+
+RESIZE_REQUESTS = metrics.Counter(
+    "image_resize_requests_total", "On-demand image renditions by cache result (hit, miss, coalesced).",
+    ("result",),
+)
+
+
+class ImageNotFound(LookupError):
+    """No object at that key."""
+
+
+class UnsupportedImage(ValueError):
+    """The object isn't an image Pillow can decode."""
+
+
+def snap_width(width: Optional[int]) -> int:
+    """The smallest allowed width at least ``width``; the largest if none is."""
+    if not width:
+        return WIDTHS[-1]
+    return next((allowed for allowed in WIDTHS if allowed >= width), WIDTHS[-1])
+
+
+def valid_key(key: str) -> bool:
+    """An S3 key this endpoint will read: an image, and no path games."""
+    if not key or len(key) > 512 or key.startswith("/") or "\\" in key:
+        return False
+    if any(part in ("", ".", "..") for part in key.split("/")):
+        return False
+    return key.lower().endswith(SOURCE_EXTENSIONS)
+
+
+def rendition_name(key: str, width: int, fmt: str) -> str:
+    digest = hashlib.sha256(f"{VERSION}|{key}|{width}|{fmt}".encode("utf-8")).hexdigest()
+    return f"{digest}.{fmt}"
+
+
+class DiskLRU:
+    """Size-bounded directory of files, evicting the least recently used."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._scanned = False
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        # Fanned out by the first two characters, to keep directories small.
+        return os.path.join(self.directory, name[:2], name)
+
+    def get(self, name: str) -> Optional[bytes]:
+        path = self._path(name)
+        try:
+            with open(path, "rb") as handle:
+                data = handle.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._total -= self._sizes.pop(path, 0)
+            return None
+        with self._lock:
+            if path in self._sizes:
+                self._sizes.move_to_end(path)
+        return data
+
+    def put(self, name: str, data: bytes) -> None:
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as out:
+                out.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            try:
+                os.remove(temporary)
+            except FileNotFoundError:
+                pass
+            raise
+        with self._lock:
+            if not self._scanned:
+                self._scan()
+            self._total += len(data) - self._sizes.pop(path, 0)
+            self._sizes[path] = len(data)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _scan(self) -> None:
+        """Rebuild the index from the directory, oldest first."""
+        found = []
+        for root, _dirs, files in os.walk(self.directory):
+            for filename in files:
+                if filename.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                found.append((stat.st_mtime, path, stat.st_size))
+        found.sort()
+        self._sizes = OrderedDict((path, size) for _mtime, path, size in found)
+        self._total = sum(self._sizes.values())
+        self._scanned = True
+
+    def _evict(self) -> None:
+        # Other processes share the directory: rescan so their files, and
+        # their hits, count before choosing what to drop.
+        self._scan()
+        target = self.max_bytes * EVICT_TO
+        evicted = 0
+        while self._sizes and self._total > target:
+            path, size = self._sizes.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(path)
+                evicted += 1
+            except FileNotFoundError:
+                pass
+        logger.info("[Images] Evicted %d rendition(s); cache now %d bytes", evicted, self._total)
+
+
+def render(key: str, width: int, fmt: str) -> bytes:
+    """Fetch ``key`` from S3 and encode it at most ``width`` wide. Blocking."""
+    from botocore.exceptions import ClientError
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        content = s3.get_object_bytes(key)
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            raise ImageNotFound(key) from exc
+        raise
+
+    try:
+        with Image.open(io.BytesIO(content)) as img:
+            img.load()
+            return images.encode(images.fit_width(images.prepare(img), width), fmt)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise UnsupportedImage(f"{key}: {exc}") from exc
+
+
+class Resizer:
+    """Disk-cached, coalesced renditions, encoded on a thread pool."""
+
+    def __init__(self, cache: DiskLRU, workers: int):
+        self.cache = cache
+        self.workers = workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=max(1, self.workers), thread_name_prefix="img-resize")
+        return self._pool
+
+    def _render_and_store(self, name: str, key: str, width: int, fmt: str) -> bytes:
+        data = render(key, width, fmt)
+        try:
+            self.cache.put(name, data)
+        except OSError as exc:
+            # A full or read-only disk costs the cache, not the response.
+            logger.warning("[Images] Could not cache %s: %s", name, exc)
+        return data
+
+    async def get(self, key: str, width: int, fmt: str) -> Tuple[bytes, bool]:
+        """``(body, hit)`` for the rendition of ``key`` at ``width`` in ``fmt``."""
+        name = rendition_name(key, width, fmt)
+        loop = asyncio.get_running_loop()
+
+        data = await loop.run_in_executor(None, self.cache.get, name)
+        if data is not None:
+            RESIZE_REQUESTS.inc(result="hit")
+            return data, True
+
+        pending = self._inflight.get(name)
+        if pending is not None:
+            RESIZE_REQUESTS.inc(result="coalesced")
+            return await asyncio.shield(pending), False
+
+        RESIZE_REQUESTS.inc(result="miss")
+        future = loop.create_future()
+        self._inflight[name] = future
+        try:
+            data = await loop.run_in_executor(self._executor(), self._render_and_store, name, key, width, fmt)
+            future.set_result(data)
+            return data, False
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Nobody else may be waiting; don't report it twice.
+            future.exception()
+            raise
+        finally:
+            del self._inflight[name]
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+resizer = Resizer(DiskLRU(CACHE_DIR, MAX_BYTES), WORKERS)
@@ -1,19 +1,56 @@
-import boto3
-from botocore.exceptions import ClientError
 import os
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, List, Optional
 from urllib.parse import urlparse
 import uuid
 
+from app.lib.metrics import timed
+
+# boto3/botocore are imported on first use. They are among the slowest imports
+# in the app, and only the upload and delete paths ever need them.
+
+@lru_cache(maxsize=1)
 def get_s3_client():
-    """Initialize and return S3 client"""
+    """Return the process-wide S3 client, creating it on first use.
+
+    boto3 clients are thread-safe, and building one (endpoint resolution, a fresh
+    connection pool) costs far more than the request it is built for, so one is
+    shared rather than created per call.
+    """
+    import boto3
+    from botocore.config import Config
+
     return boto3.client(
         's3',
         aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
         aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-        region_name=os.getenv('AWS_REGION', 'us-east-1')
+        region_name=os.getenv('AWS_REGION', 'us-east-1'),
+        # Point at an S3 stand-in (MinIO, moto server) for local work and tests;
+        # those usually also need S3_ADDRESSING_STYLE=path.
+        endpoint_url=os.getenv('S3_ENDPOINT_URL') or None,
+        # SigV4 everywhere: presigned URLs must use it outside us-east-1.
+        config=Config(
+            signature_version='s3v4',
+            # `or`, not a getenv default: env.example leaves it set but empty.
+            s3={'addressing_style': os.getenv('S3_ADDRESSING_STYLE') or 'auto'},
+        ),
     )
 
+
+def default_bucket() -> str:
+    return os.getenv('S3_IMAGES_BUCKET', 'portfoliowebsite-images')
+
+
+def public_url(s3_key: str, bucket_name: Optional[str] = None) -> str:
+    """Public URL of an object. ``S3_PUBLIC_URL`` overrides the AWS default
+    (e.g. a CDN in front of the bucket, or a local stand-in)."""
+    base = os.getenv('S3_PUBLIC_URL')
+    if base:
+        return f"{base.rstrip('/')}/{s3_key}"
+    bucket_name = bucket_name or default_bucket()
+    region = os.getenv('AWS_REGION', 'us-east-1')
+    return f"https://{bucket_name}.s3.{region}.amazonaws.com/{s3_key}"
+
 def upload_file_to_s3(
     file_content: bytes,
     file_name: str,
@@ -46,52 +83,191 @@ def upload_file_to_s3(
     else:
         s3_key = unique_filename
     
+    from botocore.exceptions import ClientError
+
     try:
         s3_client = get_s3_client()
         
         # Upload file (bucket is already public, so no ACL needed)
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=s3_key,
-            Body=file_content,
-            ContentType=content_type
-        )
-        
-        # Generate public URL
-        region = os.getenv('AWS_REGION', 'us-east-1')
-        public_url = f"https://{bucket_name}.s3.{region}.amazonaws.com/{s3_key}"
+        with timed("s3", "put_object"):
+            s3_client.put_object(
+                Bucket=bucket_name,
+                Key=s3_key,
+                Body=file_content,
+                ContentType=content_type
+            )
         
-        return public_url
+        return public_url(s3_key, bucket_name)
     except ClientError as e:
         raise Exception(f"Failed to upload file to S3: {str(e)}")
 
 
-def delete_file_from_s3(file_url: Optional[str], bucket_name: Optional[str] = None) -> None:
-    """Delete an object from S3 using its public URL."""
+def object_key_from_url(file_url: Optional[str], bucket_name: Optional[str] = None) -> Optional[str]:
+    """The object key behind a public URL from :func:`public_url`, or ``None``."""
     if not file_url:
-        return
+        return None
 
-    if not bucket_name:
-        bucket_name = os.getenv('S3_IMAGES_BUCKET', 'portfoliowebsite-images')
+    base = os.getenv('S3_PUBLIC_URL')
+    if base and file_url.startswith(base.rstrip('/') + '/'):
+        return file_url[len(base.rstrip('/')) + 1:] or None
 
     parsed = urlparse(file_url)
     if not parsed.netloc:
+        return None
+
+    # Virtual-hosted-style URL (regional or global endpoint): the bucket is in
+    # the host, so the path is the key.
+    return parsed.path.lstrip('/') or None
+
+
+def put_object(
+    s3_key: str,
+    body: bytes,
+    content_type: str,
+    bucket_name: Optional[str] = None,
+    metadata: Optional[Dict[str, str]] = None,
+    cache_control: Optional[str] = None,
+) -> None:
+    extra = {}
+    if metadata:
+        extra['Metadata'] = metadata
+    if cache_control:
+        extra['CacheControl'] = cache_control
+    with timed("s3", "put_object"):
+        get_s3_client().put_object(
+            Bucket=bucket_name or default_bucket(),
+            Key=s3_key,
+            Body=body,
+            ContentType=content_type,
+            **extra,
+        )
+
+
+def get_object_bytes(s3_key: str, bucket_name: Optional[str] = None) -> bytes:
+    with timed("s3", "get_object"):
+        response = get_s3_client().get_object(Bucket=bucket_name or default_bucket(), Key=s3_key)
+        return response['Body'].read()
+
+
+def head_object(s3_key: str, bucket_name: Optional[str] = None) -> Optional[dict]:
+    """The object's HEAD response, or ``None`` if it doesn't exist."""
+    from botocore.exceptions import ClientError
+
+    try:
+        with timed("s3", "head_object"):
+            return get_s3_client().head_object(Bucket=bucket_name or default_bucket(), Key=s3_key)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return None
+        raise
+
+
+def presign_put(s3_key: str, content_type: str, content_length: int, expires_in: int, bucket_name: Optional[str] = None) -> str:
+    """A URL the browser can PUT the object to directly.
+
+    Content type and length are part of the signature, so S3 rejects an upload
+    that differs from what was presigned.
+    """
+    return get_s3_client().generate_presigned_url(
+        'put_object',
+        Params={
+            'Bucket': bucket_name or default_bucket(),
+            'Key': s3_key,
+            'ContentType': content_type,
+            'ContentLength': content_length,
+        },
+        ExpiresIn=expires_in,
+    )
+
+
+def create_multipart_upload(s3_key: str, content_type: str, bucket_name: Optional[str] = None) -> str:
+    with timed("s3", "create_multipart_upload"):
+        response = get_s3_client().create_multipart_upload(
+            Bucket=bucket_name or default_bucket(), Key=s3_key, ContentType=content_type
+        )
+    return response['UploadId']
+
+
+def presign_upload_part(s3_key: str, upload_id: str, part_number: int, expires_in: int, bucket_name: Optional[str] = None) -> str:
+    return get_s3_client().generate_presigned_url(
+        'upload_part',
+        Params={
+            'Bucket': bucket_name or default_bucket(),
+            'Key': s3_key,
+            'UploadId': upload_id,
+            'PartNumber': part_number,
+        },
+        ExpiresIn=expires_in,
+    )
+
+
+def complete_multipart_upload(s3_key: str, upload_id: str, parts: List[dict], bucket_name: Optional[str] = None) -> None:
+    """``parts`` are ``{"PartNumber": n, "ETag": "..."}``, as the browser saw them."""
+    with timed("s3", "complete_multipart_upload"):
+        get_s3_client().complete_multipart_upload(
+            Bucket=bucket_name or default_bucket(),
+            Key=s3_key,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': sorted(parts, key=lambda part: part['PartNumber'])},
+        )
+
+
+def abort_multipart_upload(s3_key: str, upload_id: str, bucket_name: Optional[str] = None) -> None:
+    with timed("s3", "abort_multipart_upload"):
+        get_s3_client().abort_multipart_upload(
+            Bucket=bucket_name or default_bucket(), Key=s3_key, UploadId=upload_id
+        )
+
+
+def list_keys(prefix: str, bucket_name: Optional[str] = None) -> List[str]:
+    keys = []
+    paginator = get_s3_client().get_paginator('list_objects_v2')
+    with timed("s3", "list_objects"):
+        for page in paginator.paginate(Bucket=bucket_name or default_bucket(), Prefix=prefix):
+            keys.extend(item['Key'] for item in page.get('Contents', []))
+    return keys
+
+
+def delete_objects(s3_keys: List[str], bucket_name: Optional[str] = None) -> None:
+    """Delete objects by key, 1000 per request. Raises if any of them failed.
+
+    Unlike :func:`delete_file_from_s3` this is not best-effort: it runs in jobs,
+    which retry.
+    """
+    bucket_name = bucket_name or default_bucket()
+    for start in range(0, len(s3_keys), 1000):
+        batch = s3_keys[start:start + 1000]
+        with timed("s3", "delete_objects"):
+            response = get_s3_client().delete_objects(
+                Bucket=bucket_name,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True},
+            )
+        errors = response.get('Errors', [])
+        if errors:
+            raise Exception(
+                f"Failed to delete {len(errors)} object(s) from {bucket_name}, e.g. "
+                f"{errors[0].get('Key')}: {errors[0].get('Message')}"
+            )
+
+
+def delete_file_from_s3(file_url: Optional[str], bucket_name: Optional[str] = None) -> None:
+    """Delete an object from S3 using its public URL."""
+    if not file_url:
         return
 
-    s3_host_prefix = f"{bucket_name}.s3"
-    # Handles both regional and global S3 endpoints
-    if parsed.netloc.startswith(s3_host_prefix):
-        object_key = parsed.path.lstrip('/')
-    else:
-        # Fallback: assume virtual-hosted-style URL with bucket in host
-        object_key = parsed.path.lstrip('/')
+    if not bucket_name:
+        bucket_name = os.getenv('S3_IMAGES_BUCKET', 'portfoliowebsite-images')
 
+    object_key = object_key_from_url(file_url, bucket_name)
     if not object_key:
         return
 
+    from botocore.exceptions import ClientError
+
     try:
         s3_client = get_s3_client()
-        s3_client.delete_object(Bucket=bucket_name, Key=object_key)
+        with timed("s3", "delete_object"):
+            s3_client.delete_object(Bucket=bucket_name, Key=object_key)
     except ClientError as e:
         # Log the error but don't raise to avoid blocking DB deletion
         print(f"[S3] Failed to delete {object_key} from {bucket_name}: {str(e)}")
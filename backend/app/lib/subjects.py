@@ -0,0 +1,151 @@
+"""The site's subjects, held in memory instead of looked up per request.
+
+Subjects (``artwork``, ``photography``, ``projects``...) are the top-level
+sections albums hang off. Routes and clients name them by *category*, the value
+posts carry (``art``, ``photo``...), so every album request used to map the
+category to a subject slug and then ``SELECT id FROM subjects`` for it. The
+table has a handful of rows and changes about never, so :data:`registry` loads
+all of them once and answers from memory.
+
+Freshness:
+
+- loaded in the app's lifespan, and lazily by the first lookup if that failed;
+- reloaded after ``SUBJECTS_TTL`` seconds (default 300) regardless;
+- reloaded on every worker when the ``subjects`` cache namespace is invalidated,
+  which whatever writes subjects (the bulk import) does after committing. The
+  registry remembers the namespace generation it loaded at and compares it on
+  each lookup, so a worker that missed the pub/sub message still catches up.
+
+Post categories are not a table; they are the ``posts_category_check``
+constraint (see database/migration_restore_music_category.sql and schema.sql),
+mirrored in :data:`POST_CATEGORIES`.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.lib.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300
+NAMESPACE = "subjects"
+
+# Keep in step with posts_category_check.
+POST_CATEGORIES = frozenset({'art', 'photo', 'music', 'projects', 'bio', 'apparel'})
+
+# Where each category's posts live in the frontend (/{page}/{album}/{slug},
+# see frontend/src/lib/categories.ts): apparel is sold under /shop.
+CATEGORY_PAGES = {**{category: category for category in POST_CATEGORIES}, 'apparel': 'shop'}
+
+# Categories whose subject slug differs from the category itself.
+CATEGORY_TO_SLUG = {
+    'art': 'artwork',
+    'photo': 'photography',
+}
+
+_LOAD = text('SELECT id, slug, name, is_active FROM subjects')
+
+
+@dataclass(frozen=True)
+class Subject:
+    id: uuid.UUID
+    slug: str
+    name: str
+    is_active: bool
+
+
+def subject_slug(category: str) -> str:
+    """The subject slug for a category; slugs pass through unchanged."""
+    category = category.lower()
+    return CATEGORY_TO_SLUG.get(category, category)
+
+
+def post_category(category: str) -> str:
+    """The ``posts.category`` value for a category or subject slug."""
+    category = category.lower()
+    for known, slug in CATEGORY_TO_SLUG.items():
+        if category == slug:
+            return known
+    return category
+
+
+def is_post_category(category: str) -> bool:
+    return category in POST_CATEGORIES
+
+
+class SubjectRegistry:
+    """Subjects by slug, reloaded on a TTL or when the namespace is invalidated."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self._by_slug: Dict[str, Subject] = {}
+        self._loaded_at: Optional[float] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def load(self, db: Optional[Session] = None, generation: Optional[int] = None) -> int:
+        """(Re)read every subject; returns how many. Opens a session if not given one."""
+        own_session = db is None
+        if own_session:
+            db = SessionLocal()
+        try:
+            rows = db.execute(_LOAD).all()
+        finally:
+            if own_session:
+                db.close()
+        with self._lock:
+            # Swapped in whole, so a concurrent lookup sees the old map or the new one.
+            self._by_slug = {
+                row.slug: Subject(id=uuid.UUID(str(row.id)), slug=row.slug, name=row.name, is_active=bool(row.is_active))
+                for row in rows
+            }
+            self._loaded_at = time.monotonic()
+            if generation is not None:
+                self._generation = generation
+        logger.info("[Subjects] Loaded %d subjects", len(rows))
+        return len(rows)
+
+    async def start(self) -> None:
+        """Initial load, from the app's lifespan. A failure is logged, not raised:
+        the first lookup loads instead."""
+        try:
+            generation = await cache.generation(NAMESPACE)
+            await run_in_threadpool(self.load, None, generation)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("[Subjects] Initial load failed, loading on first use: %s", exc)
+
+    def invalidate(self) -> None:
+        """Reload on the next lookup in this worker."""
+        self._loaded_at = None
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    async def _fresh(self, db: Session) -> None:
+        generation = await cache.generation(NAMESPACE)
+        if self._stale() or generation != self._generation:
+            self.load(db, generation=generation)
+
+    async def get(self, category: str, db: Session) -> Optional[Subject]:
+        """The subject a category (or subject slug) names, or None."""
+        await self._fresh(db)
+        return self._by_slug.get(subject_slug(category))
+
+    async def changed(self) -> None:
+        """Call after committing a write to ``subjects``: every worker reloads."""
+        self.invalidate()
+        await cache.invalidate(NAMESPACE)
+
+
+registry = SubjectRegistry(ttl=float(os.getenv("SUBJECTS_TTL", str(DEFAULT_TTL))))
@@ -0,0 +1,271 @@
+"""Direct-to-S3 uploads: key layout, post-processing and status.
+
+The browser uploads straight to S3 with a presigned URL, so upload bytes never
+pass through an API worker. What the API still does, after the fact, is turn an
+uploaded *original* into what the site serves:
+
+    <folder>/originals/<id>.<ext>   the upload, exactly as the browser sent it
+    <folder>/<id>.webp              optimized (≤ MAX_WIDTH), what posts link to
+    <folder>/<id>-w480.webp, ...    narrower renditions
+    <folder>/originals/<id>.error   written instead, if processing failed
+
+Non-image uploads (audio, video, PDFs) are served as uploaded, so they skip the
+``originals/`` prefix. Audio that :mod:`app.lib.audio` can decode gets a peaks
+sidecar next to it instead:
+
+    <folder>/<id>.mp3               the upload, served as is
+    <folder>/<id>.peaks.json        waveform peaks; its metadata holds media_meta
+    <folder>/<id>.peaks.error       written instead, if analysis failed
+
+Processing runs as an ``uploads.process`` (or ``uploads.audio``) job, see
+app/lib/jobs.py, retried a few times before the upload is marked failed. Its
+outcome lives in S3 itself: the optimized object (or the sidecar) is written
+last and carries the ``media_meta`` in its object metadata, so "does it exist"
+is the status and its HEAD is the result.
+There is nothing to clean up when a browser never comes back to ask.
+
+Deleting a post queues an ``uploads.delete`` job for its files, which also
+removes the renditions and original behind an optimized image.
+"""
+
+import io
+import json
+import logging
+import os
+import re
+import uuid
+from typing import List, Optional
+
+from app.lib import audio, jobs, s3
+from app.lib.images import MAX_WIDTH, RENDITION_WIDTHS, describe, encode_webp, fit_width, prepare
+from app.lib.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Served objects are immutable (every upload gets a fresh key), so they can be
+# cached forever.
+IMMUTABLE = "public, max-age=31536000, immutable"
+META_HEADER = "media-meta"
+
+_ORIGINAL_KEY = re.compile(
+    r"^(?:(?P<folder>[A-Za-z0-9._\-/]+)/)?originals/"
+    r"(?P<id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})(?P<ext>\.[A-Za-z0-9]{1,8})$"
+)
+_OPTIMIZED_KEY = re.compile(
+    r"^(?:(?P<folder>[A-Za-z0-9._\-/]+)/)?"
+    r"(?P<id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})\.webp$"
+)
+_AUDIO_KEY = re.compile(
+    r"^(?:(?P<folder>[A-Za-z0-9._\-/]+)/)?"
+    r"(?P<id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})(?P<ext>\.[a-z0-9]{1,8})$"
+)
+
+
+def sanitize_folder(folder: Optional[str]) -> str:
+    folder = (folder or "").strip().strip("/")
+    return re.sub(r"[^A-Za-z0-9._\-/]", "-", folder)
+
+
+def new_key(filename: str, content_type: str, folder: Optional[str]) -> str:
+    """Where a fresh upload goes: under ``originals/`` for images, in place otherwise."""
+    extension = (os.path.splitext(filename or "")[1] or "").lower()
+    if not re.fullmatch(r"\.[a-z0-9]{1,8}", extension):
+        extension = ".bin"
+    prefix = sanitize_folder(folder)
+    prefix = f"{prefix}/" if prefix else ""
+    if content_type.startswith("image/"):
+        return f"{prefix}originals/{uuid.uuid4()}{extension}"
+    return f"{prefix}{uuid.uuid4()}{extension}"
+
+
+def parse_original_key(key: str) -> Optional[dict]:
+    match = _ORIGINAL_KEY.match(key or "")
+    if not match:
+        return None
+    prefix = f"{match['folder']}/" if match["folder"] else ""
+    return {
+        "optimized": f"{prefix}{match['id']}.webp",
+        "renditions": {width: f"{prefix}{match['id']}-w{width}.webp" for width in RENDITION_WIDTHS},
+        "error": f"{prefix}originals/{match['id']}.error",
+    }
+
+
+def parse_audio_key(key: str) -> Optional[dict]:
+    """Sidecar layout for an uploaded audio file, if it is one we can analyze."""
+    match = _AUDIO_KEY.match(key or "")
+    if not match or not audio.can_analyze(key):
+        return None
+    prefix = f"{match['folder']}/" if match["folder"] else ""
+    return {
+        "peaks": f"{prefix}{match['id']}.peaks.json",
+        "error": f"{prefix}{match['id']}.peaks.error",
+    }
+
+
+def process_original(original_key: str) -> dict:
+    """Optimize an uploaded original and write its renditions; return ``media_meta``.
+
+    Blocking (S3 + Pillow); runs as the ``uploads.process`` job. Safe to re-run:
+    every output is overwritten in place.
+    """
+    layout = parse_original_key(original_key)
+    if layout is None:
+        raise ValueError(f"Not an original upload key: {original_key!r}")
+
+    from PIL import Image
+
+    content = s3.get_object_bytes(original_key)
+    with timed("pillow", "optimize"):
+        img = prepare(Image.open(io.BytesIO(content)))
+        img.load()
+        optimized = fit_width(img, MAX_WIDTH)
+        renditions = {
+            width: encode_webp(fit_width(optimized, width))
+            for width in RENDITION_WIDTHS
+            if width < optimized.width
+        }
+        optimized_bytes = encode_webp(optimized)
+    with timed("pillow", "describe"):
+        meta = describe(optimized)
+    meta["renditions"] = {
+        str(width): s3.public_url(layout["renditions"][width]) for width in renditions
+    }
+
+    for width, body in renditions.items():
+        s3.put_object(layout["renditions"][width], body, "image/webp", cache_control=IMMUTABLE)
+    # Last: its existence is what marks the upload as processed.
+    s3.put_object(
+        layout["optimized"], optimized_bytes, "image/webp",
+        metadata={META_HEADER: json.dumps(meta, separators=(",", ":"))},
+        cache_control=IMMUTABLE,
+    )
+    logger.info("[Uploads] Processed %s (%d -> %d bytes)", original_key, len(content), len(optimized_bytes))
+    return meta
+
+
+def _record_failure(payload: dict, error: str) -> None:
+    """Leave an ``.error`` marker next to the original for the status check."""
+    layout = parse_original_key(payload.get("key", ""))
+    if layout is not None:
+        s3.put_object(layout["error"], error.encode("utf-8"), "text/plain")
+
+
+@jobs.handler("uploads.process", max_attempts=3, on_give_up=_record_failure)
+def process_job(payload: dict) -> dict:
+    return process_original(payload["key"])
+
+
+def write_audio_sidecar(key: str, content: bytes) -> dict:
+    """Analyze uploaded audio, store its peaks sidecar and return ``media_meta``.
+
+    Used by the ``uploads.audio`` job and, inline, by the proxied upload route.
+    """
+    layout = parse_audio_key(key)
+    if layout is None:
+        raise audio.UnsupportedAudio(f"Not an analyzable audio key: {key!r}")
+    with timed("audio", "analyze"):
+        analysis = audio.analyze(content, key)
+    meta = {"audio": audio.summary(analysis, s3.public_url(layout["peaks"]))}
+    s3.put_object(
+        layout["peaks"], audio.sidecar(analysis), "application/json",
+        metadata={META_HEADER: json.dumps(meta, separators=(",", ":"))},
+        cache_control=IMMUTABLE,
+    )
+    logger.info("[Uploads] Analyzed %s (%.1fs)", key, analysis["duration"])
+    return meta
+
+
+def _record_audio_failure(payload: dict, error: str) -> None:
+    layout = parse_audio_key(payload.get("key", ""))
+    if layout is not None:
+        s3.put_object(layout["error"], error.encode("utf-8"), "text/plain")
+
+
+@jobs.handler("uploads.audio", max_attempts=3, on_give_up=_record_audio_failure)
+def audio_job(payload: dict) -> dict:
+    key = payload["key"]
+    content = s3.get_object_bytes(key)
+    try:
+        return write_audio_sidecar(key, content)
+    except audio.UnsupportedAudio as exc:
+        # Retrying won't make the file decodable; report it and move on.
+        _record_audio_failure(payload, str(exc))
+        return {"skipped": str(exc)}
+
+
+def derived_keys(key: str) -> List[str]:
+    """Objects that exist because of ``key``: an optimized image's renditions
+    and original, or an audio file's peaks sidecar."""
+    audio_layout = parse_audio_key(key)
+    if audio_layout is not None:
+        return [audio_layout["peaks"], audio_layout["error"]]
+    match = _OPTIMIZED_KEY.match(key or "")
+    if not match:
+        return []
+    prefix = f"{match['folder']}/" if match["folder"] else ""
+    keys = [f"{prefix}{match['id']}-w{width}.webp" for width in RENDITION_WIDTHS]
+    # The original's extension is whatever the browser sent; find it by prefix.
+    keys.extend(s3.list_keys(f"{prefix}originals/{match['id']}."))
+    return keys
+
+
+@jobs.handler("uploads.delete")
+def delete_job(payload: dict) -> dict:
+    """Delete a removed post's files (``{"urls": [...]}``) and everything derived from them."""
+    keys = []
+    for url in payload.get("urls", []):
+        key = s3.object_key_from_url(url)
+        if key and key not in keys:
+            keys.append(key)
+            keys.extend(derived_keys(key))
+    s3.delete_objects(keys)
+    return {"deleted": len(keys)}
+
+
+def upload_status(key: str) -> Optional[dict]:
+    """``processing``, ``ready`` (with ``url`` and ``media_meta``) or ``failed``.
+
+    ``None`` if no such upload exists.
+    """
+    layout = parse_original_key(key)
+    if layout is None:
+        return audio_status(key)
+    head = s3.head_object(layout["optimized"])
+    if head is not None:
+        raw = head.get("Metadata", {}).get(META_HEADER)
+        return {
+            "status": "ready",
+            "url": s3.public_url(layout["optimized"]),
+            "content_type": "image/webp",
+            "size": head.get("ContentLength"),
+            "media_meta": json.loads(raw) if raw else None,
+        }
+    if s3.head_object(layout["error"]) is not None:
+        # The original is still a usable image, just not an optimized one.
+        return {"status": "failed", "url": s3.public_url(key)}
+    if s3.head_object(key) is None:
+        return None
+    return {"status": "processing"}
+
+
+def audio_status(key: str) -> Optional[dict]:
+    """Like :func:`upload_status`, for audio. The file itself is usable
+    throughout, so every state carries its ``url``."""
+    layout = parse_audio_key(key)
+    if layout is None:
+        return None
+    original = s3.head_object(key)
+    if original is None:
+        return None
+    result = {
+        "url": s3.public_url(key),
+        "content_type": original.get("ContentType"),
+        "size": original.get("ContentLength"),
+    }
+    head = s3.head_object(layout["peaks"])
+    if head is not None:
+        raw = head.get("Metadata", {}).get(META_HEADER)
+        return {"status": "ready", **result, "media_meta": json.loads(raw) if raw else None}
+    if s3.head_object(layout["error"]) is not None:
+        return {"status": "failed", **result}
+    return {"status": "processing", **result}
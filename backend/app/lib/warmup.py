@@ -0,0 +1,87 @@
+"""Optional start-up warm-up, so the first request doesn't pay for cold pools.
+
+Heavy dependencies are imported lazily, which keeps worker start-up fast but
+moves their cost onto whichever request touches them first. On autoscaled
+containers that first request is usually a real visitor. ``WARMUP_ON_STARTUP``
+lets a deployment pay those costs before the worker reports ready instead:
+
+- ``db``       — open connections to fill the pool (primary and any replica),
+- ``s3``       — build the shared S3 client and open a connection to the bucket,
+- ``firebase`` — import the SDK and initialise the app.
+
+Give a comma-separated list, or ``1`` for ``db,s3``. Unset, nothing is warmed
+and ``/ready`` reports ready immediately. Failures are logged, never raised: a
+worker that can't warm up can still serve, just more slowly at first.
+"""
+
+import logging
+import os
+import time
+from typing import Dict, Set
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+COMPONENTS = ("db", "s3", "firebase")
+
+# Set once warm-up has finished (or was never requested); read by /ready.
+state: Dict[str, object] = {"ready": False, "timings_ms": {}}
+
+
+def requested_components() -> Set[str]:
+    raw = os.getenv("WARMUP_ON_STARTUP", "").strip().lower()
+    if not raw or raw in {"0", "false", "no"}:
+        return set()
+    if raw in {"1", "true", "yes"}:
+        return {"db", "s3"}
+    return {part.strip() for part in raw.split(",") if part.strip() in COMPONENTS}
+
+
+def _warm_db() -> None:
+    from app.database import engine, read_engine
+
+    for target in {engine, read_engine}:
+        pool_size = getattr(target.pool, "size", lambda: 1)()
+        connections = [target.connect() for _ in range(max(1, pool_size))]
+        try:
+            for connection in connections:
+                connection.execute(text("SELECT 1"))
+        finally:
+            for connection in connections:
+                connection.close()
+
+
+def _warm_s3() -> None:
+    from app.lib.s3 import get_s3_client
+
+    bucket = os.getenv('S3_IMAGES_BUCKET', 'portfoliowebsite-images')
+    get_s3_client().head_bucket(Bucket=bucket)
+
+
+def _warm_firebase() -> None:
+    from app.lib.firebase_auth import initialize_firebase_app
+
+    initialize_firebase_app()
+
+
+_WARMERS = {"db": _warm_db, "s3": _warm_s3, "firebase": _warm_firebase}
+
+
+def warm_up() -> Dict[str, float]:
+    """Run the requested warmers; blocking, so call it off the event loop."""
+    timings = {}
+    for component in COMPONENTS:
+        if component not in requested_components():
+            continue
+        started = time.perf_counter()
+        try:
+            _WARMERS[component]()
+        except Exception as exc:  # noqa: BLE001 - warm-up is best-effort
+            logger.warning("[Warmup] %s failed: %s", component, exc)
+        timings[component] = round((time.perf_counter() - started) * 1000, 1)
+    state["timings_ms"] = timings
+    state["ready"] = True
+    if timings:
+        logger.info("[Warmup] done: %s", timings)
+    return timings
@@ -1,18 +1,44 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 import os
+import secrets
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from app.routes import posts, upload, albums, notes_ingest
+from app.routes import posts, upload, albums, notes_ingest, home, export, feeds, imports, img, admin, jobs as jobs_routes
+from app.lib import metrics, query_audit, warmup
+from app.lib.resize_cache import resizer
+from app.lib.jobs import runner as job_runner
+from app.lib.compression import CompressionMiddleware
+from app.lib.cache import cache
+from app.lib.subjects import registry as subjects
 
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Opt-in warm-up (WARMUP_ON_STARTUP); see app/lib/warmup.py.
+    await run_in_threadpool(warmup.warm_up)
+    # Follow cache invalidations from the other workers (see app/lib/cache.py).
+    await cache.start()
+    # Subjects by category, kept in memory (SUBJECTS_TTL; see app/lib/subjects.py).
+    await subjects.start()
+    # Background job workers (JOB_WORKERS; see app/lib/jobs.py).
+    await job_runner.start()
+    yield
+    await job_runner.stop()
+    resizer.shutdown()
+    await cache.stop()
+
+
 app = FastAPI(
     title="Portfolio API",
     description="Backend API for portfolio website",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware (allow frontend to connect)
@@ -34,11 +60,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Brotli/gzip for JSON, NDJSON and HTML responses (see app/lib/compression.py).
+# Added before the metrics middleware so its cost counts towards request latency.
+app.add_middleware(CompressionMiddleware)
+
+# Request latency, status counts and per-request DB time (see app/lib/metrics.py)
+metrics.install_db_hooks()
+# Slow-query log and N+1 detector, enabled with QUERY_AUDIT=log|raise. Registered
+# first so it runs inside the metrics middleware and can read its request stats.
+query_audit.install_query_audit()
+app.middleware("http")(query_audit.query_audit_middleware)
+app.middleware("http")(metrics.metrics_middleware)
+
 # Include routers
 app.include_router(posts.router)
 app.include_router(upload.router)
 app.include_router(albums.router)
 app.include_router(notes_ingest.router)
+app.include_router(home.router)
+app.include_router(export.router)
+app.include_router(feeds.router)
+app.include_router(imports.router)
+app.include_router(jobs_routes.router)
+app.include_router(img.router)
+app.include_router(admin.router)
 
 @app.exception_handler(RequestValidationError)
 async def _log_validation_errors(request: Request, exc: RequestValidationError):
@@ -56,3 +101,18 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until the start-up warm-up has finished."""
+    if not warmup.state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming"})
+    return {"status": "ready", "warmup_ms": warmup.state["timings_ms"]}
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(authorization: str = Header(default="")):
+    """Prometheus scrape endpoint. Set METRICS_TOKEN to require a bearer token."""
+    expected = os.getenv("METRICS_TOKEN", "")
+    if expected and not secrets.compare_digest(authorization, f"Bearer {expected}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics credentials")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Text, DateTime, Integer, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+import uuid
+from app.database import Base
+
+class Job(Base):
+    """A unit of deferred work; see app/lib/jobs.py and migration_add_jobs.sql."""
+    __tablename__ = "jobs"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict)
+    # Pending jobs sharing a key coalesce into one; see migration_add_job_dedupe_key.sql.
+    dedupe_key = Column(String(255), nullable=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime, nullable=False, default=func.now())
+    locked_at = Column(DateTime, nullable=True)
+    locked_by = Column(String(100), nullable=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSONB, nullable=True)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime, nullable=True)
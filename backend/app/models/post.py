@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Text, DateTime, func, Boolean, Numeric
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy import Column, String, Text, DateTime, func, Boolean, Numeric, Integer
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 import uuid
 from app.database import Base
 
@@ -27,5 +27,13 @@ class Post(Base):
     # posts authored here. The pair is uniquely indexed so ingest can upsert.
     source = Column(String(50), nullable=True)
     source_id = Column(String(255), nullable=True)
+    # Precomputed media facts (dimensions, dominant colour, LQIP); see
+    # database/migration_add_post_media_meta.sql. NULL until computed.
+    media_meta = Column(JSONB, nullable=True)
+    # Note bodies as plain text, computed at embed/ingest; see
+    # database/migration_add_post_excerpt.sql. NULL for posts that aren't notes.
+    excerpt = Column(Text, nullable=True)
+    word_count = Column(Integer, nullable=True)
+    reading_minutes = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
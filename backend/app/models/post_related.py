@@ -0,0 +1,15 @@
+from sqlalchemy import Column, ForeignKey, REAL, SmallInteger
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+class PostRelated(Base):
+    """One entry in a post's precomputed related-posts list.
+
+    Written by app/lib/related.py (see migration_add_post_related.sql); the
+    API only ever reads it.
+    """
+    __tablename__ = "post_related"
+    post_id = Column(UUID(as_uuid=True), ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+    related_id = Column(UUID(as_uuid=True), ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+    score = Column(REAL, nullable=False)
+    rank = Column(SmallInteger, nullable=False)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Text, Integer
+from app.database import Base
+
+class PostTagCount(Base):
+    """How many posts carry each tag, per category.
+
+    Maintained by database triggers (see migration_add_post_tag_counts.sql), so
+    the API only ever reads it.
+    """
+    __tablename__ = "post_tag_counts"
+    category = Column(String(50), primary_key=True)
+    tag = Column(Text, primary_key=True)
+    post_count = Column(Integer, nullable=False, default=0)
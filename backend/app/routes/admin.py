@@ -0,0 +1,142 @@
+"""Admin dashboard summary: ``GET /api/admin/stats``.
+
+Post counts by category, album, tag, ``is_major``, ``is_favorite`` and origin
+(mirrored note vs authored here), each with how many of those posts have no
+thumbnail. They come from one pass over ``posts`` with ``GROUPING SETS``: every
+post is joined to its tags with a lateral ``unnest`` and each grouping counts
+distinct post ids, so a post with three tags still counts once per category.
+``GROUPING()`` tells the sets apart in the result.
+
+Albums are counted by a post's primary ``album`` only; cross-posts are the
+album grid's business (``/api/albums/by-category/{category}?with_stats=true``).
+
+The result is cached for ``ADMIN_STATS_TTL`` seconds (default 30) under the
+``posts`` namespace, so a post write clears it too.
+"""
+
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.lib.cache import cache, cached_json
+from app.lib.firebase_auth import verify_firebase_token
+from app.schemas.admin import AdminStatsResponse, CategoryStats, StatsBucket
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+STATS_TTL = float(os.getenv("ADMIN_STATS_TTL", "30"))
+
+_DIMENSIONS = ("category", "album", "tag", "is_major", "is_favorite", "from_note")
+_SETS = {
+    "total": (),
+    "category": ("category",),
+    "album": ("category", "album"),
+    "tag": ("tag",),
+    "major": ("is_major",),
+    "favorite": ("is_favorite",),
+    "origin": ("from_note",),
+}
+
+
+def _grouping_bits(columns) -> int:
+    # GROUPING(a, b, ...) sets a bit for each argument the row is *not* grouped
+    # by, the first argument being the most significant.
+    last = len(_DIMENSIONS) - 1
+    return sum(1 << (last - index) for index, name in enumerate(_DIMENSIONS) if name not in columns)
+
+
+_SET_BY_BITS = {_grouping_bits(columns): name for name, columns in _SETS.items()}
+
+_STATS = text(
+    f"""
+    WITH facts AS (
+        SELECT p.id,
+               p.category,
+               p.album,
+               t.tag,
+               p.is_major,
+               COALESCE(p.is_favorite, false) AS is_favorite,
+               p.source IS NOT NULL AS from_note,
+               COALESCE(p.thumbnail_url, '') = '' AS missing_thumbnail
+          FROM posts p
+          -- Untagged posts keep one row, with a NULL tag.
+          LEFT JOIN LATERAL unnest(p.tags) AS t(tag) ON true
+    )
+    SELECT GROUPING({", ".join(_DIMENSIONS)}) AS grouping_set,
+           {", ".join(_DIMENSIONS)},
+           count(DISTINCT id) AS posts,
+           count(DISTINCT id) FILTER (WHERE missing_thumbnail) AS missing_thumbnails
+      FROM facts
+     GROUP BY GROUPING SETS ({", ".join(f"({', '.join(columns)})" for columns in _SETS.values())})
+    """
+)
+
+
+def _by_count(buckets):
+    return sorted(buckets, key=lambda bucket: (-bucket.posts, bucket.key))
+
+
+def assemble_stats(rows) -> AdminStatsResponse:
+    """Fold the grouped rows of ``_STATS`` into the response."""
+    totals = {"total_posts": 0, "missing_thumbnails": 0, "untagged": 0,
+              "major": 0, "favorite": 0, "from_notes": 0, "authored": 0}
+    categories = {}
+    albums = defaultdict(list)
+    tags = []
+
+    for row in rows:
+        grouping = _SET_BY_BITS.get(row.grouping_set)
+        counts = {"posts": int(row.posts), "missing_thumbnails": int(row.missing_thumbnails)}
+        if grouping == "total":
+            totals["total_posts"] = counts["posts"]
+            totals["missing_thumbnails"] = counts["missing_thumbnails"]
+        elif grouping == "category":
+            categories[row.category] = counts
+        elif grouping == "album":
+            albums[row.category].append(StatsBucket(key=row.album, **counts))
+        elif grouping == "tag":
+            if row.tag is None:
+                totals["untagged"] = counts["posts"]
+            else:
+                tags.append(StatsBucket(key=row.tag, **counts))
+        elif grouping == "major" and row.is_major:
+            totals["major"] = counts["posts"]
+        elif grouping == "favorite" and row.is_favorite:
+            totals["favorite"] = counts["posts"]
+        elif grouping == "origin":
+            totals["from_notes" if row.from_note else "authored"] = counts["posts"]
+
+    return AdminStatsResponse(
+        **totals,
+        categories=_by_count(
+            CategoryStats(key=category, albums=_by_count(albums[category]), **counts)
+            for category, counts in categories.items()
+        ),
+        tags=_by_count(tags),
+        generated_at=datetime.now(timezone.utc),
+    )
+
+
+@router.get("/stats", response_model=AdminStatsResponse)
+async def get_stats(db: Session = Depends(get_db), current_user=Depends(verify_firebase_token)):
+    """Post counts for the admin dashboard, from one grouped query."""
+    def build() -> bytes:
+        try:
+            rows = db.execute(_STATS).all()
+        except Exception as exc:
+            logger.exception("[Admin] Failed to compute stats")
+            raise HTTPException(status_code=500, detail="Error computing stats") from exc
+        return assemble_stats(rows).model_dump_json().encode()
+
+    body, hit = await cache.get_or_build("posts", "admin-stats", build, ttl=STATS_TTL)
+    # Served from the shared cache, but only to signed-in callers: keep it out
+    # of browser and CDN caches.
+    return cached_json(body, hit, {"Cache-Control": "private, no-store"})
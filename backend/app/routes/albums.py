@@ -1,16 +1,56 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, text
+from sqlalchemy import and_, or_, text
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from app.database import get_db
 from app.models.album import Album
 from app.models.post import Post
-from app.schemas.album import AlbumCreate, AlbumUpdate, AlbumResponse
+from app.schemas.album import AlbumCreate, AlbumUpdate, AlbumResponse, AlbumWithStatsResponse
+import logging
 import re
 from app.lib.firebase_auth import verify_firebase_token
+from app.lib.cache import cache, cached_json
+from app.lib.subjects import registry as subjects, post_category
 
 router = APIRouter(prefix="/api/albums", tags=["albums"])
+logger = logging.getLogger(__name__)
+
+_album_list = TypeAdapter(List[AlbumResponse])
+_album_stats_list = TypeAdapter(List[AlbumWithStatsResponse])
+
+# Posts filed in album ``a``, either as their album or as a cross-post. Matches
+# on the album's slug, which is what posts store (see PostModal).
+_IN_ALBUM = """
+    p.category = :post_category
+    AND (p.album = a.slug OR p.cross_post_albums @> ARRAY[a.slug::text])
+"""
+
+# Every album of a subject with its post count, newest post date and a cover,
+# in one round trip: one LATERAL aggregate and one LATERAL newest-thumbnail
+# lookup per album, both served by the indexes in
+# database/migration_add_album_stats_indexes.sql.
+_ALBUMS_WITH_STATS = text(f"""
+    SELECT a.id, a.subject_id, a.name, a.slug, a.description, a.cover_image,
+           a."order", a.is_active, a.created_at, a.updated_at,
+           stats.post_count, stats.latest_post_date,
+           COALESCE(NULLIF(a.cover_image, ''), newest.thumbnail_url) AS cover_url
+    FROM albums a
+    LEFT JOIN LATERAL (
+        SELECT count(*) AS post_count, max(p.date) AS latest_post_date
+        FROM posts p
+        WHERE {_IN_ALBUM}
+    ) stats ON true
+    LEFT JOIN LATERAL (
+        SELECT p.thumbnail_url
+        FROM posts p
+        WHERE {_IN_ALBUM} AND p.thumbnail_url LIKE 'http%'
+        ORDER BY p.date DESC
+        LIMIT 1
+    ) newest ON true
+    WHERE a.subject_id = CAST(:subject_id AS UUID)
+    ORDER BY a.name
+""")
 
 def slugify(text: str) -> str:
     """Convert text to URL-friendly slug"""
@@ -59,6 +99,7 @@ async def create_album(album: AlbumCreate, db: Session = Depends(get_db), curren
     db.add(db_album)
     db.commit()
     db.refresh(db_album)
+    await cache.invalidate("albums")
     return db_album
 
 @router.put("/{album_id}", response_model=AlbumResponse)
@@ -78,6 +119,7 @@ async def update_album(
     
     db.commit()
     db.refresh(db_album)
+    await cache.invalidate("albums")
     return db_album
 
 @router.delete("/{album_id}")
@@ -87,8 +129,10 @@ async def delete_album(album_id: str, db: Session = Depends(get_db), current_use
     if not db_album:
         raise HTTPException(status_code=404, detail="Album not found")
     
-    # Check if any posts reference this album
-    posts_count = db.query(Post).filter(Post.album == db_album.slug).count()
+    # Check if any posts reference this album, as their album or a cross-post
+    posts_count = db.query(Post).filter(
+        or_(Post.album == db_album.slug, Post.cross_post_albums.any(db_album.slug))
+    ).count()
     if posts_count > 0:
         raise HTTPException(
             status_code=400,
@@ -97,52 +141,46 @@ async def delete_album(album_id: str, db: Session = Depends(get_db), current_use
     
     db.delete(db_album)
     db.commit()
+    await cache.invalidate("albums")
     return {"message": "Album deleted successfully"}
 
-@router.get("/by-category/{category}", response_model=List[AlbumResponse])
+@router.get("/by-category/{category}", response_model=List[AlbumWithStatsResponse])
 async def get_albums_by_category(
     category: str,
+    with_stats: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Get albums by category name (e.g., 'art', 'photo', 'music')"""
-    try:
-        print(f"[Albums] Fetching albums for category: {category}")
-        
-        # Map category to subject slug
-        category_to_slug = {
-            'art': 'artwork',
-            'photo': 'photography',
-            'photography': 'photography',
-            'music': 'music',
-            'projects': 'projects',
-            'apparel': 'apparel',
-        }
-        
-        subject_slug = category_to_slug.get(category.lower(), category.lower())
-        print(f"[Albums] Mapped to subject slug: {subject_slug}")
-        
-        # Get subject_id from subjects table
-        result = db.execute(
-            text("SELECT id FROM subjects WHERE slug = :slug"),
-            {"slug": subject_slug}
-        ).first()
-        
-        if not result:
-            print(f"[Albums] No subject found for slug: {subject_slug}")
-            return []
-        
-        subject_id = result[0]
-        print(f"[Albums] Found subject_id: {subject_id}")
-        
-        # Get albums for this subject
-        albums = db.query(Album).filter(Album.subject_id == subject_id).order_by(Album.name).all()
-        print(f"[Albums] Found {len(albums)} albums")
-        return albums
-    except Exception as e:
-        print(f"[Albums] Error fetching albums: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error fetching albums: {str(e)}")
+    """Get albums by category name (e.g., 'art', 'photo', 'music')
+
+    ``with_stats=true`` adds each album's ``post_count`` (cross-posts included),
+    ``latest_post_date`` and ``cover_url`` (its cover image, else its newest
+    post's thumbnail), so the album grid needs no per-album post fetches.
+    Cached under its own key; post writes invalidate it along with the posts.
+    """
+    subject = await subjects.get(category, db)
+    if subject is None:
+        return cached_json(b"[]", False)
+
+    def build() -> bytes:
+        try:
+            if with_stats:
+                rows = db.execute(
+                    _ALBUMS_WITH_STATS,
+                    {"subject_id": str(subject.id), "post_category": post_category(category)},
+                ).mappings().all()
+                return _album_stats_list.dump_json(
+                    _album_stats_list.validate_python([dict(row) for row in rows])
+                )
+
+            albums = db.query(Album).filter(Album.subject_id == subject.id).order_by(Album.name).all()
+            return _album_list.dump_json(albums)
+        except Exception as e:
+            logger.exception("[Albums] Failed to fetch albums", extra={"category": category})
+            raise HTTPException(status_code=500, detail=f"Error fetching albums: {str(e)}")
+
+    key = f"by-category:{category.lower()}" + ("|stats" if with_stats else "")
+    body, hit = await cache.get_or_build("albums", key, build)
+    return cached_json(body, hit)
 
 class CreateAlbumByCategoryRequest(BaseModel):
     category: str
@@ -156,32 +194,14 @@ async def create_album_by_category(
     current_user=Depends(verify_firebase_token)
 ):
     """Create a new album by category name (simpler API)"""
-    # Map category to subject slug
-    category_to_slug = {
-        'art': 'artwork',
-        'photo': 'photography',
-        'photography': 'photography',
-        'music': 'music',
-        'projects': 'projects',
-        'apparel': 'apparel',
-    }
-    
-    subject_slug = category_to_slug.get(request.category.lower(), request.category.lower())
-    
-    # Get subject_id from subjects table
-    result = db.execute(
-        text("SELECT id FROM subjects WHERE slug = :slug"),
-        {"slug": subject_slug}
-    ).first()
-    
-    if not result:
+    subject = await subjects.get(request.category, db)
+    if subject is None:
         raise HTTPException(
             status_code=404,
             detail=f"Subject '{request.category}' not found"
         )
-    
-    subject_id = result[0]
-    
+    subject_id = subject.id
+
     # Generate slug from name
     album_slug = slugify(request.name)
     
@@ -207,5 +227,6 @@ async def create_album_by_category(
     db.add(db_album)
     db.commit()
     db.refresh(db_album)
+    await cache.invalidate("albums")
     return db_album
 
@@ -0,0 +1,108 @@
+"""Streaming NDJSON export of the whole catalog.
+
+One JSON object per line, each tagged with ``kind`` (``subject``, ``album`` or
+``post``) and carrying every column of its row. Subjects come first, then
+albums, then posts, so the file can be replayed top to bottom without tripping
+a foreign key.
+
+Rows are read through a server-side cursor in fixed-size batches and written to
+the response as they arrive, so memory stays flat however large the tables get —
+unlike paging through ``get_posts``, nothing is ever held in full and nothing
+re-scans an ever-growing OFFSET.
+
+``since`` limits the export to rows whose ``updated_at`` is at or after the
+given time, for incremental backups. The bound is inclusive: a row written in
+the same instant as the previous export's high-water mark is sent again rather
+than missed, and replaying it is harmless.
+"""
+
+import json
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, text
+
+from app.database import ReadSessionLocal
+from app.models.album import Album
+from app.models.post import Post
+from app.lib.firebase_auth import verify_firebase_token
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["export"])
+
+# Rows fetched per round-trip from the server-side cursor.
+BATCH_SIZE = 500
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _line(kind: str, row) -> str:
+    record = {"kind": kind}
+    record.update(row)
+    return json.dumps(record, default=_json_default, ensure_ascii=False) + "\n"
+
+
+def iter_export(since: Optional[datetime] = None) -> Iterator[str]:
+    """Yield the catalog as NDJSON lines: subjects, then albums, then posts.
+
+    Opens its own session. A streamed body outlives the request's dependencies,
+    so the ``get_db`` session would already be closed by the time the first
+    batch is read. Reads only, so it goes to the replica when there is one.
+    """
+    db = ReadSessionLocal()
+    try:
+        subjects = text(
+            "SELECT * FROM subjects"
+            + (" WHERE updated_at >= :since" if since else "")
+            + " ORDER BY updated_at, id"
+        )
+        params = {"since": since} if since else {}
+        result = db.execute(subjects, params, execution_options={"yield_per": BATCH_SIZE})
+        for row in result.mappings():
+            yield _line("subject", row)
+
+        for kind, table in (("album", Album.__table__), ("post", Post.__table__)):
+            query = select(table)
+            if since:
+                query = query.where(table.c.updated_at >= since)
+            query = query.order_by(table.c.updated_at, table.c.id)
+            result = db.execute(query.execution_options(yield_per=BATCH_SIZE))
+            for row in result.mappings():
+                yield _line(kind, row)
+    except Exception:
+        # Headers are long gone by now; all that is left is to stop the stream
+        # and leave a trace of why it ended early.
+        logger.exception("[Export] Export aborted mid-stream")
+        raise
+    finally:
+        db.close()
+
+
+@router.get("/export.ndjson")
+async def export_catalog(
+    since: Optional[datetime] = None,
+    current_user=Depends(verify_firebase_token)
+):
+    """Stream every subject, album and post as NDJSON."""
+    filename = "portfolio-export.ndjson"
+    if since:
+        filename = f"portfolio-export-since-{since:%Y%m%dT%H%M%S}.ndjson"
+    return StreamingResponse(
+        iter_export(since),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,236 @@
+"""Sitemap and Atom feed, streamed from the database.
+
+- ``GET /api/sitemap.xml`` lists the site's static pages and every post page
+  (``/{page}/{album}/{slug}``, the page being the category's, see
+  :data:`app.lib.subjects.CATEGORY_PAGES`). Past ``MAX_URLS`` URLs, the
+  protocol's limit per file, it becomes a sitemap index pointing at
+  ``/api/sitemap-{n}.xml`` shards instead. The frontend proxies both to the
+  site's own origin (``/sitemap.xml``, ``/sitemap-{n}.xml``; see
+  frontend/next.config.js), and the index links the shards there: a sitemap
+  may only list URLs on the host it is served from.
+- ``GET /api/feed.atom`` is the newest ``FEED_ENTRIES`` posts as Atom.
+
+Both are written as the rows arrive, through a server-side cursor over the few
+columns they need, like ``/api/export.ndjson``. Crawlers fetch them often and
+they change rarely, so each response carries an ETag: a digest of the ids and
+``updated_at`` of the rows it covers, from one aggregate query that sends back
+a single row. A matching ``If-None-Match`` gets a 304 without the rows
+themselves ever being sent.
+
+Page URLs are built from ``SITE_URL`` (default https://rileydrcelik.com).
+"""
+
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import ReadSessionLocal, get_db
+from app.lib.subjects import CATEGORY_PAGES
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["feeds"])
+
+SITE_URL = os.getenv("SITE_URL", "https://rileydrcelik.com").rstrip("/")
+SITE_TITLE = os.getenv("SITE_TITLE", "Riley Drcelik")
+
+# The sitemap protocol's limit on URLs per file.
+MAX_URLS = 50000
+# Pages that aren't posts; they open the first sitemap file.
+STATIC_PATHS = ("", "/bio", "/art", "/photo", "/music", "/projects", "/shop")
+POSTS_PER_SITEMAP = MAX_URLS - len(STATIC_PATHS)
+FEED_ENTRIES = int(os.getenv("FEED_ENTRIES", "50"))
+# Post categories with a page of their own in the frontend: all of them.
+PAGE_CATEGORIES = tuple(sorted(CATEGORY_PAGES))
+
+# Rows fetched per round-trip from the server-side cursor.
+BATCH_SIZE = 1000
+CACHE_CONTROL = "public, max-age=3600"
+
+# Posts with a page, in a stable order: a new post lands in the last shard, so
+# the others (and their ETags) stay as they were.
+_LISTED = """
+    SELECT id, slug, category, album, updated_at
+      FROM posts
+     WHERE slug IS NOT NULL AND category = ANY(:categories)
+     ORDER BY date, id
+"""
+
+_FEED_ROWS = """
+    SELECT id, slug, category, album, title, description, excerpt, tags, date, updated_at
+      FROM posts
+     WHERE slug IS NOT NULL AND category = ANY(:categories)
+     ORDER BY date DESC, id
+     LIMIT :limit
+"""
+
+
+def _fingerprint_of(rows: str):
+    """How many rows, the newest ``updated_at`` and a digest of which rows at
+    which version: an edit, a delete or a row moving between shards all
+    change it."""
+    return text(
+        "SELECT count(*) AS posts, max(updated_at) AS updated_at,"
+        " md5(COALESCE(string_agg(id::text || '@' || COALESCE(updated_at::text, ''), ',' ORDER BY id), '')) AS digest"
+        f" FROM ({rows}) listed"
+    )
+
+
+_SHARD_ROWS = f"{_LISTED} LIMIT :limit OFFSET :offset"
+_SHARD = text(_SHARD_ROWS)
+_SHARD_FINGERPRINT = _fingerprint_of(_SHARD_ROWS)
+_FINGERPRINT = _fingerprint_of(_LISTED)
+_FEED = text(_FEED_ROWS)
+_FEED_FINGERPRINT = _fingerprint_of(_FEED_ROWS)
+
+
+def _timestamp(value: Optional[datetime]) -> str:
+    """RFC 3339, as both the sitemap and Atom want it. Naive times are UTC."""
+    if value is None:
+        value = datetime.now(timezone.utc)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat(timespec="seconds")
+
+
+def _post_url(row) -> str:
+    return f"{SITE_URL}/{quote(CATEGORY_PAGES[row.category])}/{quote(row.album)}/{quote(row.slug)}"
+
+
+def _etag(name: str, fingerprint) -> str:
+    return f'W/"{name}-{fingerprint.posts}-{fingerprint.digest[:16]}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    return etag in request.headers.get("if-none-match", "")
+
+
+def _xml_response(body: Iterator[str], media_type: str, etag: str) -> StreamingResponse:
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def _stream(query, params: dict) -> Iterator:
+    """Rows of ``query`` in batches, in a session of their own.
+
+    A streamed body outlives the request's dependencies, so the ``get_db``
+    session would already be closed by the time the first batch is read.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield from db.execute(query, params, execution_options={"yield_per": BATCH_SIZE})
+    except Exception:
+        logger.exception("[Feeds] Stream aborted mid-response")
+        raise
+    finally:
+        db.close()
+
+
+def iter_urlset(shard: int) -> Iterator[str]:
+    """One sitemap file: the static pages first (shard 1 only), then posts."""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    if shard == 1:
+        for path in STATIC_PATHS:
+            yield f"<url><loc>{escape(SITE_URL + path)}</loc></url>\n"
+    params = {
+        "categories": list(PAGE_CATEGORIES),
+        "limit": POSTS_PER_SITEMAP,
+        "offset": (shard - 1) * POSTS_PER_SITEMAP,
+    }
+    for row in _stream(_SHARD, params):
+        yield f"<url><loc>{escape(_post_url(row))}</loc><lastmod>{_timestamp(row.updated_at)}</lastmod></url>\n"
+    yield "</urlset>\n"
+
+
+def iter_sitemap_index(shard_urls) -> Iterator[str]:
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for url in shard_urls:
+        yield f"<sitemap><loc>{escape(url)}</loc></sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def iter_atom(updated: Optional[datetime]) -> Iterator[str]:
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+    yield f"<title>{escape(SITE_TITLE)}</title>\n"
+    yield f'<link href="{escape(SITE_URL)}/"/>\n'
+    yield f"<id>{escape(SITE_URL)}/</id>\n"
+    yield f"<updated>{_timestamp(updated)}</updated>\n"
+    yield f"<author><name>{escape(SITE_TITLE)}</name></author>\n"
+    for row in _stream(_FEED, {"categories": list(PAGE_CATEGORIES), "limit": FEED_ENTRIES}):
+        url = escape(_post_url(row))
+        summary = row.excerpt or row.description
+        yield "<entry>\n"
+        yield f"<title>{escape(row.title)}</title>\n"
+        yield f'<link href="{url}"/>\n'
+        yield f"<id>urn:uuid:{row.id}</id>\n"
+        yield f"<published>{_timestamp(row.date)}</published>\n"
+        yield f"<updated>{_timestamp(row.updated_at)}</updated>\n"
+        for tag in row.tags or []:
+            term = escape(tag, {'"': "&quot;"})
+            yield f'<category term="{term}"/>\n'
+        if summary:
+            yield f"<summary>{escape(summary)}</summary>\n"
+        yield "</entry>\n"
+    yield "</feed>\n"
+
+
+@router.get("/sitemap.xml")
+async def sitemap(request: Request, db: Session = Depends(get_db)):
+    """The whole sitemap, or an index of its shards past MAX_URLS URLs."""
+    fingerprint = db.execute(_FINGERPRINT, {"categories": list(PAGE_CATEGORIES)}).one()
+    etag = _etag("sitemap", fingerprint)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+    shards = max(1, -(-fingerprint.posts // POSTS_PER_SITEMAP))
+    if shards == 1:
+        return _xml_response(iter_urlset(1), "application/xml", etag)
+    urls = [f"{SITE_URL}/sitemap-{shard}.xml" for shard in range(1, shards + 1)]
+    return _xml_response(iter_sitemap_index(urls), "application/xml", etag)
+
+
+@router.get("/sitemap-{shard}.xml")
+async def sitemap_shard(shard: int, request: Request, db: Session = Depends(get_db)):
+    """One shard of a sitemap index; shard 1 also lists the static pages."""
+    if shard < 1:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    fingerprint = db.execute(
+        _SHARD_FINGERPRINT,
+        {
+            "categories": list(PAGE_CATEGORIES),
+            "limit": POSTS_PER_SITEMAP,
+            "offset": (shard - 1) * POSTS_PER_SITEMAP,
+        },
+    ).one()
+    if shard > 1 and not fingerprint.posts:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    etag = _etag(f"sitemap-{shard}", fingerprint)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return _xml_response(iter_urlset(shard), "application/xml", etag)
+
+
+@router.get("/feed.atom")
+async def atom_feed(request: Request, db: Session = Depends(get_db)):
+    """The newest posts as an Atom feed."""
+    fingerprint = db.execute(
+        _FEED_FINGERPRINT, {"categories": list(PAGE_CATEGORIES), "limit": FEED_ENTRIES}
+    ).one()
+    etag = _etag("feed", fingerprint)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return _xml_response(iter_atom(fingerprint.updated_at), "application/atom+xml", etag)
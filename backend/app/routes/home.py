@@ -0,0 +1,102 @@
+"""Single-call payload for the homepage/splash.
+
+The splash used to ask for the featured post and the last-updated date with two
+separate ``get_posts`` calls, and each category section then fetched its own
+feed. Every one of those is an HTTP request plus a database round-trip. This
+endpoint answers all of them from one query: a window function ranks every post
+within each slice the page cares about, and only the rows that make the cut in
+some slice come back.
+
+The response is a unit — it changes only when a post is written — so it is sent
+with a shared-cache ``Cache-Control`` and can sit behind a CDN as-is. Behind the
+CDN it is also kept in the shared response cache, invalidated with the other
+post reads.
+"""
+
+import logging
+from collections import defaultdict
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import desc, func, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from app.database import get_db
+from app.lib.cache import cache, cached_json
+from app.models.post import Post
+from app.schemas.post import HomeResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/home", tags=["home"])
+
+# Short enough that a new post shows up within a minute, long enough that a
+# burst of visitors costs one query. Stale-while-revalidate keeps the splash
+# instant while a CDN refetches in the background.
+CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+
+@router.get("/", response_model=HomeResponse)
+async def get_home(
+    per_category: int = Query(default=12, ge=0, le=50),
+    favorites: int = Query(default=12, ge=0, le=50),
+    db: Session = Depends(get_db)
+):
+    """Featured post, latest update, favorites and the newest posts per category."""
+    def build() -> bytes:
+        ranked = select(
+            Post,
+            func.row_number().over(partition_by=Post.category, order_by=desc(Post.date)).label("category_rank"),
+            func.row_number().over(partition_by=Post.is_major, order_by=desc(Post.date)).label("major_rank"),
+            func.row_number().over(partition_by=Post.is_favorite, order_by=desc(Post.date)).label("favorite_rank"),
+            func.row_number().over(order_by=desc(Post.updated_at)).label("updated_rank"),
+        ).subquery("ranked")
+        ranked_post = aliased(Post, ranked)
+
+        try:
+            rows = (
+                db.query(
+                    ranked_post,
+                    ranked.c.category_rank,
+                    ranked.c.major_rank,
+                    ranked.c.favorite_rank,
+                    ranked.c.updated_rank,
+                )
+                .filter(
+                    or_(
+                        ranked.c.category_rank <= per_category,
+                        ranked.c.is_major.is_(True) & (ranked.c.major_rank == 1),
+                        ranked.c.is_favorite.is_(True) & (ranked.c.favorite_rank <= favorites),
+                        ranked.c.updated_rank == 1,
+                    )
+                )
+                .order_by(desc(ranked.c.date))
+                .all()
+            )
+        except Exception as exc:
+            logger.exception("[Home] Failed to build home payload")
+            raise HTTPException(status_code=500, detail="Error fetching home") from exc
+
+        featured = None
+        latest_update = None
+        favorite_posts = []
+        categories = defaultdict(list)
+        for post, category_rank, major_rank, favorite_rank, updated_rank in rows:
+            if post.is_major and major_rank == 1:
+                featured = post
+            if updated_rank == 1:
+                latest_update = post
+            if post.is_favorite and favorite_rank <= favorites:
+                favorite_posts.append(post)
+            if category_rank <= per_category:
+                categories[post.category].append(post)
+
+        payload = HomeResponse.model_validate({
+            "featured": featured,
+            "latest_update": latest_update,
+            "favorites": favorite_posts,
+            "categories": dict(categories),
+        }, from_attributes=True)
+        return payload.model_dump_json().encode()
+
+    body, hit = await cache.get_or_build("posts", f"home:{per_category}|{favorites}", build)
+    return cached_json(body, hit, {"Cache-Control": CACHE_CONTROL})
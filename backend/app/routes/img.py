@@ -0,0 +1,48 @@
+"""Resized renditions of stored images: ``GET /api/img/{key}?w=&fmt=``.
+
+``key`` is the S3 key (``images/<category>/<uuid>.webp`` and the like), ``w``
+the width wanted (snapped up to an allowed width, see
+:data:`app.lib.resize_cache.WIDTHS`) and ``fmt`` one of webp (default), jpeg
+or png. The work and the disk cache are in app/lib/resize_cache.py.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+
+from app.lib import images, resize_cache
+
+router = APIRouter(prefix="/api/img", tags=["images"])
+
+# Keys are never reused, so neither browsers nor a CDN need to revalidate.
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@router.get("/{key:path}")
+async def resized_image(
+    key: str,
+    w: Optional[int] = Query(None, ge=1, le=images.MAX_WIDTH),
+    fmt: str = Query("webp"),
+    if_none_match: Optional[str] = Header(default=None),
+):
+    fmt = fmt.lower()
+    if fmt not in images.FORMATS:
+        raise HTTPException(status_code=400, detail=f"fmt must be one of: {', '.join(images.FORMATS)}")
+    if not resize_cache.valid_key(key):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    width = resize_cache.snap_width(w)
+    etag = f'"{resize_cache.rendition_name(key, width, fmt)}"'
+    headers = {"Cache-Control": IMMUTABLE, "ETag": etag}
+    if if_none_match and etag in if_none_match:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        body, hit = await resize_cache.resizer.get(key, width, fmt)
+    except resize_cache.ImageNotFound:
+        raise HTTPException(status_code=404, detail="Image not found")
+    except resize_cache.UnsupportedImage:
+        raise HTTPException(status_code=422, detail="Not an image that can be resized")
+
+    headers["X-Cache"] = "HIT" if hit else "MISS"
+    return Response(content=body, media_type=images.FORMATS[fmt], headers=headers)
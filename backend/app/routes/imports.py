@@ -0,0 +1,74 @@
+"""Admin bulk import of posts and albums.
+
+Accepts the NDJSON that ``/api/export.ndjson`` produces, or a CSV of posts (or
+albums, with ``kind=album``), and loads it through :mod:`app.lib.bulk_import`:
+one validation pass, one slug allocation, one ``COPY`` and one upsert per table,
+in a single transaction. The same loader backs ``import_content.py`` for use
+from a shell.
+"""
+
+import io
+import logging
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.lib.cache import cache
+from app.lib.bulk_import import ImportFailed, import_records, iter_records
+from app.lib.firebase_auth import verify_firebase_token
+from app.lib.subjects import registry as subjects
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/import", tags=["import"])
+
+
+def detect_format(filename: str, content_type: str = "") -> str:
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv" or content_type == "text/csv":
+        return "csv"
+    return "ndjson"
+
+
+@router.post("/")
+async def bulk_import(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    kind: str = "post",
+    strict: bool = False,
+    db: Session = Depends(get_db),
+    current_user=Depends(verify_firebase_token)
+):
+    """Import an NDJSON or CSV file of posts and albums in one transaction.
+
+    ``format`` defaults from the file name. ``kind`` is the row kind for CSV
+    files without a ``kind`` column. With ``strict``, any invalid row rejects the
+    whole file; otherwise invalid rows are skipped and listed in the response.
+    """
+    fmt = format or detect_format(file.filename, file.content_type or "")
+    if fmt not in {"ndjson", "csv"}:
+        raise HTTPException(status_code=400, detail=f"Unsupported import format '{fmt}'")
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        result = await run_in_threadpool(
+            import_records, db, iter_records(stream, fmt, default_kind=kind), strict
+        )
+    except ImportFailed as exc:
+        raise HTTPException(status_code=422, detail=exc.result.as_dict()) from exc
+    except UnicodeDecodeError as exc:
+        raise HTTPException(status_code=400, detail="Import file must be UTF-8") from exc
+    except Exception as exc:
+        logger.exception("[Import] Bulk import failed")
+        raise HTTPException(status_code=500, detail=f"Import failed: {exc}") from exc
+    finally:
+        stream.detach()
+
+    await cache.invalidate("posts", "albums")
+    if result.subjects:
+        await subjects.changed()
+    return result.as_dict()
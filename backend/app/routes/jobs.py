@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from uuid import UUID
+from app.database import get_primary_db
+from app.models.job import Job
+from app.schemas.job import JobResponse
+from app.lib.firebase_auth import verify_firebase_token
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+# Job status changes by the second, so these read the primary: a replica could
+# still show a finished job as running.
+
+@router.get("/", response_model=List[JobResponse])
+async def list_jobs(
+    status: Optional[str] = Query(None, description="pending, running, done or failed"),
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_primary_db),
+    current_user=Depends(verify_firebase_token),
+):
+    """Most recent jobs first, optionally filtered by status and kind."""
+    query = db.query(Job)
+    if status:
+        query = query.filter(Job.status == status)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    return query.order_by(Job.created_at.desc()).limit(limit).all()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: UUID, db: Session = Depends(get_primary_db), current_user=Depends(verify_firebase_token)):
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -9,7 +9,19 @@ in the ``notes`` category carrying ``source='w_notes'``.
 Idempotency comes from the ``(source, source_id)`` unique index — publishing an
 edited note updates the post it created the first time instead of piling up
 duplicates. The post's ``date`` is set from the note's ``updated_at``, which is
-what floats a freshly-edited note back to the top of the site's feed.
+what floats a freshly-edited note back to the top of the site's feed. Embedding
+and ingest both store the body's plain-text excerpt, word count and reading
+time next to it (see :mod:`app.lib.html_text`).
+
+Ingest can also run asynchronously (``Prefer: respond-async``, or
+``NOTES_INGEST_ASYNC=1`` for every call): the push is authenticated, validated
+and queued, and the caller gets ``202 Accepted`` at once. w_notes pushes on
+every autosave, so queued pushes for the same note coalesce into one pending
+job (see :func:`app.lib.jobs.enqueue_coalesced`). That job carries the newest
+``updated_at_ms`` and runs once the note has been quiet for
+``NOTES_INGEST_DEBOUNCE_SECONDS`` (default 2), or at most
+``NOTES_INGEST_MAX_DELAY_SECONDS`` (default 30) after the first push of a
+burst. A burst of saves costs one sanitize and one commit instead of one each.
 
 Security notes:
 - The shared secret is compared with :func:`secrets.compare_digest`; a plain
@@ -23,19 +35,30 @@ import logging
 import os
 import secrets
 from datetime import datetime, timezone
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import httpx
-import nh3
 from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.models.post import Post
 from app.schemas.post import PostResponse
 from app.routes.posts import generate_unique_slug
 from app.lib.firebase_auth import verify_firebase_token
+from app.lib import jobs, related
+from app.lib.cache import cache
+from app.lib.html_text import text_stats
+from app.lib.metrics import timed
+
+if TYPE_CHECKING:
+    import httpx
+
+# nh3 and httpx are imported where they are used: ingest and the note picker
+# are rare next to the public read traffic every worker serves.
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +69,10 @@ router = APIRouter(prefix="/api/notes", tags=["notes-ingest"])
 SOURCE = "w_notes"
 CATEGORY = "notes"
 
+INGEST_JOB = "notes.ingest"
+INGEST_DEBOUNCE_SECONDS = float(os.getenv("NOTES_INGEST_DEBOUNCE_SECONDS", "2"))
+INGEST_MAX_DELAY_SECONDS = float(os.getenv("NOTES_INGEST_MAX_DELAY_SECONDS", "30"))
+
 # The tag set the w_notes rich editor actually emits (a TipTap subset shared by
 # its native and web editors), and nothing else. Anything outside this list is
 # stripped rather than escaped, so unexpected markup degrades to its text.
@@ -80,13 +107,16 @@ def sanitize_body(html: str) -> str:
     """
     if not html:
         return ""
-    return nh3.clean(
-        html,
-        tags=ALLOWED_TAGS,
-        attributes=ALLOWED_ATTRIBUTES,
-        link_rel=" ".join(sorted(LINK_RELS)),
-        url_schemes={"http", "https", "mailto"},
-    )
+    import nh3
+
+    with timed("nh3", "sanitize"):
+        return nh3.clean(
+            html,
+            tags=ALLOWED_TAGS,
+            attributes=ALLOWED_ATTRIBUTES,
+            link_rel=" ".join(sorted(LINK_RELS)),
+            url_schemes={"http", "https", "mailto"},
+        )
 
 
 def require_ingest_secret(x_ingest_secret: Optional[str] = Header(default=None)) -> None:
@@ -118,8 +148,122 @@ def _to_datetime(epoch_ms: int) -> datetime:
     return datetime.fromtimestamp(epoch_ms / 1000, tz=timezone.utc).replace(tzinfo=None)
 
 
+def _wants_async(prefer: Optional[str]) -> bool:
+    if prefer and "respond-async" in prefer.lower():
+        return True
+    return os.getenv("NOTES_INGEST_ASYNC", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+# One round-trip per push. `matched` is every post embedding the note;
+# `refreshed` updates the ones the push is newer than and reports their old
+# titles. The date guard sits on the target row itself (p.date), so when two
+# pushes for one note race, the second re-checks it against the first's
+# committed row and can never roll the content back. No SELECT ... FOR UPDATE
+# is needed.
+_INGEST = text(
+    """
+    WITH matched AS (
+        SELECT id, title
+          FROM posts
+         WHERE source = :source AND source_id = :source_id
+    ),
+    refreshed AS (
+        UPDATE posts AS p
+           SET title = :title,
+               content_url = :body,
+               excerpt = :excerpt,
+               word_count = :word_count,
+               reading_minutes = :reading_minutes,
+               date = :incoming,
+               updated_at = now()
+          FROM matched AS m
+         WHERE p.id = m.id
+           AND p.date < :incoming
+        RETURNING p.id
+    )
+    SELECT m.id, m.title AS old_title, (r.id IS NOT NULL) AS updated
+      FROM matched AS m
+      LEFT JOIN refreshed AS r ON r.id = m.id
+    """
+)
+
+_LISTED_IN = text(
+    """
+    SELECT DISTINCT r.post_id
+      FROM post_related AS r
+      JOIN posts AS p ON p.id = r.related_id
+     WHERE p.source = :source AND p.source_id = :source_id
+    """
+)
+
+_UNPUBLISH = text(
+    """
+    DELETE FROM posts
+     WHERE source = :source AND source_id = :source_id
+    RETURNING id
+    """
+)
+
+
+def apply_note_update(db: Session, payload: NoteIngest) -> tuple[int, int]:
+    """Refresh every post embedding the note; return ``(matched, updated)``.
+
+    Set-based: one statement updates every embedding the push is newer than.
+    A post whose date is already at or past the incoming ``updated_at_ms`` is
+    left alone. That push is a stale, repeated or out-of-order delivery, and
+    applying it would roll the post back to an older version of the note.
+    """
+    title = payload.title.strip() or "Untitled note"
+    body = sanitize_body(payload.body_html)
+    rows = db.execute(
+        _INGEST,
+        {
+            "source": SOURCE,
+            "source_id": payload.source_id,
+            "title": title,
+            "body": body,
+            **text_stats(body),
+            "incoming": _to_datetime(payload.updated_at_ms),
+        },
+    ).all()
+
+    updated = [row for row in rows if row.updated]
+    for row in updated:
+        if row.old_title != title:
+            # Only re-slug when the title actually changed — a note edited ten
+            # times should keep one stable URL, not shed a new one each save.
+            db.execute(
+                text("UPDATE posts SET slug = :slug WHERE id = :id"),
+                {"slug": generate_unique_slug(title, db, existing_post_id=row.id), "id": row.id},
+            )
+    db.commit()
+    return len(rows), len(updated)
+
+
+def _apply_in_own_session(payload: NoteIngest) -> tuple[int, int]:
+    db = SessionLocal()
+    try:
+        return apply_note_update(db, payload)
+    finally:
+        db.close()
+
+
+@jobs.handler(INGEST_JOB)
+async def ingest_job(payload: dict) -> dict:
+    """The queued form of :func:`ingest_note`, run once a burst of pushes settles."""
+    note = NoteIngest.model_validate(payload)
+    matched, updated = await run_in_threadpool(_apply_in_own_session, note)
+    if updated:
+        await cache.invalidate("posts", "albums")
+    return {"matched": matched, "updated": updated}
+
+
 @router.post("/ingest", dependencies=[Depends(require_ingest_secret)])
-async def ingest_note(payload: NoteIngest, db: Session = Depends(get_db)):
+async def ingest_note(
+    payload: NoteIngest,
+    db: Session = Depends(get_db),
+    prefer: Optional[str] = Header(default=None),
+):
     """Refresh the post(s) embedding this note.
 
     **Update-only.** Where a note gets placed — which subject, which album — is
@@ -130,55 +274,58 @@ async def ingest_note(payload: NoteIngest, db: Session = Depends(get_db)):
 
     A note can be embedded in more than one place, so every matching post is
     refreshed.
+
+    With ``Prefer: respond-async`` the update is queued instead and the
+    response is ``202`` with the ``job_id`` that will apply it. "Not embedded"
+    then shows up in that job's result, not as a 404.
     """
-    posts = (
-        db.query(Post)
-        .filter(Post.source == SOURCE, Post.source_id == payload.source_id)
-        .all()
-    )
-    if not posts:
+    if _wants_async(prefer):
+        job_id, created = jobs.enqueue_coalesced(
+            db,
+            INGEST_JOB,
+            dedupe_key=f"{INGEST_JOB}:{payload.source_id}",
+            payload=payload.model_dump(),
+            newest_by="updated_at_ms",
+            delay=INGEST_DEBOUNCE_SECONDS,
+            max_delay=INGEST_MAX_DELAY_SECONDS,
+        )
+        db.commit()
+        return JSONResponse(
+            status_code=202,
+            content={"status": "accepted", "job_id": job_id, "coalesced": not created},
+            headers={"Preference-Applied": "respond-async"},
+        )
+
+    matched, updated = apply_note_update(db, payload)
+    if not matched:
         # The overwhelmingly common case: an edit to a note nobody embedded.
         # 404 rather than an error — the caller treats it as "nothing to do".
         raise HTTPException(status_code=404, detail="Note is not embedded anywhere")
-
-    body = sanitize_body(payload.body_html)
-    title = payload.title.strip() or "Untitled note"
-
-    for post in posts:
-        if post.title != title:
-            # Only re-slug when the title actually changed — a note edited ten
-            # times should keep one stable URL, not shed a new one each save.
-            post.slug = generate_unique_slug(title, db, existing_post_id=post.id)
-        post.title = title
-        post.content_url = body
-        # Sorting key for the feed: an edit floats the post back to the top.
-        post.date = _to_datetime(payload.updated_at_ms)
-
-    db.commit()
-    return {"updated": len(posts), "status": "ok"}
+    if updated:
+        await cache.invalidate("posts", "albums")
+    return {"updated": updated, "status": "ok"}
 
 
 @router.delete("/ingest/{source_id}", dependencies=[Depends(require_ingest_secret)])
 async def unpublish_note(source_id: str, db: Session = Depends(get_db)):
-    """Remove the post for a note that was unpublished or trashed.
+    """Remove every post embedding a note that was unpublished or trashed.
 
     Deliberately does not reuse ``delete_post``: that helper best-effort deletes
     ``content_url`` from S3, and for a note that field holds the body's HTML, not
     an object key. There is nothing in S3 to clean up here.
     """
-    post = (
-        db.query(Post)
-        .filter(Post.source == SOURCE, Post.source_id == source_id)
-        .first()
-    )
-    if not post:
+    # Read before the delete: the posts listing these as related need refilling.
+    listed_in = db.execute(_LISTED_IN, {"source": SOURCE, "source_id": source_id}).scalars().all()
+    deleted = db.execute(_UNPUBLISH, {"source": SOURCE, "source_id": source_id}).all()
+    if not deleted:
         # Normal whenever an already-unpublished note is edited; the caller
         # treats 404 on delete as success.
         raise HTTPException(status_code=404, detail="No published post for this note")
 
-    db.delete(post)
+    related.enqueue_recompute(db, listed_in)
     db.commit()
-    return {"status": "deleted"}
+    await cache.invalidate("posts", "albums")
+    return {"status": "deleted", "deleted": len(deleted)}
 
 
 # ---------------------------------------------------------------------------
@@ -191,11 +338,13 @@ async def unpublish_note(source_id: str, db: Session = Depends(get_db)):
 # titles and bodies, never the credential.
 
 W_NOTES_BASE = os.getenv("W_NOTES_API_BASE", "")
-_TIMEOUT = httpx.Timeout(10.0)
+_TIMEOUT_SECONDS = 10.0
 
 
-def _w_notes_client() -> httpx.AsyncClient:
+def _w_notes_client() -> "httpx.AsyncClient":
     """Client pointed at the w_notes read API, or 503 if it isn't configured."""
+    import httpx
+
     secret = os.getenv("NOTES_INGEST_SECRET", "")
     if not W_NOTES_BASE or not secret:
         raise HTTPException(
@@ -204,7 +353,7 @@ def _w_notes_client() -> httpx.AsyncClient:
         )
     return httpx.AsyncClient(
         base_url=W_NOTES_BASE.rstrip("/"),
-        timeout=_TIMEOUT,
+        timeout=httpx.Timeout(_TIMEOUT_SECONDS),
         headers={"X-Ingest-Secret": secret},
     )
 
@@ -223,9 +372,12 @@ class EmbedRequest(BaseModel):
 @router.get("/available")
 async def list_available_notes(current_user=Depends(verify_firebase_token)):
     """The note picker's list, proxied from w_notes."""
+    import httpx
+
     async with _w_notes_client() as client:
         try:
-            response = await client.get("/embed/notes")
+            with timed("w_notes", "list_notes"):
+                response = await client.get("/embed/notes")
             response.raise_for_status()
         except httpx.HTTPError as exc:
             logger.warning("[notes] could not reach w_notes: %s", exc)
@@ -245,9 +397,12 @@ async def embed_note(
     only ever refreshes one. The body is fetched server-side and sanitized here,
     on arrival, before it is stored.
     """
+    import httpx
+
     async with _w_notes_client() as client:
         try:
-            response = await client.get(f"/embed/notes/{payload.note_id}")
+            with timed("w_notes", "get_note"):
+                response = await client.get(f"/embed/notes/{payload.note_id}")
             if response.status_code == 404:
                 raise HTTPException(status_code=404, detail="Note not found")
             response.raise_for_status()
@@ -276,6 +431,7 @@ async def embed_note(
         # treats a non-http content_url as text. thumbnail_url is NOT NULL, and
         # empty is what marks "no image".
         content_url=body,
+        **text_stats(body),
         thumbnail_url="",
         post_type="note",
         date=when,
@@ -285,6 +441,9 @@ async def embed_note(
         is_active=True,
     )
     db.add(post)
+    db.flush()
+    related.enqueue_recompute(db, [post.id])
     db.commit()
     db.refresh(post)
+    await cache.invalidate("posts", "albums")
     return post
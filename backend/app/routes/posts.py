@@ -1,19 +1,33 @@
+import json
 import logging
 import re
-from uuid import uuid4
-from fastapi import APIRouter, Depends, HTTPException
+from collections import defaultdict
+from uuid import UUID, uuid4
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, or_, and_, text
+from sqlalchemy import ARRAY, Text, all_, and_, case, cast, desc, func, literal, or_, select, text, update
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from datetime import datetime
 from app.database import get_db
 from app.models.post import Post
-from app.schemas.post import PostCreate, PostUpdate, PostResponse
-from app.lib.s3 import delete_file_from_s3
+from app.models.post_tag_count import PostTagCount
+from app.models.post_related import PostRelated
+from app.schemas.post import PostBulkFilter, PostBulkUpdate, PostCreate, PostUpdate, PostResponse
+from app.lib import jobs, related
+from app.lib import uploads  # noqa: F401 - registers the uploads.* job handlers
 from app.lib.firebase_auth import verify_firebase_token
+from app.lib.cache import cache, cached_json
+from app.lib.subjects import is_post_category
 
 logger = logging.getLogger(__name__)
 
+# Fields the related-posts score reads; changing one requeues the post.
+RELATED_FIELDS = {'tags', 'album', 'cross_post_albums', 'category'}
+# Fields the default splash image depends on; see update_post.
+SPLASH_FIELDS = {'thumbnail_url', 'content_url', 'is_major', 'category'}
+
 
 def slugify(value: str) -> str:
     value = value.lower().strip()
@@ -37,8 +51,33 @@ def generate_unique_slug(title: str, db: Session, existing_post_id=None) -> str:
         counter += 1
 
 
+def apply_default_splash(data: dict) -> dict:
+    """Fill in ``splash_image_url`` for a new post that didn't set one.
+
+    Major art/photo posts splash their full image; everything else falls back
+    to the thumbnail.
+    """
+    if not data.get('splash_image_url'):
+        if data.get('is_major', False) and data.get('category') in {'art', 'photo'}:
+            data['splash_image_url'] = data.get('content_url')
+        else:
+            data['splash_image_url'] = data.get('thumbnail_url')
+    return data
+
+
 router = APIRouter(prefix="/api/posts", tags=["posts"])
 
+_post_list = TypeAdapter(List[PostResponse])
+
+
+def _without_bodies(posts) -> List[PostResponse]:
+    """Posts with an ``excerpt`` (notes) minus their inline body."""
+    items = [PostResponse.model_validate(post) for post in posts]
+    return [
+        item.model_copy(update={"content_url": ""}) if item.excerpt is not None else item
+        for item in items
+    ]
+
 @router.get("/", response_model=List[PostResponse])
 async def get_posts(
     category: Optional[str] = None,
@@ -49,39 +88,59 @@ async def get_posts(
     limit: int = 100,
     offset: int = 0,
     sort_by: str = "date",
+    include_body: bool = True,
     db: Session = Depends(get_db)
 ):
-    """Get all posts with optional filters"""
-    query = db.query(Post)
-    
-    if category:
-        query = query.filter(Post.category == category)
-    if album:
-        query = query.filter(
-            or_(Post.album == album, Post.cross_post_albums.any(album))
-        )
-    if tag:
-        query = query.filter(Post.tags.contains([tag]))
-    if is_major is not None:
-        query = query.filter(Post.is_major == is_major)
-    if is_favorite is not None:
-        query = query.filter(Post.is_favorite == is_favorite)
-    
-    try:
-        if sort_by == 'updated_at':
-            posts = query.order_by(desc(Post.updated_at)).limit(limit).offset(offset).all()
-        else:
-            posts = query.order_by(desc(Post.date)).limit(limit).offset(offset).all()
-        return posts
-    except Exception as exc:
-        logger.exception("[Posts] Failed to fetch posts", extra={
-            "category": category,
-            "album": album,
-            "is_major": is_major,
-            "limit": limit,
-            "offset": offset,
-        })
-        raise HTTPException(status_code=500, detail="Error fetching posts") from exc
+    """Get all posts with optional filters.
+
+    Served from the shared response cache (see ``app/lib/cache.py``); every
+    post write invalidates it. A category posts can't have answers an empty
+    list without a query or a cache entry.
+
+    ``include_body=false`` sends an empty ``content_url`` for posts that carry
+    an ``excerpt`` (notes, whose body is inline HTML): the feed draws their
+    cards from the excerpt and fetches the body only when one is opened.
+    """
+    if category and not is_post_category(category):
+        return cached_json(b"[]", False)
+
+    def build() -> bytes:
+        query = db.query(Post)
+
+        if category:
+            query = query.filter(Post.category == category)
+        if album:
+            query = query.filter(
+                or_(Post.album == album, Post.cross_post_albums.any(album))
+            )
+        if tag:
+            query = query.filter(Post.tags.contains([tag]))
+        if is_major is not None:
+            query = query.filter(Post.is_major == is_major)
+        if is_favorite is not None:
+            query = query.filter(Post.is_favorite == is_favorite)
+
+        try:
+            if sort_by == 'updated_at':
+                posts = query.order_by(desc(Post.updated_at)).limit(limit).offset(offset).all()
+            else:
+                posts = query.order_by(desc(Post.date)).limit(limit).offset(offset).all()
+            if not include_body:
+                return _post_list.dump_json(_without_bodies(posts))
+            return _post_list.dump_json(posts)
+        except Exception as exc:
+            logger.exception("[Posts] Failed to fetch posts", extra={
+                "category": category,
+                "album": album,
+                "is_major": is_major,
+                "limit": limit,
+                "offset": offset,
+            })
+            raise HTTPException(status_code=500, detail="Error fetching posts") from exc
+
+    key = f"list:{category}|{album}|{tag}|{is_major}|{is_favorite}|{limit}|{offset}|{sort_by}|{include_body}"
+    body, hit = await cache.get_or_build("posts", key, build)
+    return cached_json(body, hit)
 
 @router.get("/albums/{category}")
 async def get_unique_albums_by_category(
@@ -103,6 +162,41 @@ async def get_unique_albums_by_category(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error fetching albums: {str(e)}")
 
+@router.get("/tags")
+async def get_tag_counts(
+    category: Optional[str] = None,
+    prefix: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Tag -> post count, most used first.
+
+    Read from the trigger-maintained ``post_tag_counts`` aggregate, never from
+    the posts themselves. ``prefix`` matches case-insensitively, for the admin
+    tag autocomplete.
+    """
+    from sqlalchemy import func
+
+    def build() -> bytes:
+        count = func.sum(PostTagCount.post_count).label('count')
+        query = db.query(PostTagCount.tag, count)
+        if category:
+            query = query.filter(PostTagCount.category == category)
+        if prefix:
+            escaped = prefix.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query = query.filter(func.lower(PostTagCount.tag).like(f"{escaped}%", escape='\\'))
+        rows = (
+            query.group_by(PostTagCount.tag)
+            .order_by(desc(count), PostTagCount.tag)
+            .limit(limit)
+            .all()
+        )
+        return json.dumps({"tags": {row.tag: int(row.count) for row in rows}}).encode()
+
+    key = f"tags:{category}|{(prefix or '').lower()}|{limit}"
+    body, hit = await cache.get_or_build("posts", key, build)
+    return cached_json(body, hit)
+
 @router.get("/{post_id}", response_model=PostResponse)
 async def get_post(post_id: str, db: Session = Depends(get_db)):
     """Get a single post by ID"""
@@ -118,6 +212,33 @@ async def get_post_by_slug(slug: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Post not found")
     return post
 
+# After /slug/{slug}: "/slug/related" is a slug, not a post id.
+@router.get("/{post_id}/related", response_model=List[PostResponse])
+async def get_related_posts(
+    post_id: UUID,
+    limit: int = Query(default=6, ge=1, le=related.TOP_K),
+    db: Session = Depends(get_db)
+):
+    """Posts most like this one, best first, from the precomputed
+    ``post_related`` table (see ``app/lib/related.py``).
+
+    Note bodies are left out as with ``include_body=false``; the cards only
+    need the excerpt.
+    """
+    def build() -> bytes:
+        posts = (
+            db.query(Post)
+            .join(PostRelated, PostRelated.related_id == Post.id)
+            .filter(PostRelated.post_id == post_id)
+            .order_by(PostRelated.rank)
+            .limit(limit)
+            .all()
+        )
+        return _post_list.dump_json(_without_bodies(posts))
+
+    body, hit = await cache.get_or_build("posts", f"related:{post_id}|{limit}", build)
+    return cached_json(body, hit)
+
 @router.post("/", response_model=PostResponse)
 async def create_post(post: PostCreate, db: Session = Depends(get_db), current_user=Depends(verify_firebase_token)):
     """Create a new post"""
@@ -129,27 +250,168 @@ async def create_post(post: PostCreate, db: Session = Depends(get_db), current_u
     slug = data.get('slug') or generate_unique_slug(title, db)
     data['slug'] = slug
 
-    category = data.get('category')
-    is_major = data.get('is_major', False)
-
     if 'tags' not in data or data['tags'] is None:
         data['tags'] = []
     if 'gallery_urls' not in data or data['gallery_urls'] is None:
         data['gallery_urls'] = []
 
-    if is_major and category in {'art', 'photo'}:
-        if not data.get('splash_image_url'):
-            data['splash_image_url'] = data.get('content_url')
-    else:
-        if not data.get('splash_image_url'):
-            data['splash_image_url'] = data.get('thumbnail_url')
+    apply_default_splash(data)
 
     db_post = Post(**data)
     db.add(db_post)
+    db.flush()
+    related.enqueue_recompute(db, [db_post.id])
     db.commit()
     db.refresh(db_post)
+    await cache.invalidate("posts", "albums")
     return db_post
 
+def _bulk_filter(selection: PostBulkFilter) -> list:
+    """WHERE conditions for a filtered bulk update, matching ``get_posts``."""
+    conditions = []
+    if selection.ids is not None:
+        conditions.append(Post.id.in_(selection.ids))
+    if selection.category:
+        conditions.append(Post.category == selection.category)
+    if selection.album:
+        conditions.append(or_(Post.album == selection.album, Post.cross_post_albums.any(selection.album)))
+    if selection.tag:
+        conditions.append(Post.tags.contains([selection.tag]))
+    if selection.is_major is not None:
+        conditions.append(Post.is_major == selection.is_major)
+    if selection.is_favorite is not None:
+        conditions.append(Post.is_favorite == selection.is_favorite)
+    return conditions
+
+
+def _edited_tags(base, add_tags: List[str], remove_tags: List[str]):
+    """``base`` plus ``add_tags`` minus ``remove_tags``, deduplicated, in order."""
+    tags = (
+        func.unnest(func.array_cat(base, cast(add_tags, ARRAY(Text))))
+        .table_valued("tag", with_ordinality="n")
+        .render_derived()
+    )
+    kept = (
+        select(tags.c.tag)
+        .where(tags.c.tag != all_(cast(remove_tags, ARRAY(Text))))
+        .group_by(tags.c.tag)
+        .order_by(func.min(tags.c.n))
+    )
+    return func.array(kept.scalar_subquery())
+
+
+def _bulk_values(changes: dict) -> dict:
+    """The SET clause for one change set.
+
+    Expressions read the row as it was, so the splash rule from
+    ``update_post`` is spelled out with the new values where the change set
+    has them and the columns where it doesn't.
+    """
+    changes = dict(changes)
+    add_tags = changes.pop('add_tags', None) or []
+    remove_tags = changes.pop('remove_tags', None) or []
+    values = dict(changes)
+
+    if add_tags or remove_tags:
+        base = cast(changes['tags'], ARRAY(Text)) if 'tags' in changes else Post.tags
+        values['tags'] = _edited_tags(base, add_tags, remove_tags)
+
+    if SPLASH_FIELDS & changes.keys() and 'splash_image_url' not in changes:
+        def new(field):
+            if field in changes:
+                return literal(changes[field], type_=Post.__table__.c[field].type)
+            return getattr(Post, field)
+
+        values['splash_image_url'] = case(
+            (and_(new('is_major'), new('category').in_(('art', 'photo'))), new('content_url')),
+            (func.coalesce(Post.splash_image_url, '') == '', new('thumbnail_url')),
+            else_=Post.splash_image_url,
+        )
+    return values
+
+
+@router.patch("/bulk", response_model=List[PostResponse])
+async def bulk_update_posts(
+    request: PostBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user=Depends(verify_firebase_token)
+):
+    """Update many posts in one transaction.
+
+    Send either ``items``, a list of ``{id, changes}``, or a ``filter`` (the
+    ``GET /api/posts`` filters, or ``ids``) with one ``changes`` set for all
+    of it. Changes are ``PostUpdate`` fields plus ``add_tags``/``remove_tags``.
+    Items with the same change set share one ``UPDATE ... WHERE id IN``;
+    nothing is loaded row by row. The splash image follows the same rule as
+    ``update_post``, in SQL. Returns the updated posts, newest first; if any
+    item's post doesn't exist nothing is changed.
+    """
+    if request.items and (request.filter or request.changes):
+        raise HTTPException(status_code=400, detail="Send items, or a filter with changes, not both")
+
+    # (WHERE clause, change set) per statement.
+    statements = []
+    ids = []
+    if request.items:
+        ids = [item.id for item in request.items]
+        if len(set(ids)) != len(ids):
+            raise HTTPException(status_code=400, detail="Each post may appear in items once")
+        batches = defaultdict(list)
+        change_sets = {}
+        slugs = set()
+        for item in request.items:
+            changes = item.changes.model_dump(exclude_unset=True)
+            if not changes:
+                raise HTTPException(status_code=400, detail=f"No changes for post {item.id}")
+            if changes.get('title'):
+                slug = generate_unique_slug(changes['title'], db, existing_post_id=item.id)
+                if slug in slugs:
+                    slug = f"{slug}-{uuid4().hex[:4]}"
+                slugs.add(slug)
+                changes['slug'] = slug
+            key = json.dumps(changes, sort_keys=True, default=str)
+            batches[key].append(item.id)
+            change_sets[key] = changes
+        statements = [(Post.id.in_(batch), change_sets[key]) for key, batch in batches.items()]
+    elif request.filter and request.changes:
+        changes = request.changes.model_dump(exclude_unset=True)
+        if not changes:
+            raise HTTPException(status_code=400, detail="No changes")
+        if 'title' in changes:
+            raise HTTPException(status_code=400, detail="Titles can only be changed per item")
+        conditions = _bulk_filter(request.filter)
+        if not conditions:
+            raise HTTPException(status_code=400, detail="The filter needs at least one condition")
+        statements = [(and_(*conditions), changes)]
+    else:
+        raise HTTPException(status_code=400, detail="Send items, or a filter with changes")
+
+    updated = []
+    requeue = []
+    try:
+        for where, changes in statements:
+            result = db.execute(
+                update(Post).where(where).values(_bulk_values(changes)).returning(Post.id),
+                execution_options={"synchronize_session": False},
+            )
+            touched = [row[0] for row in result]
+            updated.extend(touched)
+            if (RELATED_FIELDS | {'add_tags', 'remove_tags'}) & changes.keys():
+                requeue.extend(touched)
+    except IntegrityError as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Bulk update rejected: {exc.orig}") from exc
+
+    missing = set(ids) - set(updated)
+    if missing:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=f"Posts not found: {', '.join(sorted(map(str, missing)))}")
+
+    related.enqueue_recompute(db, requeue)
+    db.commit()
+    await cache.invalidate("posts", "albums")
+    return db.query(Post).filter(Post.id.in_(updated)).order_by(desc(Post.date)).all()
+
 @router.put("/{post_id}", response_model=PostResponse)
 async def update_post(
     post_id: str,
@@ -178,9 +440,13 @@ async def update_post(
             db_post.splash_image_url = db_post.content_url
         elif not db_post.splash_image_url:
             db_post.splash_image_url = db_post.thumbnail_url
- 
+
+    if RELATED_FIELDS & update_payload.keys():
+        related.enqueue_recompute(db, [db_post.id])
+
     db.commit()
     db.refresh(db_post)
+    await cache.invalidate("posts", "albums")
     return db_post
 
 @router.delete("/{post_id}")
@@ -190,15 +456,20 @@ async def delete_post(post_id: str, db: Session = Depends(get_db), current_user=
     if not db_post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    content_url = db_post.content_url
-    thumbnail_url = db_post.thumbnail_url
-
+    # The post's files go in a job, committed with the delete: the response
+    # doesn't wait on S3, and a failed delete is retried rather than leaked.
+    # Notes keep their body in content_url, not a URL, so only http(s) URLs count.
+    urls = [
+        url for url in dict.fromkeys([db_post.content_url, db_post.thumbnail_url])
+        if url and url.startswith("http")
+    ]
+    # Its related-posts rows cascade away; refill the lists it was in.
+    listed_in = related.referrers(db, db_post.id)
     db.delete(db_post)
+    related.enqueue_recompute(db, listed_in)
+    if urls:
+        jobs.enqueue(db, "uploads.delete", {"urls": urls})
     db.commit()
-
-    # Delete associated assets from S3 (best-effort)
-    delete_file_from_s3(content_url)
-    if thumbnail_url and thumbnail_url != content_url:
-        delete_file_from_s3(thumbnail_url)
+    await cache.invalidate("posts", "albums")
     return {"message": "Post deleted successfully"}
 
@@ -1,12 +1,26 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db
+from app.lib import jobs, s3, uploads
 from app.lib.s3 import upload_file_to_s3, delete_file_from_s3
 from app.lib.firebase_auth import verify_firebase_token
-from PIL import Image
+from app.lib.images import MAX_WIDTH, describe, encode_webp, fit_width, prepare
+from app.lib.metrics import timed
 import io
 
 router = APIRouter(prefix="/api/upload", tags=["upload"])
 
+MAX_UPLOAD_BYTES = 100 * 1024 * 1024  # 100MB
+# Direct uploads larger than this go multipart, in PART_SIZE pieces (S3's
+# minimum part size is 5MB), so a dropped connection costs one part, not all.
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+PART_SIZE = 8 * 1024 * 1024
+PRESIGN_EXPIRES_SECONDS = 15 * 60
+ALLOWED_TYPE_PREFIXES = ('image/', 'audio/', 'video/', 'application/')
+
 @router.post("/image")
 async def upload_image(
     file: UploadFile = File(...),
@@ -23,9 +37,15 @@ async def upload_image(
         bucket: Optional bucket name (defaults to S3_IMAGES_BUCKET)
     
     Returns:
-        Public S3 URL of the uploaded image
+        Public S3 URL of the uploaded image, plus ``media_meta``: width, height,
+        dominant color and LQIP for images; duration, bitrate and a waveform
+        peaks URL for audio (see app/lib/audio.py)
     """
     import os
+    # Pillow is imported here rather than at module level so that workers that
+    # never see an upload never load it.
+    from PIL import Image
+
     print(f"[Upload] Received upload request - filename: {file.filename}, content_type: {file.content_type}")
     
     # Validate file type
@@ -61,30 +81,31 @@ async def upload_image(
         final_content = file_content
         final_filename = file.filename
         final_content_type = file.content_type
+        media_meta = None
 
         # Optimize Image if it's an image
         if is_image:
             try:
                 print("[Upload] Optimizing image...")
-                img = Image.open(io.BytesIO(file_content))
-                
-                # Convert to RGB if needed (e.g. for PNGs with transparency if we wanted to drop it, but WebP supports it)
-                # WebP supports RGBA, so we can keep it usually. But if it's CMYK etc, convert.
-                if img.mode in ('CMYK', 'P'):
-                    img = img.convert('RGB')
+                with timed("pillow", "optimize"):
+                    img = Image.open(io.BytesIO(file_content))
                 
-                # Resize if too large (max width 1920)
-                max_width = 1920
-                if img.width > max_width:
-                    ratio = max_width / img.width
-                    new_height = int(img.height * ratio)
-                    print(f"[Upload] Resizing from {img.width}x{img.height} to {max_width}x{new_height}")
-                    img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-                
-                # Convert to WebP
-                output_buffer = io.BytesIO()
-                img.save(output_buffer, format='WEBP', quality=85, optimize=True)
-                final_content = output_buffer.getvalue()
+                    # WebP supports RGBA, so alpha is kept; CMYK/palette images
+                    # are converted to RGB.
+                    img = prepare(img)
+
+                    # Resize if too large (max width 1920)
+                    if img.width > MAX_WIDTH:
+                        print(f"[Upload] Resizing from {img.width}x{img.height} to max width {MAX_WIDTH}")
+                        img = fit_width(img, MAX_WIDTH)
+
+                    # Convert to WebP
+                    final_content = encode_webp(img)
+
+                # Dimensions, dominant colour and LQIP while the decoded image
+                # is still in hand; the client stores them on the post.
+                with timed("pillow", "describe"):
+                    media_meta = describe(img)
                 
                 # Update metadata
                 original_ext = os.path.splitext(file.filename)[1]
@@ -108,12 +129,23 @@ async def upload_image(
             folder=folder
         )
         print(f"[Upload] Success! URL: {public_url}")
+
+        if is_audio and uploads.parse_audio_key(s3.object_key_from_url(public_url) or ""):
+            try:
+                print("[Upload] Analyzing audio...")
+                media_meta = await run_in_threadpool(
+                    uploads.write_audio_sidecar, s3.object_key_from_url(public_url), file_content
+                )
+            except Exception as e:
+                # The upload itself succeeded; the tile just goes without a waveform.
+                print(f"[Upload] Audio analysis failed: {str(e)}")
         
         return {
             "url": public_url,
             "filename": final_filename,
             "size": len(final_content),
-            "content_type": final_content_type
+            "content_type": final_content_type,
+            "media_meta": media_meta,
         }
     except HTTPException as he:
         raise
@@ -125,3 +157,143 @@ async def upload_image(
             status_code=500,
             detail=f"Failed to upload file: {str(e)}"
         )
+
+
+# ---------------------------------------------------------------------------
+# Direct-to-S3 uploads
+# ---------------------------------------------------------------------------
+#
+# presign -> the browser PUTs the file to S3 -> complete -> (images) poll status.
+# The API only ever sees these small JSON requests; see app/lib/uploads.py for
+# the key layout and post-processing. The bucket's CORS rules must allow PUT
+# from the site's origin and expose the ETag header (multipart needs it).
+
+class PresignRequest(BaseModel):
+    filename: str = Field(..., max_length=255)
+    content_type: str = Field(..., max_length=255)
+    size: int = Field(..., gt=0)
+    folder: Optional[str] = Field(default=None, max_length=255)
+
+
+class CompletedPart(BaseModel):
+    part_number: int = Field(..., ge=1, le=10000)
+    etag: str
+
+
+class CompleteRequest(BaseModel):
+    key: str
+    upload_id: Optional[str] = None
+    parts: List[CompletedPart] = Field(default_factory=list)
+
+
+@router.post("/presign")
+async def presign_upload(request: PresignRequest, current_user=Depends(verify_firebase_token)):
+    """Presigned URL(s) for uploading one file straight to S3.
+
+    Small files get a single PUT URL (with content type and length signed in);
+    files over MULTIPART_THRESHOLD get a multipart upload with one URL per part.
+    """
+    if not request.content_type.startswith(ALLOWED_TYPE_PREFIXES):
+        raise HTTPException(
+            status_code=415,
+            detail=f"Invalid file type '{request.content_type}'. Allowed types: image/*, audio/*, video/*, application/*"
+        )
+    if request.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File size ({request.size / (1024 * 1024):.2f}MB) exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)}MB limit"
+        )
+
+    key = uploads.new_key(request.filename, request.content_type, request.folder)
+    if request.size <= MULTIPART_THRESHOLD:
+        url = s3.presign_put(key, request.content_type, request.size, PRESIGN_EXPIRES_SECONDS)
+        return {
+            "key": key,
+            "method": "PUT",
+            "url": url,
+            "headers": {"Content-Type": request.content_type},
+            "expires_in": PRESIGN_EXPIRES_SECONDS,
+        }
+
+    upload_id = await run_in_threadpool(s3.create_multipart_upload, key, request.content_type)
+    part_count = -(-request.size // PART_SIZE)
+    return {
+        "key": key,
+        "method": "MULTIPART",
+        "upload_id": upload_id,
+        "part_size": PART_SIZE,
+        "parts": [
+            {
+                "part_number": number,
+                "url": s3.presign_upload_part(key, upload_id, number, PRESIGN_EXPIRES_SECONDS),
+            }
+            for number in range(1, part_count + 1)
+        ],
+        "expires_in": PRESIGN_EXPIRES_SECONDS,
+    }
+
+
+@router.post("/complete")
+async def complete_upload(
+    request: CompleteRequest,
+    db: Session = Depends(get_db),
+    current_user=Depends(verify_firebase_token)
+):
+    """Finish a direct upload and queue its post-processing.
+
+    Images come back as ``processing`` with the ``job_id`` doing the work; poll
+    ``GET /api/upload/status`` for the optimized URL and ``media_meta``.
+    Everything else is ``ready`` at once.
+    """
+    from botocore.exceptions import ClientError
+
+    if request.upload_id:
+        if not request.parts:
+            raise HTTPException(status_code=400, detail="Multipart upload completed without parts")
+        try:
+            await run_in_threadpool(
+                s3.complete_multipart_upload,
+                request.key,
+                request.upload_id,
+                [{"PartNumber": part.part_number, "ETag": part.etag} for part in request.parts],
+            )
+        except ClientError as exc:
+            await run_in_threadpool(s3.abort_multipart_upload, request.key, request.upload_id)
+            raise HTTPException(status_code=400, detail=f"Could not complete multipart upload: {exc}") from exc
+
+    head = await run_in_threadpool(s3.head_object, request.key)
+    if head is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if head.get("ContentLength", 0) > MAX_UPLOAD_BYTES:
+        await run_in_threadpool(s3.delete_file_from_s3, s3.public_url(request.key))
+        raise HTTPException(status_code=400, detail="Uploaded file exceeds the size limit")
+
+    content_type = head.get("ContentType", "application/octet-stream")
+    if uploads.parse_original_key(request.key):
+        job = jobs.enqueue(db, "uploads.process", {"key": request.key})
+        db.commit()
+        return {"status": "processing", "key": request.key, "job_id": str(job.id)}
+
+    uploaded = {
+        "key": request.key,
+        "url": s3.public_url(request.key),
+        "filename": request.key.rsplit("/", 1)[-1],
+        "size": head.get("ContentLength"),
+        "content_type": content_type,
+    }
+    if content_type.startswith("audio/") and uploads.parse_audio_key(request.key):
+        # Usable at once; the waveform peaks follow (see app/lib/audio.py).
+        job = jobs.enqueue(db, "uploads.audio", {"key": request.key})
+        db.commit()
+        return {"status": "processing", **uploaded, "job_id": str(job.id)}
+
+    return {"status": "ready", **uploaded, "media_meta": None}
+
+
+@router.get("/status")
+async def upload_status(key: str, current_user=Depends(verify_firebase_token)):
+    """Where an uploaded image's processing stands: processing, ready or failed."""
+    status = await run_in_threadpool(uploads.upload_status, key)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {"key": key, **status}
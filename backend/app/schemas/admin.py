@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List
+
+
+class StatsBucket(BaseModel):
+    """Posts in one category, album or tag."""
+    key: str
+    posts: int
+    missing_thumbnails: int = 0
+
+
+class CategoryStats(StatsBucket):
+    albums: List[StatsBucket] = []
+
+
+class AdminStatsResponse(BaseModel):
+    total_posts: int
+    missing_thumbnails: int
+    untagged: int
+    major: int
+    favorite: int
+    # Mirrored from w_notes (posts.source set) vs authored here.
+    from_notes: int
+    authored: int
+    categories: List[CategoryStats]
+    # Most used first.
+    tags: List[StatsBucket]
+    generated_at: datetime
@@ -30,3 +30,10 @@ class AlbumResponse(AlbumBase):
     class Config:
         from_attributes = True
 
+
+class AlbumWithStatsResponse(AlbumResponse):
+    """An album plus what the album grid shows about its posts."""
+    post_count: int = 0
+    latest_post_date: Optional[datetime] = None
+    # cover_image if set, else the thumbnail of the album's newest post.
+    cover_url: Optional[str] = None
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+class JobResponse(BaseModel):
+    id: UUID
+    kind: str
+    status: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    last_error: Optional[str] = None
+    result: Optional[Any] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
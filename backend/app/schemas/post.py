@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Optional, List, Dict
 from uuid import UUID
 
 class PostBase(BaseModel):
@@ -20,6 +20,7 @@ class PostBase(BaseModel):
     is_active: bool = Field(default=False, description="Flag indicating whether the project is active")
     is_favorite: bool = Field(default=False, description="Flag indicating whether the post is a favorite")
     cross_post_albums: List[str] = Field(default_factory=list, description="Additional album slugs this post appears in")
+    media_meta: Optional[Dict[str, Any]] = Field(default=None, description="Precomputed media facts: width, height, color, lqip")
 
 class PostCreate(PostBase):
     slug: Optional[str] = Field(default=None, description="Custom slug override")
@@ -41,15 +42,51 @@ class PostUpdate(BaseModel):
     is_favorite: Optional[bool] = None
     cross_post_albums: Optional[List[str]] = None
     date: Optional[datetime] = None
+    media_meta: Optional[Dict[str, Any]] = None
     
     class Config:
         from_attributes = True
 
+class PostBulkChanges(PostUpdate):
+    """A change set for ``PATCH /api/posts/bulk``: PostUpdate's fields, plus tag edits."""
+    add_tags: Optional[List[str]] = Field(default=None, description="Tags to add, keeping existing ones")
+    remove_tags: Optional[List[str]] = Field(default=None, description="Tags to remove")
+
+class PostBulkItem(BaseModel):
+    id: UUID
+    changes: PostBulkChanges
+
+class PostBulkFilter(BaseModel):
+    """Which posts a filtered bulk update touches; the same filters as ``GET /api/posts``."""
+    ids: Optional[List[UUID]] = None
+    category: Optional[str] = None
+    album: Optional[str] = Field(default=None, description="Primary album or a cross-post album")
+    tag: Optional[str] = None
+    is_major: Optional[bool] = None
+    is_favorite: Optional[bool] = None
+
+class PostBulkUpdate(BaseModel):
+    """Either ``items`` (per-post changes) or ``filter`` plus ``changes``."""
+    items: List[PostBulkItem] = Field(default_factory=list, max_length=500)
+    filter: Optional[PostBulkFilter] = None
+    changes: Optional[PostBulkChanges] = None
+
 class PostResponse(PostBase):
     id: UUID
     slug: Optional[str] = None
+    # Computed server-side for note bodies; see app/lib/html_text.py.
+    excerpt: Optional[str] = None
+    word_count: Optional[int] = None
+    reading_minutes: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
+
+class HomeResponse(BaseModel):
+    """Everything the homepage/splash needs, in one payload."""
+    featured: Optional[PostResponse] = Field(default=None, description="Most recent major post")
+    latest_update: Optional[PostResponse] = Field(default=None, description="Most recently updated post")
+    favorites: List[PostResponse] = Field(default_factory=list, description="Most recent favorites")
+    categories: Dict[str, List[PostResponse]] = Field(default_factory=dict, description="Latest posts per category")
@@ -0,0 +1,135 @@
+"""Compute ``media_meta`` (dimensions, dominant colour, LQIP) for existing posts.
+
+    python backfill_media_meta.py              # posts that have none yet
+    python backfill_media_meta.py --all        # recompute everything
+    python backfill_media_meta.py --dry-run    # report what would change
+    python backfill_media_meta.py --audio      # music posts: duration + waveform peaks
+
+New uploads get their metadata at upload time; this covers posts created before
+that, and any whose client didn't pass it along. Each post's tile image
+(``thumbnail_url``, else an image ``content_url``) is fetched over its public
+URL — no S3 credentials needed — decoded once and described with
+``app.lib.images.describe``. Images are fetched and decoded on a small thread
+pool; updates are committed in batches, so an interrupted run keeps its progress
+and a re-run picks up where it stopped.
+
+``--audio`` does the same for audio posts' ``media_meta["audio"]``: each
+``content_url`` is fetched, analyzed with ``app.lib.audio`` and its peaks
+sidecar written to S3 next to it (this mode does need S3 credentials). The two
+kinds of facts are merged into ``media_meta``, so neither mode clobbers the other.
+"""
+
+import argparse
+import asyncio
+import functools
+import io
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from PIL import Image
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.lib.cache import cache
+from app.lib.images import describe
+from app.lib import audio, s3, uploads
+
+BATCH_SIZE = 50
+IMAGE_EXTENSIONS = (".webp", ".jpg", ".jpeg", ".png", ".gif", ".avif")
+
+
+def tile_image_url(thumbnail_url: str, content_url: str) -> str:
+    """The URL the feed shows on the tile, or '' for posts without an image."""
+    if thumbnail_url and thumbnail_url.startswith("http"):
+        return thumbnail_url
+    if content_url and content_url.startswith("http") and content_url.lower().split("?")[0].endswith(IMAGE_EXTENSIONS):
+        return content_url
+    return ""
+
+
+def fetch_meta(client: httpx.Client, url: str) -> dict:
+    response = client.get(url)
+    response.raise_for_status()
+    with Image.open(io.BytesIO(response.content)) as img:
+        img.load()
+        return describe(img)
+
+
+def fetch_audio_meta(client: httpx.Client, url: str, dry_run: bool = False) -> dict:
+    key = s3.object_key_from_url(url)
+    if not key or uploads.parse_audio_key(key) is None:
+        raise ValueError("not an uploaded audio file this server can analyze")
+    response = client.get(url)
+    response.raise_for_status()
+    if dry_run:
+        return {"audio": audio.summary(audio.analyze(response.content, key), None)}
+    return uploads.write_audio_sidecar(key, response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="Recompute posts that already have metadata")
+    parser.add_argument("--workers", type=int, default=4, help="Images fetched and decoded in parallel")
+    parser.add_argument("--dry-run", action="store_true", help="Compute but don't write")
+    parser.add_argument("--audio", action="store_true", help="Analyze audio posts instead of tile images")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.audio:
+            query = "SELECT id, content_url FROM posts WHERE category = 'music'"
+            if not args.all:
+                query += " AND media_meta->'audio' IS NULL"
+            rows = db.execute(text(query + " ORDER BY date DESC")).all()
+            targets = [(row.id, row.content_url) for row in rows if (row.content_url or "").startswith("http")]
+            describe_one = functools.partial(fetch_audio_meta, dry_run=args.dry_run)
+            print(f"{len(targets)} audio post(s) to analyze")
+        else:
+            query = "SELECT id, thumbnail_url, content_url FROM posts"
+            if not args.all:
+                query += " WHERE media_meta IS NULL"
+            rows = db.execute(text(query + " ORDER BY date DESC")).all()
+            targets = [(row.id, url) for row in rows if (url := tile_image_url(row.thumbnail_url, row.content_url))]
+            describe_one = fetch_meta
+            print(f"{len(targets)} post(s) with an image to describe ({len(rows) - len(targets)} without)")
+
+        updated = failed = 0
+        pending = []
+        with httpx.Client(timeout=30, follow_redirects=True) as client, ThreadPoolExecutor(args.workers) as pool:
+            futures = [(post_id, url, pool.submit(describe_one, client, url)) for post_id, url in targets]
+            for post_id, url, future in futures:
+                try:
+                    meta = future.result()
+                except Exception as exc:  # noqa: BLE001 - one bad image shouldn't stop the run
+                    failed += 1
+                    print(f"  ! {post_id} {url}: {exc}", file=sys.stderr)
+                    continue
+                pending.append({"id": post_id, "meta": json.dumps(meta)})
+                if len(pending) >= BATCH_SIZE:
+                    updated += flush(db, pending, args.dry_run)
+            updated += flush(db, pending, args.dry_run)
+    finally:
+        db.close()
+
+    if updated and not args.dry_run:
+        asyncio.run(cache.invalidate("posts"))
+    print(f"{'Would update' if args.dry_run else 'Updated'} {updated} post(s); {failed} failed")
+
+
+def flush(db, pending: list, dry_run: bool) -> int:
+    count = len(pending)
+    if pending and not dry_run:
+        db.execute(
+            # Merged, not replaced: image and audio facts are backfilled separately.
+            text("UPDATE posts SET media_meta = COALESCE(media_meta, '{}'::jsonb) || CAST(:meta AS JSONB) WHERE id = :id"),
+            pending,
+        )
+        db.commit()
+    pending.clear()
+    return count
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compute ``excerpt``, ``word_count`` and ``reading_minutes`` for note posts.
+
+    python backfill_post_excerpts.py              # notes that have none yet
+    python backfill_post_excerpts.py --all        # recompute every note
+    python backfill_post_excerpts.py --dry-run    # report what would change
+
+Notes embedded or ingested from now on get these as they arrive; this covers
+notes embedded before database/migration_add_post_excerpt.sql, and reruns the
+rules after ``app/lib/html_text.py`` changes (``--all``). Only posts whose body
+is stored inline (``post_type = 'note'``) are touched. Updates are committed in
+batches, so an interrupted run keeps its progress.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.lib.cache import cache
+from app.lib.html_text import text_stats
+
+BATCH_SIZE = 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="Recompute notes that already have an excerpt")
+    parser.add_argument("--dry-run", action="store_true", help="Compute but don't write")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    updated = 0
+    try:
+        query = "SELECT id, content_url FROM posts WHERE post_type = 'note'"
+        if not args.all:
+            query += " AND excerpt IS NULL"
+        rows = db.execute(text(query + " ORDER BY date DESC")).all()
+        print(f"{len(rows)} note(s) to describe")
+
+        pending = []
+        for row in rows:
+            pending.append({"id": row.id, **text_stats(row.content_url or "")})
+            if len(pending) >= BATCH_SIZE:
+                updated += flush(db, pending, args.dry_run)
+        updated += flush(db, pending, args.dry_run)
+    finally:
+        db.close()
+
+    if updated and not args.dry_run:
+        asyncio.run(cache.invalidate("posts"))
+    print(f"{'Would update' if args.dry_run else 'Updated'} {updated} note(s)")
+
+
+def flush(db, pending: list, dry_run: bool) -> int:
+    count = len(pending)
+    if pending and not dry_run:
+        db.execute(
+            text(
+                "UPDATE posts SET excerpt = :excerpt, word_count = :word_count, "
+                "reading_minutes = :reading_minutes WHERE id = :id"
+            ),
+            pending,
+        )
+        db.commit()
+    pending.clear()
+    return count
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Bytes and CPU per response for each compression setting, on realistic feeds.
+
+    python -m benchmarks.compression
+    python -m benchmarks.compression --note-kb 40 --repeat 50
+
+The payloads are built from the seeder's generator (same shapes, same seed, no
+database needed) and serialized exactly as the feed routes serialize them:
+
+- ``feed[images]`` — ``get_posts`` default page, 100 image posts,
+- ``feed[notes]``  — a page of 20 note posts carrying their HTML bodies,
+- ``feed[mixed]``  — 100 posts in the seeded image/note ratio,
+- ``home``         — the ``/api/home/`` payload shape (12 per category).
+
+For each, every candidate setting is timed with ``time.process_time`` (CPU, not
+wall clock) and reported as compressed size, ratio and CPU milliseconds per
+response. The middleware's defaults are marked with ``*``.
+"""
+
+import argparse
+import json
+import time
+from types import SimpleNamespace
+
+from app.lib.compression import brotli, compress
+from benchmarks.seed import generate
+
+SETTINGS = [("identity", None)] + [("gzip", level) for level in (1, 6, 9)]
+if brotli is not None:
+    SETTINGS += [("br", quality) for quality in (1, 4, 6, 11)]
+DEFAULTS = {("gzip", 6), ("br", 4)}
+
+
+def _post(record: dict) -> dict:
+    """A generated record in ``PostResponse`` shape."""
+    return {
+        "category": record["category"],
+        "album": record["album"],
+        "title": record["title"],
+        "description": record.get("description"),
+        "content_url": record["content_url"],
+        "thumbnail_url": record["thumbnail_url"],
+        "splash_image_url": record["thumbnail_url"] or None,
+        "date": record["date"],
+        "tags": record["tags"],
+        "price": None,
+        "gallery_urls": [],
+        "is_major": record["is_major"],
+        "is_active": True,
+        "is_favorite": record["is_favorite"],
+        "cross_post_albums": record["cross_post_albums"],
+        "post_type": record["post_type"],
+        "id": record["id"],
+        "slug": record["title"].lower().replace(" ", "-"),
+        "created_at": record["created_at"],
+        "updated_at": record["updated_at"],
+    }
+
+
+def payloads(args) -> dict:
+    records = [r for r in generate(SimpleNamespace(
+        seed=args.seed, tags=200, albums=8, cross_post_ratio=0.5,
+        posts=args.posts, notes=args.notes, note_kb=args.note_kb,
+    )) if r["kind"] == "post"]
+    images = [_post(r) for r in records if r["post_type"] != "note"]
+    notes = [_post(r) for r in records if r["post_type"] == "note"]
+    # Newest first, as the feed sorts; interleaves images and notes.
+    mixed = sorted((_post(r) for r in records), key=lambda post: post["date"], reverse=True)
+
+    categories = {}
+    for post in mixed:
+        categories.setdefault(post["category"], [])
+        if len(categories[post["category"]]) < 12:
+            categories[post["category"]].append(post)
+    home = {
+        "featured": images[0],
+        "latest_update": mixed[0],
+        "favorites": [p for p in mixed if p["is_favorite"]][:12],
+        "categories": categories,
+    }
+
+    def dump(value) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    return {
+        "feed[images]": dump(images[:100]),
+        "feed[notes]": dump(notes[:20]),
+        "feed[mixed]": dump(mixed[:100]),
+        "home": dump(home),
+    }
+
+
+def measure(body: bytes, encoding: str, level: int, repeat: int) -> dict:
+    if encoding == "identity":
+        return {"bytes": len(body), "ratio": 1.0, "cpu_ms": 0.0}
+    kwargs = {"brotli_quality": level} if encoding == "br" else {"gzip_level": level}
+    compressed = compress(body, encoding, **kwargs)
+    started = time.process_time()
+    for _ in range(repeat):
+        compress(body, encoding, **kwargs)
+    cpu = (time.process_time() - started) / repeat
+    return {"bytes": len(compressed), "ratio": round(len(body) / len(compressed), 2), "cpu_ms": round(cpu * 1000, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=400, help="Image posts to generate")
+    parser.add_argument("--notes", type=int, default=40, help="Note posts to generate")
+    parser.add_argument("--note-kb", type=int, default=20, help="Approximate size of each note body, in KB")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=20, help="Compressions timed per setting")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    args = parser.parse_args()
+
+    results = {}
+    for name, body in payloads(args).items():
+        results[name] = {
+            f"{encoding}{'' if level is None else f'-{level}'}": measure(body, encoding, level, args.repeat)
+            for encoding, level in SETTINGS
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    header = f"{'payload':<14} {'setting':<10} {'bytes':>10} {'ratio':>7} {'cpu/resp':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, rows in results.items():
+        for (encoding, level), (setting, stats) in zip(SETTINGS, rows.items()):
+            marker = "*" if (encoding, level) in DEFAULTS else ""
+            print(
+                f"{name:<14} {setting + marker:<10} {stats['bytes']:>10} "
+                f"{stats['ratio']:>6.1f}x {stats['cpu_ms']:>8.3f}ms"
+            )
+        print()
+    if brotli is None:
+        print("brotli is not installed; only gzip was measured.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Import-time budget for ``app.main``, measured with ``python -X importtime``.
+
+    python -m benchmarks.import_budget               # check against the budget
+    python -m benchmarks.import_budget --top 25      # also list the slowest imports
+
+Fails (exit 1) when either:
+
+- importing ``app.main`` takes longer than ``--budget-ms`` (cumulative, as
+  reported by the interpreter; median of ``--runs`` fresh processes), or
+- any module in ``LAZY_MODULES`` is imported at start-up at all. Those are the
+  heavy dependencies the app loads on first use; one creeping back into a
+  module-level import is exactly the regression this guards against.
+
+Runs in fresh subprocesses, so nothing already imported by the caller skews the
+result. Suitable for CI.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+# Must never be imported just by starting the app.
+LAZY_MODULES = ("firebase_admin", "boto3", "botocore", "PIL", "nh3", "httpx", "numpy")
+
+DEFAULT_BUDGET_MS = 1500.0
+
+
+def measure_once() -> dict:
+    env = dict(os.environ)
+    # app.database refuses to import without a URL; nothing connects at import.
+    env.setdefault("DATABASE_URL", "postgresql://budget@localhost:1/budget")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        try:
+            modules[name] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue  # the header line
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=0, help="Print the N slowest modules by self time")
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    totals_ms = [run["app.main"][1] / 1000 for run in runs]
+    total_ms = statistics.median(totals_ms)
+    eager = sorted({name.split(".")[0] for run in runs for name in run} & set(LAZY_MODULES))
+
+    if args.top:
+        slowest = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[: args.top]
+        for name, (self_us, cumulative_us) in slowest:
+            print(f"{self_us / 1000:>8.1f}ms self {cumulative_us / 1000:>8.1f}ms cumulative  {name}")
+        print()
+
+    print(f"import app.main: {total_ms:.0f}ms (median of {args.runs}; budget {args.budget_ms:.0f}ms)")
+    failed = False
+    if total_ms > args.budget_ms:
+        print("FAIL: over the import-time budget")
+        failed = True
+    if eager:
+        print(f"FAIL: imported at start-up, should be lazy: {', '.join(eager)}")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""Drive the API in-process and report latency percentiles and throughput.
+
+    python -m benchmarks.run                      # run everything, print a table
+    python -m benchmarks.run --only posts         # scenarios whose name contains "posts"
+    python -m benchmarks.run --save-baseline main # store benchmarks/baselines/main.json
+    python -m benchmarks.run --compare main       # diff against that baseline
+
+Requests go through an ASGI transport straight into the FastAPI app — no
+sockets, no uvicorn — so the numbers are the app's and the database's, not the
+network's. Seed the database first with ``python -m benchmarks.seed``.
+
+Scenarios:
+
+- ``get_posts`` with every combination of its filters (category, album, tag,
+  is_major, is_favorite) under both sort orders,
+- ``get_post_by_slug`` over a spread of slugs,
+- the album read endpoints,
+- ``ingest_note`` against seeded note-backed posts (with a fresh, newer
+  ``updated_at_ms`` each call, so no call is a stale no-op), and
+- ``upload_image`` with ``--with-upload``. That one really writes to S3: point
+  ``AWS_ENDPOINT_URL`` at a local stand-in (MinIO, moto server) first.
+
+Admin routes are called with the Firebase dependency overridden; nothing here
+needs real credentials.
+
+The shared response cache (app/lib/cache.py) is off unless ``--cache`` says
+otherwise. With it on, every repeat of a read scenario after the warm-up is a
+cache hit, and the numbers measure a dict lookup instead of the queries this
+suite tracks. The mode is saved with the results, and ``--compare`` warns when
+the baseline ran under another.
+
+The handlers run their (synchronous) database work on the event loop, so
+``--concurrency`` above 1 measures queueing inside one worker rather than
+parallel throughput. Keep it at 1 when comparing runs.
+"""
+
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("NOTES_INGEST_SECRET", "benchmark-secret")
+
+import httpx  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.database import SessionLocal  # noqa: E402
+from app.lib.cache import MemoryCache, RedisCache, cache  # noqa: E402
+from app.lib.firebase_auth import verify_firebase_token  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.seed import NOTE_ID_PREFIX, NOTE_SOURCE  # noqa: E402
+
+HERE = Path(__file__).resolve().parent
+BASELINES = HERE / "baselines"
+RESULTS = HERE / "results"
+# A p95 this much slower than the baseline is flagged as a regression.
+REGRESSION_PCT = 20.0
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Called once per request, so each call can vary its path or body.
+    request: Callable[[int], dict]
+    iterations: Optional[int] = None
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def measure(client: httpx.AsyncClient, scenario: Scenario, iterations: int, warmup: int, concurrency: int) -> dict:
+    for index in range(warmup):
+        await client.request(scenario.method, **scenario.request(index))
+
+    latencies: List[float] = []
+    errors = 0
+    bytes_total = 0
+    counter = itertools.count(warmup)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors, bytes_total
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(scenario.method, **scenario.request(next(counter)))
+            latencies.append(time.perf_counter() - started)
+            bytes_total += len(response.content)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(iterations)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": iterations,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "throughput_rps": round(iterations / wall, 2) if wall else 0.0,
+        "avg_bytes": round(bytes_total / iterations) if iterations else 0,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+def sample_data() -> dict:
+    """Pick real values out of the seeded database to aim the scenarios at."""
+    db = SessionLocal()
+    try:
+        category, album = db.execute(text(
+            "SELECT category, album FROM posts GROUP BY category, album ORDER BY count(*) DESC LIMIT 1"
+        )).one()
+        tag = db.execute(text(
+            "SELECT t FROM posts, unnest(tags) t WHERE category = :c GROUP BY t ORDER BY count(*) DESC LIMIT 1"
+        ), {"c": category}).scalar()
+        slugs = db.execute(text("SELECT slug FROM posts ORDER BY random() LIMIT 200")).scalars().all()
+        notes = db.execute(text(
+            "SELECT source_id FROM posts WHERE source = :s AND source_id LIKE :p ORDER BY random() LIMIT 50"
+        ), {"s": NOTE_SOURCE, "p": f"{NOTE_ID_PREFIX}%"}).scalars().all()
+        counts = dict(db.execute(text(
+            "SELECT coalesce(post_type, 'other'), count(*) FROM posts GROUP BY 1"
+        )).all())
+        return {"category": category, "album": album, "tag": tag, "slugs": slugs, "notes": notes, "counts": counts}
+    finally:
+        db.close()
+
+
+def build_scenarios(data: dict, with_upload: bool) -> List[Scenario]:
+    scenarios: List[Scenario] = []
+
+    filters = {
+        "category": data["category"],
+        "album": data["album"],
+        "tag": data["tag"],
+        "is_major": "true",
+        "is_favorite": "true",
+    }
+    for size in range(len(filters) + 1):
+        for keys in itertools.combinations(filters, size):
+            for sort_by in ("date", "updated_at"):
+                params = {key: filters[key] for key in keys if filters[key] is not None}
+                params["sort_by"] = sort_by
+                label = "+".join(keys) or "none"
+                scenarios.append(Scenario(
+                    name=f"get_posts[{label}|{sort_by}]",
+                    method="GET",
+                    request=lambda _i, params=params: {"url": "/api/posts/", "params": params},
+                ))
+
+    slugs = data["slugs"] or ["missing"]
+    scenarios.append(Scenario(
+        name="get_post_by_slug",
+        method="GET",
+        request=lambda i: {"url": f"/api/posts/slug/{slugs[i % len(slugs)]}"},
+    ))
+    scenarios.append(Scenario(
+        name="albums_by_category",
+        method="GET",
+        request=lambda _i: {"url": f"/api/albums/by-category/{data['category']}"},
+    ))
+    scenarios.append(Scenario(
+        name="unique_albums_by_category",
+        method="GET",
+        request=lambda _i: {"url": f"/api/posts/albums/{data['category']}"},
+    ))
+
+    notes = data["notes"]
+    if notes:
+        base_ms = int(time.time() * 1000)
+        body = "<p>" + " ".join(["benchmark"] * 2000) + "</p>"
+
+        def ingest(i: int) -> dict:
+            return {
+                "url": "/api/notes/ingest",
+                "headers": {"X-Ingest-Secret": os.environ["NOTES_INGEST_SECRET"]},
+                "json": {
+                    "source_id": notes[i % len(notes)],
+                    "title": f"Benchmark note {i % len(notes)}",
+                    "body_html": body,
+                    "updated_at_ms": base_ms + i,
+                    "created_at_ms": base_ms,
+                },
+            }
+
+        scenarios.append(Scenario(name="ingest_note", method="POST", request=ingest))
+
+    if with_upload:
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (3000, 2000), color=(120, 80, 40)).save(buffer, format="JPEG", quality=90)
+        image = buffer.getvalue()
+        scenarios.append(Scenario(
+            name="upload_image",
+            method="POST",
+            request=lambda _i: {
+                "url": "/api/upload/image",
+                "params": {"folder": "benchmark"},
+                "files": {"file": ("bench.jpg", image, "image/jpeg")},
+            },
+            iterations=10,
+        ))
+
+    return scenarios
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_table(results: Dict[str, dict], baseline: Optional[Dict[str, dict]] = None) -> List[str]:
+    """Print the results; return the names of scenarios that regressed."""
+    regressions = []
+    header = f"{'scenario':<52} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>9} {'err':>4}"
+    if baseline:
+        header += f" {'Δp50':>8} {'Δp95':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in results.items():
+        line = (
+            f"{name:<52} {stats['p50_ms']:>8.2f}ms {stats['p95_ms']:>7.2f}ms {stats['p99_ms']:>7.2f}ms "
+            f"{stats['throughput_rps']:>9.1f} {stats['errors']:>4}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous:
+            deltas = []
+            for key in ("p50_ms", "p95_ms"):
+                before = previous[key] or 1e-9
+                deltas.append((stats[key] - before) / before * 100)
+            line += f" {deltas[0]:>+7.1f}% {deltas[1]:>+7.1f}%"
+            if deltas[1] > REGRESSION_PCT:
+                regressions.append(name)
+                line += "  <-- regression"
+        print(line)
+    return regressions
+
+
+def use_cache(mode: str) -> None:
+    """Swap the app's cache backend for ``mode``: off, memory or redis."""
+    if mode == "off":
+        cache.backend = None
+    elif mode == "memory":
+        cache.backend = MemoryCache()
+    else:
+        cache.backend = RedisCache(os.getenv("REDIS_URL") or "redis://localhost:6379/0")
+
+
+async def run(args) -> dict:
+    use_cache(args.cache)
+    app.dependency_overrides[verify_firebase_token] = lambda: {"email": "benchmark@localhost"}
+    data = sample_data()
+    scenarios = [s for s in build_scenarios(data, args.with_upload) if not args.only or args.only in s.name]
+
+    results: Dict[str, dict] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for scenario in scenarios:
+            iterations = scenario.iterations or args.iterations
+            results[scenario.name] = await measure(client, scenario, iterations, args.warmup, args.concurrency)
+            print(f"  {scenario.name}: p50 {results[scenario.name]['p50_ms']}ms", file=sys.stderr)
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "cache": args.cache,
+            "rows": data["counts"],
+        },
+        "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="In-flight requests (see module docs)")
+    parser.add_argument("--only", help="Run only scenarios whose name contains this")
+    parser.add_argument(
+        "--cache", choices=("off", "memory", "redis"), default="off",
+        help="Response cache backend (default off: measure the queries, not cache hits)",
+    )
+    parser.add_argument("--with-upload", action="store_true", help="Include upload_image (writes to S3)")
+    parser.add_argument("--save-baseline", metavar="NAME", help="Store results as baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against baselines/NAME.json")
+    parser.add_argument("--fail-on-regression", action="store_true", help=f"Exit 1 if any p95 regresses > {REGRESSION_PCT:.0f}%%")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    RESULTS.mkdir(exist_ok=True)
+    out = RESULTS / f"{report['meta']['timestamp'].replace(':', '')}-{report['meta']['revision']}.json"
+    out.write_text(json.dumps(report, indent=2))
+
+    baseline = None
+    if args.compare:
+        saved = json.loads((BASELINES / f"{args.compare}.json").read_text())
+        baseline = saved["scenarios"]
+        baseline_cache = saved["meta"].get("cache", "unrecorded")
+        if baseline_cache != args.cache:
+            print(
+                f"Warning: baseline {args.compare} ran with cache={baseline_cache}, this run with "
+                f"cache={args.cache}; the deltas compare different things.",
+                file=sys.stderr,
+            )
+    regressions = print_table(report["scenarios"], baseline)
+    print(f"\nResults written to {out.relative_to(HERE.parent)}")
+
+    if args.save_baseline:
+        BASELINES.mkdir(exist_ok=True)
+        (BASELINES / f"{args.save_baseline}.json").write_text(json.dumps(report, indent=2))
+        print(f"Baseline saved as {args.save_baseline}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
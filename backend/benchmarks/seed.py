@@ -0,0 +1,189 @@
+"""Seed a local Postgres with synthetic posts for benchmarking.
+
+    python -m benchmarks.seed --posts 20000 --notes 2000 --note-kb 40
+
+Generates posts across every category with a Zipf-ish tag distribution (a few
+tags on most posts, a long tail on few), cross-posted albums, and note-backed
+posts (``source='w_notes'``) whose bodies are large rich-text HTML — the shape
+that makes feed payloads heavy. Rows are loaded through the same COPY path as
+``import_content.py``, so seeding 100k posts takes seconds.
+
+Every generated row is recognisable (``source`` is ``benchmark`` or its
+``source_id`` starts with ``bench-``; seeded albums' slugs do too), and ``--reset`` deletes exactly those, so
+the seeder never touches real content. It also refuses to run against a
+non-local database unless ``--allow-remote`` is given.
+"""
+
+import argparse
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+from sqlalchemy import text
+
+from app.database import DATABASE_URL, SessionLocal
+from app.lib.bulk_import import import_records
+
+CATEGORIES = ["art", "photo", "music", "projects", "bio", "apparel"]
+SUBJECTS = {"art": "artwork", "photo": "photography", "music": "music", "projects": "projects", "apparel": "apparel"}
+BENCH_SOURCE = "benchmark"
+NOTE_SOURCE = "w_notes"
+NOTE_ID_PREFIX = "bench-"
+ALBUM_PREFIX = "bench-"
+# Dates count back from here rather than from now, so a seed always yields the
+# same rows (and the same feed pages) whenever it runs.
+EPOCH = datetime(2025, 1, 1)
+WORDS = (
+    "light shadow line form colour texture study sketch portrait landscape city "
+    "night morning river stone glass paper ink oil charcoal digital analog loop "
+    "synth drum bass vocal chord melody rhythm build deploy server client cache "
+    "query index async stream render layout motion frame grain lens focus"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def note_html(rng: random.Random, kilobytes: int) -> str:
+    """A rich-text body in the w_notes tag subset, roughly ``kilobytes`` long."""
+    parts = []
+    size = 0
+    while size < kilobytes * 1024:
+        kind = rng.random()
+        if kind < 0.6:
+            block = f"<p>{' '.join(_sentence(rng, rng.randint(6, 18)) for _ in range(rng.randint(1, 4)))}</p>"
+        elif kind < 0.75:
+            items = "".join(f"<li>{_sentence(rng, rng.randint(2, 8))}</li>" for _ in range(rng.randint(2, 6)))
+            block = f"<ul>{items}</ul>"
+        elif kind < 0.85:
+            items = "".join(
+                f"<li{' checked' if rng.random() < 0.5 else ''}>{_sentence(rng, rng.randint(2, 6))}</li>"
+                for _ in range(rng.randint(2, 5))
+            )
+            block = f'<ul data-type="checkbox">{items}</ul>'
+        elif kind < 0.95:
+            block = f"<h2>{_sentence(rng, rng.randint(2, 5))}</h2>"
+        else:
+            block = f"<blockquote><p>{_sentence(rng, 12)}</p></blockquote>"
+        parts.append(block)
+        size += len(block)
+    return "".join(parts)
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def generate(args) -> list:
+    rng = random.Random(args.seed)
+    tags = [f"tag-{index}" for index in range(args.tags)]
+    # Zipf-ish weights: tag-0 is everywhere, the tail is rare.
+    tag_weights = [1 / (rank + 1) for rank in range(len(tags))]
+    albums = {category: [f"{ALBUM_PREFIX}{category}-{index}" for index in range(args.albums)] for category in CATEGORIES}
+
+    records = []
+    for category, subject in SUBJECTS.items():
+        for album in albums[category]:
+            records.append({"kind": "album", "subject_slug": subject, "name": album, "slug": album})
+
+    for index in range(args.posts + args.notes):
+        is_note = index >= args.posts
+        category = rng.choice(CATEGORIES)
+        album = rng.choice(albums[category])
+        cross = [a for a in albums[category] if a != album and rng.random() < args.cross_post_ratio / max(1, args.albums)]
+        date = EPOCH - timedelta(minutes=rng.randint(0, 60 * 24 * 365 * 3))
+        title = _sentence(rng, rng.randint(2, 6)).rstrip(".")
+        record = {
+            "kind": "post",
+            "id": str(_uuid(rng)),
+            "category": category,
+            "album": album,
+            "title": title,
+            "date": date.isoformat(),
+            "tags": sorted(set(rng.choices(tags, weights=tag_weights, k=rng.randint(0, 6)))),
+            "is_major": rng.random() < 0.02,
+            "is_favorite": rng.random() < 0.05,
+            "cross_post_albums": cross,
+            "created_at": date.isoformat(),
+            "updated_at": date.isoformat(),
+        }
+        if is_note:
+            record.update({
+                "post_type": "note",
+                "content_url": note_html(rng, args.note_kb),
+                "thumbnail_url": "",
+                "source": NOTE_SOURCE,
+                "source_id": f"{NOTE_ID_PREFIX}{index}",
+                "is_active": True,
+            })
+        else:
+            key = _uuid(rng)
+            record.update({
+                "post_type": "photo",
+                "description": _sentence(rng, rng.randint(5, 30)) if rng.random() < 0.5 else None,
+                "content_url": f"https://bench-images.s3.us-east-1.amazonaws.com/{category}/{key}.webp",
+                "thumbnail_url": f"https://bench-images.s3.us-east-1.amazonaws.com/{category}/{key}.webp",
+                "source": BENCH_SOURCE,
+            })
+        records.append(record)
+    return records
+
+
+def reset(db) -> int:
+    deleted = db.execute(
+        text("DELETE FROM posts WHERE source = :bench OR (source = :notes AND source_id LIKE :prefix)"),
+        {"bench": BENCH_SOURCE, "notes": NOTE_SOURCE, "prefix": f"{NOTE_ID_PREFIX}%"},
+    ).rowcount
+    db.execute(text("DELETE FROM albums WHERE slug LIKE :prefix"), {"prefix": f"{ALBUM_PREFIX}%"})
+    db.commit()
+    return deleted
+
+
+def seed(args) -> dict:
+    records = generate(args)
+    db = SessionLocal()
+    try:
+        if args.reset:
+            print(f"Removed {reset(db)} previously seeded post(s)")
+        subject_ids = dict(db.execute(text("SELECT slug, id FROM subjects")).all())
+        missing = set(SUBJECTS.values()) - subject_ids.keys()
+        for slug in sorted(missing):
+            subject_ids[slug] = db.execute(
+                text("INSERT INTO subjects (name, slug) VALUES (:name, :slug) RETURNING id"),
+                {"name": slug.title(), "slug": slug},
+            ).scalar_one()
+        db.commit()
+        for record in records:
+            if record["kind"] == "album":
+                record["subject_id"] = str(subject_ids[record.pop("subject_slug")])
+        result = import_records(db, enumerate(records, start=1), strict=True)
+        return result.as_dict()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=5000, help="Image posts to generate")
+    parser.add_argument("--notes", type=int, default=500, help="Note-backed posts to generate")
+    parser.add_argument("--note-kb", type=int, default=20, help="Approximate size of each note body, in KB")
+    parser.add_argument("--tags", type=int, default=200, help="Distinct tags")
+    parser.add_argument("--albums", type=int, default=8, help="Albums per category")
+    parser.add_argument("--cross-post-ratio", type=float, default=0.5, help="Average extra albums per post")
+    parser.add_argument("--seed", type=int, default=1, help="RNG seed; the same seed generates the same data")
+    parser.add_argument("--reset", action="store_true", help="Delete previously seeded rows first")
+    parser.add_argument("--allow-remote", action="store_true", help="Permit a non-local DATABASE_URL")
+    args = parser.parse_args()
+
+    host = urlparse(DATABASE_URL).hostname or ""
+    if host not in {"localhost", "127.0.0.1", "::1", ""} and not args.allow_remote:
+        sys.exit(f"Refusing to seed {host}: pass --allow-remote if this really is a scratch database")
+
+    print(seed(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+-- Indexes behind `GET /api/albums/by-category/{category}?with_stats=true`.
+--
+-- The album grid shows each album's post count, newest post date and a
+-- fallback cover. The route computes them in one query, with a LATERAL
+-- subquery per album over the posts filed in it, either as their primary
+-- `album` or through `cross_post_albums`. These two indexes keep each of those
+-- subqueries an index lookup instead of a scan of posts.
+--
+-- Re-runnable.
+
+-- Primary membership, newest first: the count and max(date) read it, and the
+-- fallback cover is its first row.
+CREATE INDEX IF NOT EXISTS idx_posts_category_album_date
+    ON posts (category, album, date DESC);
+
+-- Cross-post membership: `cross_post_albums @> ARRAY[slug]`.
+CREATE INDEX IF NOT EXISTS idx_posts_cross_post_albums
+    ON posts USING GIN (cross_post_albums);
@@ -0,0 +1,17 @@
+-- Coalescing jobs (see app/lib/jobs.py: enqueue_coalesced).
+--
+-- Some work arrives in bursts where only the last request matters: w_notes
+-- pushes every autosave of a note to /api/notes/ingest. Instead of one job
+-- per push, pushes for the same note share a dedupe_key and collapse into the
+-- single job still waiting to run. That job carries the newest payload, and
+-- its run_at is pushed back on every push: a debounce.
+--
+-- The uniqueness only holds among *pending* jobs. Once a job is claimed, the
+-- next push starts a fresh one rather than being lost to a run that has
+-- already read its payload.
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS dedupe_key VARCHAR(255);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_pending_dedupe_key
+    ON jobs (dedupe_key)
+    WHERE status = 'pending' AND dedupe_key IS NOT NULL;
@@ -0,0 +1,46 @@
+-- Durable background jobs (see app/lib/jobs.py).
+--
+-- Slow work that a request doesn't need to wait for (image post-processing,
+-- S3 cleanup after a delete) is written here as a row and picked up by the
+-- workers every API process runs. A job enqueued in the same transaction as
+-- the write that needs it is committed, or rolled back, together with it.
+--
+-- Workers claim jobs with `SELECT ... FOR UPDATE SKIP LOCKED`, so any number of
+-- them across any number of processes can poll the same table without handing
+-- one job to two workers, and without waiting on each other's row locks.
+--
+-- status: pending -> running -> done
+--                            -> pending again (retry, run_at pushed back)
+--                            -> failed (attempts exhausted)
+--
+-- A running job whose locked_at is older than the lease was abandoned by a
+-- worker that died mid-run; it is claimable again.
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    kind VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_at TIMESTAMP NOT NULL DEFAULT now(),
+    locked_at TIMESTAMP,
+    locked_by VARCHAR(100),
+    last_error TEXT,
+    result JSONB,
+    created_at TIMESTAMP NOT NULL DEFAULT now(),
+    updated_at TIMESTAMP NOT NULL DEFAULT now(),
+    finished_at TIMESTAMP,
+    CONSTRAINT jobs_status_check CHECK (status IN ('pending', 'running', 'done', 'failed'))
+);
+
+-- The claim query: the next due job. Partial, so finished jobs (the bulk of
+-- the table over time) cost nothing.
+CREATE INDEX IF NOT EXISTS idx_jobs_claim
+    ON jobs (run_at)
+    WHERE status IN ('pending', 'running');
+
+-- Pruning finished jobs: DELETE FROM jobs WHERE finished_at < now() - interval '14 days'.
+CREATE INDEX IF NOT EXISTS idx_jobs_finished_at
+    ON jobs (finished_at)
+    WHERE finished_at IS NOT NULL;
@@ -0,0 +1,17 @@
+-- Plain-text excerpt, word count and reading time for note-backed posts.
+--
+-- A note's body is rich-text HTML stored inline in content_url. The feed card
+-- only shows a few lines of it as plain text, but deriving those lines in the
+-- browser meant every feed response carried every note's whole body. These are
+-- computed once instead, when a note is embedded or ingested (see
+-- app/lib/html_text.py), and `GET /api/posts/?include_body=false` leaves the
+-- body out for posts that have an excerpt.
+--
+-- Columns rather than media_meta keys: they describe the text, not media, and
+-- word_count is worth sorting and filtering on. NULL means "not computed";
+-- posts that aren't notes keep NULL, and backfill_post_excerpts.py fills in
+-- notes embedded before this migration.
+
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS excerpt TEXT;
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS word_count INTEGER;
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS reading_minutes INTEGER;
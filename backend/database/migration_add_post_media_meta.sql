@@ -0,0 +1,17 @@
+-- Precomputed facts about a post's media, so the feed can lay out and paint a
+-- tile before a single image byte arrives.
+--
+-- For image posts the keys describe the tile image (thumbnail_url):
+--
+--   {"width": 1000, "height": 750, "color": "#8a6f4e",
+--    "lqip": "data:image/webp;base64,..."}
+--
+-- width/height fix the tile's aspect ratio (the feed used to download every
+-- image just to measure it), color is the dominant colour for the empty tile,
+-- and lqip is a ~16px preview blurred up while the real image loads.
+--
+-- JSONB rather than columns per key: other media kinds (audio) carry different
+-- facts, and none of them is ever filtered on. NULL means "not computed yet";
+-- backfill_media_meta.py fills those in for existing posts.
+
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS media_meta JSONB;
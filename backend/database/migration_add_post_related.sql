@@ -0,0 +1,34 @@
+-- Precomputed "related posts" (see app/lib/related.py).
+--
+-- Each post's best TOP_K neighbours, scored by tag overlap (Jaccard), a shared
+-- album and a shared category, so `GET /api/posts/{id}/related` is a single
+-- index range scan instead of scoring the post against the whole catalogue.
+--
+-- Rows are replaced per post by the `related.recompute` job after a write, or
+-- all at once by `python rebuild_related.py`. Run that once after applying this
+-- migration to fill the table for existing posts.
+--
+-- Both ends cascade: a deleted post's own list and its appearances in other
+-- lists go with it (the delete enqueues a recompute to refill those lists).
+--
+-- Re-runnable.
+
+CREATE TABLE IF NOT EXISTS post_related (
+    post_id UUID NOT NULL REFERENCES posts(id) ON DELETE CASCADE,
+    related_id UUID NOT NULL REFERENCES posts(id) ON DELETE CASCADE,
+    score REAL NOT NULL,
+    rank SMALLINT NOT NULL,
+    PRIMARY KEY (post_id, related_id)
+);
+
+-- The read: one post's list, best first.
+CREATE INDEX IF NOT EXISTS idx_post_related_rank
+    ON post_related (post_id, rank);
+
+-- "Whose list is this post in?", for recomputes and the cascade.
+CREATE INDEX IF NOT EXISTS idx_post_related_related_id
+    ON post_related (related_id);
+
+-- Candidate search in the recompute: posts sharing a tag, `tags && ...`.
+CREATE INDEX IF NOT EXISTS idx_posts_tags
+    ON posts USING GIN (tags);
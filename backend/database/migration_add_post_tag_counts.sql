@@ -0,0 +1,84 @@
+-- Tag facet counts, maintained incrementally.
+--
+-- `GET /api/posts/tags` answers "which tags exist, and on how many posts" for
+-- the feed filters and the admin tag autocomplete. Computing that with an
+-- `unnest(tags) GROUP BY` scans every post on every call, so the answer is kept
+-- in this small aggregate instead and adjusted row-by-row as posts change.
+--
+-- Maintenance lives in triggers rather than in the API routes because posts are
+-- written from several places (admin routes, note ingest, bulk scripts, plain
+-- psql). A trigger cannot be forgotten by a new write path.
+--
+-- A post counts once per distinct tag, per category. Empty tags are ignored.
+--
+-- Re-runnable: the table, index and function are created idempotently, the
+-- triggers are dropped and recreated, and the backfill rebuilds from scratch.
+--
+-- The triggers and the backfill go in in one transaction. CREATE TRIGGER locks
+-- posts against writes (and TRUNCATE locks the counts) until the COMMIT, so no
+-- post is counted by both its trigger and the backfill, or by neither.
+
+CREATE TABLE IF NOT EXISTS post_tag_counts (
+    category VARCHAR(50) NOT NULL,
+    tag TEXT NOT NULL,
+    post_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (category, tag)
+);
+
+-- Case-insensitive prefix search for autocomplete: `lower(tag) LIKE 'ab%'`.
+CREATE INDEX IF NOT EXISTS idx_post_tag_counts_tag_prefix
+    ON post_tag_counts (lower(tag) text_pattern_ops);
+
+CREATE OR REPLACE FUNCTION posts_tag_counts_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE post_tag_counts c
+           SET post_count = c.post_count - 1
+          FROM (SELECT DISTINCT t AS tag FROM unnest(OLD.tags) AS t WHERE t <> '') old_tags
+         WHERE c.category = OLD.category
+           AND c.tag = old_tags.tag;
+
+        DELETE FROM post_tag_counts
+         WHERE category = OLD.category
+           AND post_count <= 0;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO post_tag_counts (category, tag, post_count)
+        SELECT NEW.category, new_tags.tag, 1
+          FROM (SELECT DISTINCT t AS tag FROM unnest(NEW.tags) AS t WHERE t <> '') new_tags
+        ON CONFLICT (category, tag)
+            DO UPDATE SET post_count = post_tag_counts.post_count + 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+BEGIN;
+
+DROP TRIGGER IF EXISTS posts_tag_counts_insert_delete ON posts;
+CREATE TRIGGER posts_tag_counts_insert_delete
+    AFTER INSERT OR DELETE ON posts
+    FOR EACH ROW EXECUTE FUNCTION posts_tag_counts_sync();
+
+-- Only updates that actually move a post between tags or categories touch the
+-- aggregate; an edit to a title or a thumbnail is free.
+DROP TRIGGER IF EXISTS posts_tag_counts_update ON posts;
+CREATE TRIGGER posts_tag_counts_update
+    AFTER UPDATE OF tags, category ON posts
+    FOR EACH ROW
+    WHEN (OLD.tags IS DISTINCT FROM NEW.tags OR OLD.category IS DISTINCT FROM NEW.category)
+    EXECUTE FUNCTION posts_tag_counts_sync();
+
+-- Backfill from the current posts.
+TRUNCATE post_tag_counts;
+
+INSERT INTO post_tag_counts (category, tag, post_count)
+SELECT p.category, t.tag, count(DISTINCT p.id)
+  FROM posts p
+  CROSS JOIN LATERAL unnest(p.tags) AS t(tag)
+ WHERE t.tag <> ''
+ GROUP BY p.category, t.tag;
+
+COMMIT;
@@ -0,0 +1,48 @@
+"""Rebuild the related-posts table (``post_related``) from scratch.
+
+    python rebuild_related.py              # score every pair, replace the table
+    python rebuild_related.py --dry-run    # score and report, write nothing
+    python rebuild_related.py --enqueue    # leave it to a job worker instead
+
+Writes keep the table current incrementally (see ``app/lib/related.py``). This
+is for filling it the first time, after changing the weights or ``RELATED_TOP_K``,
+and for catalogues big enough that the incremental update would touch most of
+it anyway. Scoring is vectorized with NumPy; the table is swapped in one
+transaction, so the site keeps serving the old lists until it commits.
+"""
+
+import argparse
+import asyncio
+
+from app.database import SessionLocal
+from app.lib import jobs, related
+from app.lib.cache import cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Score but don't write")
+    parser.add_argument("--enqueue", action="store_true", help="Queue a related.rebuild job and exit")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.enqueue:
+            job = jobs.enqueue(db, related.REBUILD_JOB)
+            db.commit()
+            print(f"Queued {related.REBUILD_JOB} job {job.id}")
+            return
+        result = related.rebuild_all(db, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    if not args.dry_run:
+        asyncio.run(cache.invalidate("posts"))
+    print(
+        f"{'Would write' if args.dry_run else 'Wrote'} {result['pairs']} pair(s) "
+        f"for {result['posts']} post(s) in {result['seconds']}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""Shared fixtures. Run from backend/: ``python -m pytest -q tests``.
+
+The app module builds its engine at import, so a DATABASE_URL must be set
+before anything under ``app`` is imported. Tests here never open a database
+connection; the placeholder only has to parse.
+"""
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "postgresql://test@localhost:1/test")
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client():
+    """The API with Firebase auth waved through. No lifespan: nothing starts."""
+    from app.main import app
+    from app.lib.firebase_auth import verify_firebase_token
+
+    app.dependency_overrides[verify_firebase_token] = lambda: {"email": "test@example.com"}
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,60 @@
+import io
+import uuid
+from datetime import datetime
+
+from app.lib.bulk_import import POST_COLUMNS, _last_wins, iter_ndjson, post_row
+from app.lib.html_text import text_stats
+from app.routes.export import _line
+
+NOTE_BODY = "<h2>Field notes</h2><p>" + "river stone glass " * 100 + "</p>"
+
+
+def exported_note(**overrides) -> dict:
+    row = {
+        "id": uuid.uuid4(), "slug": "field-notes", "post_type": "note", "category": "projects",
+        "album": "notes", "title": "Field notes", "description": None, "content_url": NOTE_BODY,
+        "thumbnail_url": "", "tags": ["river"], "source": "w_notes", "source_id": "n-1",
+        "date": datetime(2025, 3, 1), "created_at": datetime(2025, 3, 1), "updated_at": datetime(2025, 3, 2),
+        "excerpt": "Stored excerpt", "word_count": 301, "reading_minutes": 2,
+    }
+    row.update(overrides)
+    return row
+
+
+def reimported(row: dict) -> dict:
+    (_, record), = iter_ndjson(io.StringIO(_line("post", row)))
+    return post_row(record)
+
+
+def test_text_stats_survive_an_export_round_trip():
+    row = exported_note()
+    restored = reimported(row)
+    assert {"excerpt", "word_count", "reading_minutes"} <= set(POST_COLUMNS)
+    assert restored["id"] == row["id"]
+    assert (restored["excerpt"], restored["word_count"], restored["reading_minutes"]) == ("Stored excerpt", 301, 2)
+    assert (restored["source"], restored["source_id"]) == ("w_notes", "n-1")
+
+
+def test_notes_without_stats_get_them_computed():
+    restored = reimported(exported_note(excerpt=None, word_count=None, reading_minutes=None))
+    assert {key: restored[key] for key in ("excerpt", "word_count", "reading_minutes")} == text_stats(NOTE_BODY)
+
+
+def test_other_posts_keep_null_stats():
+    restored = reimported(exported_note(post_type="photo", excerpt=None, word_count=None, reading_minutes=None))
+    assert restored.get("excerpt") is None
+
+
+def test_later_rows_win():
+    first, second = uuid.uuid4(), uuid.uuid4()
+    rows = [
+        {"id": first, "title": "old"},
+        {"id": second, "title": "other"},
+        {"id": first, "title": "new"},
+    ]
+    assert _last_wins(rows, lambda row: row["id"]) == [rows[1], rows[2]]
+
+
+def test_rows_without_a_key_are_all_kept():
+    rows = [{"slug": None}, {"slug": None}, {"slug": "a"}, {"slug": "a"}]
+    assert _last_wins(rows, lambda row: row["slug"]) == [rows[0], rows[1], rows[3]]
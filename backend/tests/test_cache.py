@@ -0,0 +1,149 @@
+"""The response cache: the in-memory backend's bounds, and the Redis backend
+(on fakeredis) across two "workers" sharing one server."""
+
+import asyncio
+
+import pytest
+
+from app.lib import cache as cache_module
+from app.lib.cache import MemoryCache, RedisCache, ResponseCache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def body(value: str):
+    return lambda: value.encode()
+
+
+# -- MemoryCache ---------------------------------------------------------------
+
+
+def test_memory_cache_is_bounded():
+    async def scenario():
+        backend = MemoryCache(max_entries=10)
+        for index in range(50):
+            await backend.set(f"k{index}", b"v", 60)
+        assert len(backend) == 10
+        # Least recently used went first.
+        assert await backend.get("k0") is None
+        assert await backend.get("k49") == b"v"
+
+    run(scenario())
+
+
+def test_memory_cache_sweeps_superseded_generations(monkeypatch):
+    async def scenario():
+        clock = [1000.0]
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: clock[0])
+        responses = ResponseCache(MemoryCache(max_entries=1000), ttl=5)
+        for generation in range(20):
+            await responses.get_or_build("posts", "feed", body(f"g{generation}"))
+            await responses.invalidate("posts")
+            clock[0] += 10
+        # Each invalidation strands the previous key; the sweep drops them
+        # although nothing ever reads them again.
+        assert len(responses.backend) <= 2
+
+    run(scenario())
+
+
+def test_memory_cache_eviction_keeps_generations():
+    async def scenario():
+        responses = ResponseCache(MemoryCache(max_entries=3), ttl=60)
+        await responses.invalidate("posts")
+        await responses.invalidate("posts")
+        for index in range(10):
+            await responses.get_or_build("albums", f"k{index}", body("x"))
+        assert await responses.generation("posts") == 2
+
+    run(scenario())
+
+
+# -- RedisCache on fakeredis ---------------------------------------------------
+
+
+def two_workers():
+    server = fakeredis.FakeServer()
+    return [
+        ResponseCache(RedisCache(client=fakeredis.aioredis.FakeRedis(server=server)), ttl=60)
+        for _ in range(2)
+    ]
+
+
+def test_redis_hit_miss_and_invalidate():
+    async def scenario():
+        first, second = two_workers()
+        assert await first.get_or_build("posts", "feed", body("one")) == (b"one", False)
+        # The other worker reads what the first stored.
+        assert await second.get_or_build("posts", "feed", body("two")) == (b"one", True)
+
+        await second.invalidate("posts")
+        assert await first.get_or_build("posts", "feed", body("three")) == (b"three", False)
+
+    run(scenario())
+
+
+def test_only_a_moved_generation_counts_as_an_invalidation():
+    async def scenario():
+        first, second = two_workers()
+        await first.get_or_build("posts", "feed", body("one"))
+        # Learning the current generation for the first time isn't news.
+        await second.get_or_build("posts", "feed", body("one"))
+        assert not second.recently_invalidated(5)
+
+        await first.invalidate("posts")
+        assert first.recently_invalidated(5)
+        # Without a listener, the second worker notices on its next lookup.
+        await second.get_or_build("posts", "feed", body("two"))
+        assert second.recently_invalidated(5)
+        assert not second.recently_invalidated(0)
+
+    run(scenario())
+
+
+def test_redis_pubsub_reaches_the_other_worker():
+    async def scenario():
+        first, second = two_workers()
+        await first.start()
+        await second.start()
+        try:
+            await asyncio.sleep(0.05)
+            await first.invalidate("albums")
+            for _ in range(100):
+                if second._generations.get("albums") == 1:
+                    break
+                await asyncio.sleep(0.01)
+            assert second._generations.get("albums") == 1
+            # ...and it knows to keep reads off a lagging replica for a while.
+            assert second.recently_invalidated(5)
+        finally:
+            await first.stop()
+            await second.stop()
+
+    run(scenario())
+
+
+def test_redis_lock_builds_once_across_workers():
+    calls = []
+
+    async def slow_build():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return b"built"
+
+    async def scenario():
+        first, second = two_workers()
+        results = await asyncio.gather(
+            first.get_or_build("posts", "feed", slow_build),
+            first.get_or_build("posts", "feed", slow_build),
+            second.get_or_build("posts", "feed", slow_build),
+            second.get_or_build("posts", "feed", slow_build),
+        )
+        assert [result[0] for result in results] == [b"built"] * 4
+        assert len(calls) == 1
+
+    run(scenario())
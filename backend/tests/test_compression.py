@@ -0,0 +1,55 @@
+"""Streamed responses: each compressed chunk decodes as soon as it arrives."""
+
+import asyncio
+import zlib
+
+import pytest
+
+from app.lib.compression import CompressionMiddleware
+
+CHUNKS = [f'{{"line": {index}, "text": "{"word " * 40}"}}\n'.encode() for index in range(5)]
+
+
+async def streamed_app(scope, receive, send):
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/x-ndjson")],
+    })
+    for chunk in CHUNKS:
+        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def sent_bodies(accept_encoding: str):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(streamed_app)(scope, receive, send))
+    assert dict(messages[0]["headers"])[b"content-encoding"] == accept_encoding.encode()
+    return [message["body"] for message in messages[1:]]
+
+
+def test_gzip_chunks_decode_as_they_arrive():
+    decoder = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    bodies = sent_bodies("gzip")
+    for chunk, body in zip(CHUNKS, bodies):
+        assert decoder.decompress(body) == chunk
+    decoder.decompress(bodies[-1])
+    assert decoder.eof
+
+
+def test_brotli_chunks_decode_as_they_arrive():
+    brotli = pytest.importorskip("brotli")
+    decoder = brotli.Decompressor()
+    bodies = sent_bodies("br")
+    for chunk, body in zip(CHUNKS, bodies):
+        assert decoder.process(body) == chunk
+    decoder.process(bodies[-1])
+    assert decoder.is_finished()
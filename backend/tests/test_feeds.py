@@ -0,0 +1,18 @@
+from types import SimpleNamespace
+
+from app.lib.subjects import POST_CATEGORIES
+from app.routes import feeds
+
+
+def test_every_post_category_is_listed():
+    assert set(feeds.PAGE_CATEGORIES) == POST_CATEGORIES
+
+
+def test_apparel_posts_link_to_the_shop():
+    row = SimpleNamespace(category="apparel", album="tees 2024", slug="blue-tee")
+    assert feeds._post_url(row) == f"{feeds.SITE_URL}/shop/tees%202024/blue-tee"
+
+
+def test_other_posts_link_to_their_category():
+    row = SimpleNamespace(category="music", album="demos", slug="one")
+    assert feeds._post_url(row) == f"{feeds.SITE_URL}/music/demos/one"
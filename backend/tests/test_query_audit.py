@@ -0,0 +1,56 @@
+"""query_budget around a real route, on an in-memory SQLite stand-in for posts."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.lib import metrics
+from app.lib.query_audit import QueryBudgetExceeded, query_budget
+from app.models.post import Post
+from app.routes.posts import get_post_by_slug
+
+
+@pytest.fixture
+def db():
+    metrics.install_db_hooks()
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        # Untyped columns: the route only has to be able to SELECT them.
+        conn.execute(text(f"CREATE TABLE posts ({', '.join(Post.__table__.columns.keys())})"))
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _lookup(slug, db):
+    try:
+        asyncio.run(get_post_by_slug(slug, db))
+    except HTTPException as exc:
+        assert exc.status_code == 404
+
+
+def test_one_lookup_fits_the_budget(db):
+    with query_budget(max_repeats=1, max_queries=1) as stats:
+        _lookup("first-post", db)
+    assert stats.queries == 1
+
+
+def test_repeated_lookup_raises(db):
+    with pytest.raises(QueryBudgetExceeded, match="repeated 1 statement"):
+        with query_budget(max_repeats=3):
+            # A per-row lookup in a loop: the N+1 the budget is there to catch.
+            for index in range(4):
+                _lookup(f"post-{index}", db)
+
+
+def test_query_count_over_budget_raises(db):
+    with pytest.raises(QueryBudgetExceeded, match="3 queries, budget was 2"):
+        with query_budget(max_queries=2):
+            for index in range(3):
+                _lookup(f"post-{index}", db)
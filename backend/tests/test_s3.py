@@ -0,0 +1,95 @@
+"""Direct uploads against a local S3 stand-in (moto's server mode).
+
+The client is built exactly as in production, from the environment, with
+``S3_ENDPOINT_URL`` pointing at the stand-in. ``S3_ADDRESSING_STYLE`` is left
+empty the way env.example leaves it.
+"""
+
+import httpx
+import pytest
+
+moto_server = pytest.importorskip("moto.server")
+
+BUCKET = "test-bucket"
+
+
+@pytest.fixture
+def s3_stand_in(monkeypatch):
+    from app.lib import s3
+
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    monkeypatch.setenv("S3_ENDPOINT_URL", f"http://{host}:{port}")
+    monkeypatch.setenv("S3_ADDRESSING_STYLE", "")
+    monkeypatch.setenv("S3_PUBLIC_URL", f"http://{host}:{port}/{BUCKET}")
+    monkeypatch.setenv("S3_IMAGES_BUCKET", BUCKET)
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_REGION", "us-east-1")
+    s3.get_s3_client.cache_clear()
+    s3.get_s3_client().create_bucket(Bucket=BUCKET)
+    try:
+        yield s3
+    finally:
+        s3.get_s3_client.cache_clear()
+        server.stop()
+
+
+def test_empty_addressing_style_builds_a_client(s3_stand_in):
+    assert s3_stand_in.get_s3_client().meta.config.s3["addressing_style"] == "auto"
+
+
+def test_presigned_put_round_trip(s3_stand_in):
+    body = b"%PDF-1.4 test"
+    url = s3_stand_in.presign_put("docs/a.pdf", "application/pdf", len(body), 60)
+    response = httpx.put(url, content=body, headers={"Content-Type": "application/pdf"})
+    assert response.status_code == 200
+
+    head = s3_stand_in.head_object("docs/a.pdf")
+    assert head["ContentLength"] == len(body)
+    assert head["ContentType"] == "application/pdf"
+    assert s3_stand_in.get_object_bytes("docs/a.pdf") == body
+
+
+def test_multipart_round_trip(s3_stand_in):
+    upload_id = s3_stand_in.create_multipart_upload("big.bin", "application/octet-stream")
+    url = s3_stand_in.presign_upload_part("big.bin", upload_id, 1, 60)
+    response = httpx.put(url, content=b"x" * 1024)
+    assert response.status_code == 200
+
+    s3_stand_in.complete_multipart_upload(
+        "big.bin", upload_id, [{"PartNumber": 1, "ETag": response.headers["ETag"]}]
+    )
+    assert s3_stand_in.head_object("big.bin")["ContentLength"] == 1024
+
+
+def test_missing_object_heads_as_none(s3_stand_in):
+    assert s3_stand_in.head_object("nope.bin") is None
+
+
+def test_presign_then_complete_through_the_api(s3_stand_in, client):
+    body = b"plain file"
+    presigned = client.post(
+        "/api/upload/presign",
+        json={"filename": "notes.txt", "content_type": "application/pdf", "size": len(body)},
+    )
+    assert presigned.status_code == 200
+    ticket = presigned.json()
+    assert ticket["method"] == "PUT"
+
+    put = httpx.put(ticket["url"], content=body, headers=ticket["headers"])
+    assert put.status_code == 200
+
+    completed = client.post("/api/upload/complete", json={"key": ticket["key"]})
+    assert completed.status_code == 200
+    assert completed.json()["status"] == "ready"
+    assert completed.json()["size"] == len(body)
+
+    s3_stand_in.delete_file_from_s3(completed.json()["url"])
+    assert s3_stand_in.head_object(ticket["key"]) is None
+
+
+def test_complete_unknown_key_is_404(s3_stand_in, client):
+    response = client.post("/api/upload/complete", json={"key": "never-uploaded.bin"})
+    assert response.status_code == 404
@@ -1,5 +1,33 @@
+// Same resolution as API_URL in src/lib/api.ts, on the server side.
+const PRODUCTION_API_URL = 'https://portfolio2-production-0509.up.railway.app';
+
+const apiUrl = () => {
+  if (process.env.VERCEL_ENV === 'production') {
+    return PRODUCTION_API_URL;
+  }
+  const raw = (
+    process.env.NEXT_PUBLIC_API_URL ||
+    process.env.NEXT_PUBLIC_API_BASE_URL ||
+    'http://localhost:8000'
+  ).trim().replace(/\/+$/, '');
+  if (/^https?:\/\//i.test(raw)) {
+    return raw;
+  }
+  return /^(localhost|127\.0\.0\.1)/.test(raw) ? `http://${raw}` : `https://${raw}`;
+};
+
 /** @type {import('next').NextConfig} */
 const nextConfig = {
+  // The sitemap is generated by the API (backend/app/routes/feeds.py) but
+  // served from the site's own origin: /sitemap.xml is what robots.txt and
+  // search consoles know, and a sitemap may only list URLs on its own host.
+  async rewrites() {
+    const api = apiUrl();
+    return [
+      { source: '/sitemap.xml', destination: `${api}/api/sitemap.xml` },
+      { source: '/sitemap-:shard.xml', destination: `${api}/api/sitemap-:shard.xml` },
+    ];
+  },
   images: {
     unoptimized: true,
     remotePatterns: [
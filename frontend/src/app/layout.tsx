@@ -3,6 +3,7 @@ import { Geist, Geist_Mono } from "next/font/google";
 import "./globals.css";
 import LayoutClient from "@/components/layout/LayoutClient";
 import { AuthProvider } from "@/providers/AuthProvider";
+import { API_URL } from "@/lib/api";
 
 const geistSans = Geist({
   variable: "--font-geist-sans",
@@ -43,6 +44,11 @@ export const metadata: Metadata = {
     index: true,
     follow: true,
   },
+  alternates: {
+    types: {
+      "application/atom+xml": `${API_URL}/api/feed.atom`,
+    },
+  },
 };
 
 // JSON-LD WebSite schema for Google sitelinks
@@ -7,6 +7,7 @@ export default function robots(): MetadataRoute.Robots {
             allow: '/',
             disallow: ['/admin/', '/settings/', '/api/'],
         },
+        // Proxied to the API's sitemap (see rewrites() in next.config.js).
         sitemap: 'https://rileydrcelik.com/sitemap.xml',
     }
 }
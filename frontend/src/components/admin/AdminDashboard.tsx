@@ -1,6 +1,6 @@
 'use client';
 
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { motion } from 'framer-motion';
 import {
   PlusIcon,
@@ -8,6 +8,8 @@ import {
   TrashIcon,
   EyeIcon,
 } from '@heroicons/react/24/outline';
+import { useAuth } from '@/providers/AuthProvider';
+import { getAdminStats, type AdminStats } from '@/lib/api';
 
 interface AdminItem {
   id: string;
@@ -48,6 +50,17 @@ const mockItems: AdminItem[] = [
 export default function AdminDashboard() {
   const [items, setItems] = useState<AdminItem[]>(mockItems);
   const [selectedType, setSelectedType] = useState<string>('all');
+  const { token: authToken } = useAuth();
+  const [stats, setStats] = useState<AdminStats | null>(null);
+
+  useEffect(() => {
+    if (!authToken) return;
+    let cancelled = false;
+    getAdminStats(authToken)
+      .then((result) => { if (!cancelled) setStats(result); })
+      .catch((err) => console.error('[Admin] Failed to load stats:', err));
+    return () => { cancelled = true; };
+  }, [authToken]);
 
   const filteredItems = selectedType === 'all'
     ? items
@@ -79,6 +92,57 @@ export default function AdminDashboard() {
           <p className="text-gray-600">Manage your portfolio content</p>
         </div>
 
+        {/* Summary */}
+        {stats && (
+          <div className="mb-8 space-y-4">
+            <div className="grid grid-cols-2 md:grid-cols-4 lg:grid-cols-7 gap-4">
+              {[
+                ['Posts', stats.total_posts],
+                ['Major', stats.major],
+                ['Favorites', stats.favorite],
+                ['From notes', stats.from_notes],
+                ['Authored', stats.authored],
+                ['Untagged', stats.untagged],
+                ['No thumbnail', stats.missing_thumbnails],
+              ].map(([label, value]) => (
+                <div key={label} className="bg-white rounded-lg shadow-md p-4">
+                  <p className="text-sm text-gray-500">{label}</p>
+                  <p className="text-2xl font-semibold text-gray-900">{value}</p>
+                </div>
+              ))}
+            </div>
+
+            <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
+              <div className="bg-white rounded-lg shadow-md p-4">
+                <h2 className="text-sm font-semibold text-gray-900 mb-2">By category</h2>
+                <ul className="text-sm text-gray-700 space-y-1">
+                  {stats.categories.map((category) => (
+                    <li key={category.key}>
+                      <span className="font-medium">{category.key}</span>: {category.posts}
+                      {category.missing_thumbnails > 0 && (
+                        <span className="text-red-600"> ({category.missing_thumbnails} without thumbnail)</span>
+                      )}
+                      <span className="text-gray-500">
+                        {' '}— {category.albums.map((album) => `${album.key} ${album.posts}`).join(', ')}
+                      </span>
+                    </li>
+                  ))}
+                </ul>
+              </div>
+              <div className="bg-white rounded-lg shadow-md p-4">
+                <h2 className="text-sm font-semibold text-gray-900 mb-2">Top tags</h2>
+                <div className="flex flex-wrap gap-2">
+                  {stats.tags.slice(0, 30).map((tag) => (
+                    <span key={tag.key} className="px-2 py-1 rounded-full text-xs font-medium bg-gray-100 text-gray-700">
+                      {tag.key} {tag.posts}
+                    </span>
+                  ))}
+                </div>
+              </div>
+            </div>
+          </div>
+        )}
+
         {/* Actions */}
         <div className="mb-6 flex justify-between items-center">
           <div className="flex space-x-4">
@@ -3,18 +3,11 @@
 import { motion } from 'framer-motion';
 import Link from 'next/link';
 import Image from 'next/image';
-
-interface Album {
-  id: string;
-  name: string;
-  slug: string;
-  description: string;
-  coverImage: string;
-  contentCount: number;
-}
+import type { AlbumWithStats } from '@/lib/api';
 
 interface AlbumGridProps {
-  albums: Album[];
+  /** From getAlbumsWithStats: counts and covers arrive with the albums. */
+  albums: AlbumWithStats[];
 }
 
 export default function AlbumGrid({ albums }: AlbumGridProps) {
@@ -40,20 +33,22 @@ export default function AlbumGrid({ albums }: AlbumGridProps) {
             >
               <Link href={`/music/${album.slug}`}>
                 <div className="aspect-[16/9] w-full overflow-hidden rounded-lg bg-gray-200">
-                  <Image
-                    src={album.coverImage}
-                    alt={album.name}
-                    width={400}
-                    height={225}
-                    className="h-full w-full object-cover object-center group-hover:scale-105 transition-transform duration-300"
-                  />
+                  {album.cover_url && (
+                    <Image
+                      src={album.cover_url}
+                      alt={album.name}
+                      width={400}
+                      height={225}
+                      className="h-full w-full object-cover object-center group-hover:scale-105 transition-transform duration-300"
+                    />
+                  )}
                 </div>
                 <div className="mt-4">
                   <h3 className="text-lg font-semibold text-gray-900 group-hover:text-blue-600 transition-colors">
                     {album.name}
                   </h3>
                   <p className="mt-2 text-sm text-gray-600">{album.description}</p>
-                  <p className="mt-1 text-xs text-gray-500">{album.contentCount} items</p>
+                  <p className="mt-1 text-xs text-gray-500">{album.post_count} {album.post_count === 1 ? 'item' : 'items'}</p>
                 </div>
               </Link>
             </motion.div>
@@ -8,7 +8,7 @@ import { noteExcerpt } from '@/lib/html-text';
 import { imageSets } from '@/data/imageData';
 import ImageModal from '@/components/ui/ImageModal';
 import FeedSkeleton from '@/components/ui/FeedSkeleton';
-import { getPosts, Post, deletePost } from '@/lib/api';
+import { getPost, getPosts, Post, deletePost, type AudioMeta } from '@/lib/api';
 import { useAuth } from '@/providers/AuthProvider';
 
 // Hook for infinite scroll using IntersectionObserver
@@ -99,6 +99,13 @@ interface FeedItem {
   isFavorite?: boolean;
   /** An embedded w_notes note: rendered as a typographic card, not an image. */
   isNote?: boolean;
+  /** Notes: the server-computed card preview, so the card needs no body. */
+  excerpt?: string | null;
+  /** From the post's media_meta: painted before the image arrives. */
+  placeholderColor?: string;
+  blurDataUrl?: string;
+  /** Audio posts: duration and waveform peaks URL from media_meta. */
+  audio?: AudioMeta;
 }
 
 interface FeedProps {
@@ -169,10 +176,13 @@ const findClosestTileShape = (aspectRatio: number): TileShape => {
 // to hold — a one-liner in a tall card is mostly empty space, and a long note in
 // a small square is all ellipsis.
 const findNoteTileShape = (post: Post): TileShape => {
-  const length = noteExcerpt(post.content_url || '', 10000).length;
+  // word_count comes with the post; only notes embedded before it existed are
+  // counted here, and those still carry their body.
+  const words = post.word_count
+    ?? noteExcerpt(post.content_url || '', 10000).split(/\s+/).filter(Boolean).length;
   if (post.is_major) return 'featured-portrait';
-  if (length < 120) return 'minor-square';
-  if (length < 400) return 'minor-landscape';
+  if (words < 20) return 'minor-square';
+  if (words < 70) return 'minor-landscape';
   return 'major-portrait';
 };
 
@@ -180,24 +190,29 @@ const findNoteTileShape = (post: Post): TileShape => {
 const convertPostsToFeedItems = async (posts: Post[]): Promise<FeedItem[]> => {
   // Load all image dimensions in parallel for performance
   const postData = posts.map(post => {
-    const looksLikeText = post.category === 'bio' || (post.content_url && post.content_url.length > 0 && !/^https?:\/\//i.test(post.content_url));
+    const looksLikeText = post.category === 'bio' || post.post_type === 'note' || (post.content_url && post.content_url.length > 0 && !/^https?:\/\//i.test(post.content_url));
     const fallbackImage = looksLikeText ? (post.thumbnail_url || '') : (post.thumbnail_url || post.content_url);
     const primaryGalleryImage = Array.isArray(post.gallery_urls) && post.gallery_urls.length > 0 ? post.gallery_urls[0] : undefined;
     const imageUrl = primaryGalleryImage || fallbackImage;
-    return { post, imageUrl, looksLikeText };
+    // media_meta describes the thumbnail; only trust it when that is what the
+    // tile shows.
+    const meta = post.media_meta && imageUrl === post.thumbnail_url ? post.media_meta : null;
+    return { post, imageUrl, looksLikeText, meta };
   });
 
-  // Notes carry no image; skip the measurement entirely rather than waiting on an
-  // Image load that can only ever fall back to 1x1.
+  // Notes carry no image, and posts with stored dimensions don't need measuring;
+  // only the rest wait on an Image load.
   const dimensions = await Promise.all(
     postData.map(d =>
       d.post.post_type === 'note'
         ? Promise.resolve({ width: 1, height: 1 })
-        : getImageDimensions(d.imageUrl)
+        : d.meta?.width && d.meta?.height
+          ? Promise.resolve({ width: d.meta.width, height: d.meta.height })
+          : getImageDimensions(d.imageUrl)
     )
   );
 
-  return postData.map(({ post, imageUrl, looksLikeText }, index) => {
+  return postData.map(({ post, imageUrl, looksLikeText, meta }, index) => {
     const contentUrl = post.content_url;
     const isAudio = post.category === 'music' || /\.(mp3|wav|ogg|m4a|flac)$/i.test(contentUrl);
     const aspectRatio = dimensions[index].width / dimensions[index].height;
@@ -243,6 +258,10 @@ const convertPostsToFeedItems = async (posts: Post[]): Promise<FeedItem[]> => {
       isActive: post.is_active,
       isFavorite: post.is_favorite,
       isNote: post.post_type === 'note',
+      excerpt: post.excerpt ?? null,
+      placeholderColor: meta?.color,
+      blurDataUrl: meta?.lqip,
+      audio: isAudio ? post.media_meta?.audio : undefined,
     };
   });
 };
@@ -471,10 +490,11 @@ export default function Feed({ directory, activeAlbum = 'all', category, useData
 
         if (useDatabase) {
           // Fetch posts from database with filters
-          const params: { category?: string; limit?: number; album?: string; tag?: string; offset?: number; is_favorite?: boolean } = {
+          const params: { category?: string; limit?: number; album?: string; tag?: string; offset?: number; is_favorite?: boolean; include_body?: boolean } = {
             category,
             limit: fetchLimit,
-            offset: 0
+            offset: 0,
+            include_body: false
           };
 
           if (activeAlbum !== 'all') {
@@ -517,10 +537,11 @@ export default function Feed({ directory, activeAlbum = 'all', category, useData
     isFetchingRef.current = true;
     setIsFetchingMore(true);
     try {
-      const params: { category?: string; limit?: number; album?: string; tag?: string; offset?: number; is_favorite?: boolean } = {
+      const params: { category?: string; limit?: number; album?: string; tag?: string; offset?: number; is_favorite?: boolean; include_body?: boolean } = {
         category,
         limit: fetchLimit,
-        offset: offsetRef.current
+        offset: offsetRef.current,
+        include_body: false
       };
 
       if (activeAlbum !== 'all') {
@@ -583,6 +604,19 @@ export default function Feed({ directory, activeAlbum = 'all', category, useData
 
     setSelectedImage(item);
     setIsModalOpen(true);
+
+    // The feed loads notes without their body; fetch it for the modal.
+    if (item.isNote && item.postId && !item.contentUrl) {
+      getPost(item.postId)
+        .then((full) => {
+          setSelectedImage((current) =>
+            current?.postId === full.id
+              ? { ...current, contentUrl: full.content_url, rawPost: full }
+              : current
+          );
+        })
+        .catch((err) => console.error('[Feed] Error loading note body:', err));
+    }
   };
 
   const handleCloseModal = () => {
@@ -740,6 +774,7 @@ export default function Feed({ directory, activeAlbum = 'all', category, useData
             postId={selectedImage.postId}
             contentUrl={selectedImage.contentUrl}
             isAudio={selectedImage.isAudio}
+            audioMeta={selectedImage.audio}
             slug={selectedImage.slug}
             category={selectedImage.category}
             album={selectedImage.album}
@@ -7,7 +7,7 @@ import Image from 'next/image';
 import Link from 'next/link';
 import { Tooltip } from '@chakra-ui/react';
 import GlassTooltipLabel from '@/components/ui/GlassTooltipLabel';
-import { getPosts, Post } from '@/lib/api';
+import { getHome, Post } from '@/lib/api';
 
 export default function SplashSection() {
   const [scrollY, setScrollY] = useState(0);
@@ -41,36 +41,55 @@ export default function SplashSection() {
     return () => window.removeEventListener('scroll', handleScroll);
   }, []);
 
+  // Last Updated Date logic
+  const [lastUpdated, setLastUpdated] = useState<string>('');
+
   useEffect(() => {
-    const fetchFeatured = async () => {
-      try {
-        // 1. Check cache first for instant load
-        const cached = localStorage.getItem('splash_featured_post');
-        if (cached) {
-          try {
-            const parsed = JSON.parse(cached);
-            setFeaturedPost(parsed);
-            setIsLoadingPost(false); // Show cached content immediately
-          } catch (e) {
-            console.error('[SplashSection] Failed to parse cached post:', e);
-          }
+    // One request for both the featured post and the "last updated" date.
+    const fetchHome = async () => {
+      // 1. Check cache first for instant load
+      const cached = localStorage.getItem('splash_featured_post');
+      if (cached) {
+        try {
+          const parsed = JSON.parse(cached);
+          setFeaturedPost(parsed);
+          setIsLoadingPost(false); // Show cached content immediately
+        } catch (e) {
+          console.error('[SplashSection] Failed to parse cached post:', e);
         }
+      }
+      const cachedDate = localStorage.getItem('splash_last_updated');
+      if (cachedDate) {
+        setLastUpdated(cachedDate);
+      }
 
-        // 2. Fetch fresh data in background
-        const posts = await getPosts({ is_major: true, limit: 1 });
+      // 2. Fetch fresh data in background
+      try {
+        const home = await getHome();
 
-        if (posts.length > 0) {
-          const newPost = posts[0];
-          setFeaturedPost(newPost);
+        if (home.featured) {
+          setFeaturedPost(home.featured);
           // Update cache
-          localStorage.setItem('splash_featured_post', JSON.stringify(newPost));
+          localStorage.setItem('splash_featured_post', JSON.stringify(home.featured));
         } else {
           if (!cached) setFeaturedPost(null);
         }
+
+        if (home.latest_update) {
+          const dateObj = new Date(home.latest_update.updated_at || home.latest_update.date);
+          const formattedDate = dateObj.toLocaleDateString('en-US', {
+            month: 'long',
+            day: 'numeric',
+            year: 'numeric'
+          });
+
+          setLastUpdated(formattedDate);
+          localStorage.setItem('splash_last_updated', formattedDate);
+        }
       } catch (error) {
-        console.error('[SplashSection] Failed to fetch featured post:', error);
+        console.error('[SplashSection] Failed to fetch home:', error);
         // Keep showing cached version if available, otherwise null
-        if (!localStorage.getItem('splash_featured_post')) {
+        if (!cached) {
           setFeaturedPost(null);
         }
       } finally {
@@ -78,7 +97,7 @@ export default function SplashSection() {
       }
     };
 
-    fetchFeatured();
+    fetchHome();
   }, []);
 
   const featuredImageUrl = useMemo(() => {
@@ -150,39 +169,6 @@ export default function SplashSection() {
     }
   }, [featuredImageUrl, imageLoaded]);
 
-  // Last Updated Date logic
-  const [lastUpdated, setLastUpdated] = useState<string>('');
-
-  useEffect(() => {
-    // 1. Check cache first for instant load
-    // We try to verify if there's a stored date
-    const cachedDate = localStorage.getItem('splash_last_updated');
-    if (cachedDate) {
-      setLastUpdated(cachedDate);
-    }
-
-    // 2. Fetch fresh data
-    const fetchLastUpdated = async () => {
-      try {
-        const posts = await getPosts({ limit: 1, sort_by: 'updated_at' });
-        if (posts.length > 0) {
-          const dateObj = new Date(posts[0].updated_at || posts[0].date);
-          const formattedDate = dateObj.toLocaleDateString('en-US', {
-            month: 'long',
-            day: 'numeric',
-            year: 'numeric'
-          });
-
-          setLastUpdated(formattedDate);
-          localStorage.setItem('splash_last_updated', formattedDate);
-        }
-      } catch (error) {
-        console.error('[SplashSection] Failed to fetch last updated:', error);
-      }
-    };
-
-    fetchLastUpdated();
-  }, []);
 
   return (
     <>
@@ -6,9 +6,11 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { X, Trash2, Star, Pencil } from 'lucide-react';
 import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
-import { type Post, updatePost } from '@/lib/api';
+import { type AudioMeta, type Post, updatePost } from '@/lib/api';
 import { useAuth } from '@/providers/AuthProvider';
 import EditPostModal from './EditPostModal';
+import Waveform, { formatDuration } from './Waveform';
+import RelatedPosts from './RelatedPosts';
 
 interface ImageModalProps {
   isOpen: boolean;
@@ -22,6 +24,8 @@ interface ImageModalProps {
   onDelete?: (postId: string) => void;
   contentUrl?: string;
   isAudio?: boolean;
+  /** Duration and waveform peaks for audio posts (from media_meta). */
+  audioMeta?: AudioMeta;
   slug?: string;
   category?: string;
   album?: string;
@@ -51,6 +55,7 @@ export default function ImageModal({
   onDelete,
   contentUrl,
   isAudio,
+  audioMeta,
   slug,
   category,
   album,
@@ -77,6 +82,8 @@ export default function ImageModal({
   const previousScrollRef = useRef(0);
   const [mounted, setMounted] = useState(false);
   const [activeImageIndex, setActiveImageIndex] = useState(0);
+  const audioRef = useRef<HTMLAudioElement | null>(null);
+  const [audioProgress, setAudioProgress] = useState(0);
 
   const normalizeCandidates = (...values: Array<string | null | undefined>) => {
     const unique = new Set<string>();
@@ -420,6 +427,8 @@ export default function ImageModal({
                       </div>
                     )}
 
+                    {postId && <RelatedPosts postId={postId} />}
+
                     <div>
                       <h3 className="text-lg font-semibold text-white mb-3">Technical Details</h3>
                       <div className="space-y-2 text-white/80">
@@ -464,12 +473,36 @@ export default function ImageModal({
                         ))}
                       </div>
                     )}
+                    {isAudio && contentUrl && audioMeta?.peaks_url && (
+                      <div className="flex items-center gap-3">
+                        <Waveform
+                          peaksUrl={audioMeta.peaks_url}
+                          bars={128}
+                          progress={audioProgress}
+                          onSeek={(fraction) => {
+                            const audio = audioRef.current;
+                            if (audio && Number.isFinite(audio.duration)) {
+                              audio.currentTime = fraction * audio.duration;
+                            }
+                          }}
+                          className="h-16 flex-1"
+                        />
+                        {formatDuration(audioMeta.duration) && (
+                          <span className="text-sm text-white/70 tabular-nums">{formatDuration(audioMeta.duration)}</span>
+                        )}
+                      </div>
+                    )}
                     {isAudio && contentUrl && (
                       <audio
+                        ref={audioRef}
                         controls
                         autoPlay
                         src={contentUrl}
                         className="w-full"
+                        onTimeUpdate={(event) => {
+                          const { currentTime, duration } = event.currentTarget;
+                          setAudioProgress(duration ? currentTime / duration : 0);
+                        }}
                       >
                         Your browser does not support the audio element.
                       </audio>
@@ -512,6 +545,8 @@ export default function ImageModal({
                         </div>
                       )}
 
+                      {postId && <RelatedPosts postId={postId} />}
+
                       {!isShop && (
                         <div>
                           <h3 className="text-lg font-semibold text-white mb-3">Technical Details</h3>
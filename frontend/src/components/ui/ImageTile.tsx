@@ -2,6 +2,8 @@
 
 import { motion } from 'framer-motion';
 import Image from 'next/image';
+import type { AudioMeta } from '@/lib/api';
+import Waveform, { formatDuration } from './Waveform';
 
 interface ImageTileProps {
   item: {
@@ -14,6 +16,10 @@ interface ImageTileProps {
     price?: number | null;
     isActive?: boolean;
     isFavorite?: boolean;
+    placeholderColor?: string;
+    blurDataUrl?: string;
+    /** Audio posts: duration and waveform, drawn over the cover. */
+    audio?: AudioMeta;
   };
   index: number;
 }
@@ -23,7 +29,11 @@ export default function ImageTile({ item, index }: ImageTileProps) {
 
   return (
     <div className="group cursor-pointer h-full">
-      <div className="relative overflow-hidden rounded-2xl shadow-lg hover:shadow-xl transition-shadow duration-300 h-full">
+      <div
+        className="relative overflow-hidden rounded-2xl shadow-lg hover:shadow-xl transition-shadow duration-300 h-full"
+        // Dominant colour fills the tile until the preview/image paints over it.
+        style={item.placeholderColor ? { backgroundColor: item.placeholderColor } : undefined}
+      >
         {isText ? (
           <div className="absolute inset-0 bg-gradient-to-br from-black via-black/80 to-black/60 text-white p-6 flex flex-col justify-end">
             <div className="space-y-3">
@@ -39,9 +49,20 @@ export default function ImageTile({ item, index }: ImageTileProps) {
             className="object-cover group-hover:scale-105 transition-transform duration-300"
             loading={index === 0 ? "eager" : "lazy"}
             sizes="(max-width: 768px) 100vw, (max-width: 1200px) 50vw, 33vw"
+            placeholder={item.blurDataUrl ? 'blur' : 'empty'}
+            blurDataURL={item.blurDataUrl}
           />
         )}
 
+        {item.audio?.peaks_url && (
+          <div className="absolute inset-x-0 bottom-0 z-10 flex items-end gap-2 px-3 pb-3 pt-8 bg-gradient-to-t from-black/60 to-transparent pointer-events-none">
+            <Waveform peaksUrl={item.audio.peaks_url} bars={48} className="h-8 flex-1" />
+            {formatDuration(item.audio.duration) && (
+              <span className="text-xs text-white/90 tabular-nums">{formatDuration(item.audio.duration)}</span>
+            )}
+          </div>
+        )}
+
         {/* Active Project Indicator */}
         {item.isActive && (
           <div className="absolute top-3 right-3 z-10">
@@ -15,7 +15,10 @@ interface NoteTileProps {
     description: string;
     // The note body's sanitized HTML. Text posts store content inline rather
     // than as an S3 URL — the excerpt is derived from it, never rendered raw.
+    // Empty when the feed loaded the post without its body.
     contentUrl?: string;
+    // Server-computed preview (posts.excerpt); preferred over deriving one.
+    excerpt?: string | null;
     date?: string;
     isFavorite?: boolean;
   };
@@ -36,7 +39,11 @@ export default function NoteTile({ item }: NoteTileProps) {
   // Prefer an explicit description if one was ever set; otherwise derive the
   // preview from the body, the same way the notes app renders its own previews.
   const description = item.description?.trim();
-  const preview = notePreview(item.contentUrl || '');
+  // A stored excerpt ends in an ellipsis exactly when it was clipped, the
+  // same as notePreview's text.
+  const preview = item.excerpt != null
+    ? { text: item.excerpt, truncated: item.excerpt.endsWith('…') }
+    : notePreview(item.contentUrl || '');
   const excerpt = description || preview.text;
   // Only the derived preview knows whether it clipped the body; an explicit
   // description is authored copy and stands on its own.
@@ -16,7 +16,7 @@ import {
   PaperClipIcon,
   SpeakerWaveIcon,
 } from '@heroicons/react/24/outline';
-import { getAvailableNotes, embedNote, type AvailableNote, createPost, uploadImage, getAlbumsByCategory, createAlbum, type PostCreate } from '@/lib/api';
+import { getAvailableNotes, embedNote, type AvailableNote, createPost, uploadImage, getAlbumsByCategory, getTagCounts, createAlbum, type MediaMeta, type PostCreate } from '@/lib/api';
 import MarkdownEditor from './MarkdownEditor';
 import { useAuth } from '@/providers/AuthProvider';
 
@@ -193,6 +193,7 @@ export default function PostModal({ isOpen, onClose }: PostModalProps) {
   const [date, setDate] = useState(getCurrentESTDateTime());
   const [tags, setTags] = useState<string[]>([]);
   const [tagInput, setTagInput] = useState<string>('');
+  const [tagSuggestions, setTagSuggestions] = useState<string[]>([]);
   const [isMajor, setIsMajor] = useState(false);
   const [isActive, setIsActive] = useState(false);
   const [isSubmitting, setIsSubmitting] = useState(false);
@@ -347,6 +348,27 @@ export default function PostModal({ isOpen, onClose }: PostModalProps) {
     }
   };
 
+  // Autocomplete from tags already in use in this subject, so a series keeps
+  // one spelling of its tags instead of drifting ("oil", "Oil", "oils").
+  useEffect(() => {
+    const prefix = tagInput.trim();
+    if (!selectedSubject || !prefix) {
+      setTagSuggestions([]);
+      return;
+    }
+    const category = selectedSubject === 'shop' ? 'apparel' : selectedSubject;
+    const timer = setTimeout(async () => {
+      try {
+        const counts = await getTagCounts({ category, prefix, limit: 10 });
+        setTagSuggestions(Object.keys(counts).filter((tag) => !tags.includes(tag)));
+      } catch (err) {
+        console.error('[PostModal] Error fetching tag suggestions:', err);
+        setTagSuggestions([]);
+      }
+    }, 150);
+    return () => clearTimeout(timer);
+  }, [tagInput, selectedSubject, tags]);
+
   const handleAddTag = () => {
     const trimmedTag = tagInput.trim();
     if (trimmedTag && !tags.includes(trimmedTag)) {
@@ -664,6 +686,10 @@ export default function PostModal({ isOpen, onClose }: PostModalProps) {
       // Upload file to S3 first, then get the URL
       let uploadedContentUrl = contentUrl;
       let finalThumbnailUrl = thumbnailPreview || '';
+      // Dimensions/colour/LQIP of whichever upload ends up as the tile image.
+      let thumbnailMeta: MediaMeta | null = null;
+      // Duration and waveform peaks of an uploaded audio file.
+      let audioMeta: MediaMeta['audio'] | undefined;
       let uploadedHeroUrl: string | null = null;
       let splashImageUrl = selectedSubject === 'projects' ? finalThumbnailUrl : null;
       let galleryUrls: string[] = [];
@@ -702,11 +728,13 @@ export default function PostModal({ isOpen, onClose }: PostModalProps) {
               }
               const thumbnailUpload = await uploadImage(compressedThumb, 'thumbnails', authToken);
               finalThumbnailUrl = thumbnailUpload.url;
+              thumbnailMeta = thumbnailUpload.media_meta ?? null;
             } catch (thumbErr) {
               console.warn('[PostModal] Thumbnail compression failed for shop, uploading original:', thumbErr);
               if (authToken) {
                 const fallbackThumbUpload = await uploadImage(thumbnailFile, 'thumbnails', authToken);
                 finalThumbnailUrl = fallbackThumbUpload.url;
+                thumbnailMeta = fallbackThumbUpload.media_meta ?? null;
               } else {
                 finalThumbnailUrl = uploadedHeroUrl || finalThumbnailUrl;
               }
@@ -736,6 +764,7 @@ export default function PostModal({ isOpen, onClose }: PostModalProps) {
           uploadedContentUrl = uploadResult.url;
           setContentUrl(uploadResult.url);
           console.log('[PostModal] File uploaded successfully:', uploadResult.url);
+          audioMeta = uploadResult.media_meta?.audio;
           if (isMusic) {
             if (!thumbnailFile) {
               throw new Error('Thumbnail image is required for audio posts.');
@@ -747,6 +776,7 @@ export default function PostModal({ isOpen, onClose }: PostModalProps) {
             }
             const thumbnailUpload = await uploadImage(compressedThumb, 'thumbnails', authToken);
             finalThumbnailUrl = thumbnailUpload.url;
+            thumbnailMeta = thumbnailUpload.media_meta ?? null;
             console.log('[PostModal] Thumbnail uploaded successfully:', thumbnailUpload.url);
           } else if (isFilePost) {
             if (!thumbnailFile) {
@@ -760,6 +790,7 @@ export default function PostModal({ isOpen, onClose }: PostModalProps) {
             }
             const thumbnailUpload = await uploadImage(compressedThumb, 'thumbnails', authToken);
             finalThumbnailUrl = thumbnailUpload.url;
+            thumbnailMeta = thumbnailUpload.media_meta ?? null;
             console.log('[PostModal] Thumbnail uploaded successfully:', thumbnailUpload.url);
           } else {
             try {
@@ -770,10 +801,12 @@ export default function PostModal({ isOpen, onClose }: PostModalProps) {
               }
               const thumbnailUpload = await uploadImage(compressedFile, 'thumbnails', authToken);
               finalThumbnailUrl = thumbnailUpload.url;
+              thumbnailMeta = thumbnailUpload.media_meta ?? null;
               console.log('[PostModal] Thumbnail uploaded successfully:', thumbnailUpload.url);
             } catch (thumbError) {
               console.warn('[PostModal] Thumbnail compression/upload failed, falling back to original image:', thumbError);
               finalThumbnailUrl = uploadResult.url;
+              thumbnailMeta = uploadResult.media_meta ?? null;
             }
           }
         } catch (err) {
@@ -831,6 +864,7 @@ export default function PostModal({ isOpen, onClose }: PostModalProps) {
         is_active: isActive,
         post_type: selectedSubject === 'bio' ? postType : undefined,
         cross_post_albums: crossPostAlbums,
+        media_meta: audioMeta ? { ...(thumbnailMeta ?? {}), audio: audioMeta } : thumbnailMeta,
       };
 
       if (isShop) {
@@ -1481,9 +1515,15 @@ export default function PostModal({ isOpen, onClose }: PostModalProps) {
                           value={tagInput}
                           onChange={(e) => setTagInput(e.target.value)}
                           onKeyDown={handleTagInputKeyDown}
+                          list="post-modal-tag-suggestions"
                           placeholder="Enter a tag and press Enter"
                           className="flex-1 p-3 border border-white/30 bg-white/10 text-white rounded-lg focus:ring-2 focus:ring-white/50 focus:border-white/50 placeholder-white/50"
                         />
+                        <datalist id="post-modal-tag-suggestions">
+                          {tagSuggestions.map((tag) => (
+                            <option key={tag} value={tag} />
+                          ))}
+                        </datalist>
                         <button
                           type="button"
                           onClick={handleAddTag}
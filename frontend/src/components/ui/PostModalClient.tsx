@@ -3,6 +3,7 @@
 import { useRouter } from 'next/navigation';
 import { useState } from 'react';
 import ImageModal from '@/components/ui/ImageModal';
+import type { MediaMeta } from '@/lib/api';
 
 interface PostModalClientProps {
   post: {
@@ -20,6 +21,7 @@ interface PostModalClientProps {
     album: string;
     price?: number | null;
     gallery_urls?: string[] | null;
+    media_meta?: MediaMeta | null;
   };
   fallbackHref: string;
 }
@@ -68,6 +70,7 @@ export default function PostModalClient({ post: initialPost, fallbackHref }: Pos
         tags={post.tags}
         contentUrl={post.content_url}
         isAudio={isAudio}
+        audioMeta={post.media_meta?.audio}
         slug={post.slug}
         category={post.category}
         album={post.album}
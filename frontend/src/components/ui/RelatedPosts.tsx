@@ -0,0 +1,65 @@
+'use client';
+
+/**
+ * "More like this" for a post modal: a row of the post's precomputed neighbours
+ * (backend app/lib/related.py), linking to their detail pages.
+ */
+
+import { useEffect, useState } from 'react';
+import Link from 'next/link';
+import { getRelatedPosts, type Post } from '@/lib/api';
+
+interface RelatedPostsProps {
+  postId: string;
+  limit?: number;
+}
+
+export default function RelatedPosts({ postId, limit = 6 }: RelatedPostsProps) {
+  const [posts, setPosts] = useState<Post[]>([]);
+
+  useEffect(() => {
+    let cancelled = false;
+    getRelatedPosts(postId, limit).then((related) => {
+      if (!cancelled) setPosts(related);
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [postId, limit]);
+
+  if (!posts.length) return null;
+
+  return (
+    <div>
+      <h3 className="text-lg font-semibold text-white mb-3">More like this</h3>
+      <div className="grid grid-cols-3 gap-2">
+        {posts.map((post) => {
+          const href = `/${encodeURIComponent(post.category)}/${encodeURIComponent(post.album)}/${encodeURIComponent(post.slug)}`;
+          const image = post.thumbnail_url && /^https?:\/\//i.test(post.thumbnail_url) ? post.thumbnail_url : null;
+          return (
+            <Link
+              key={post.id}
+              href={href}
+              className="group relative block aspect-square overflow-hidden rounded-lg border border-white/10 bg-neutral-900"
+              style={post.media_meta?.color ? { backgroundColor: post.media_meta.color } : undefined}
+              title={post.title}
+            >
+              {image ? (
+                <img
+                  src={image}
+                  alt={post.title}
+                  loading="lazy"
+                  className="h-full w-full object-cover transition-transform duration-300 group-hover:scale-105"
+                />
+              ) : (
+                <span className="flex h-full w-full items-end p-2 text-xs leading-snug text-white/70 line-clamp-4">
+                  {post.title}
+                </span>
+              )}
+            </Link>
+          );
+        })}
+      </div>
+    </div>
+  );
+}
@@ -0,0 +1,106 @@
+'use client';
+
+/**
+ * Waveform drawn from a post's precomputed peaks sidecar (a few KB of JSON; see
+ * backend app/lib/audio.py), so audio posts show their shape without the
+ * browser downloading or decoding the track.
+ */
+
+import { useEffect, useMemo, useState } from 'react';
+import { getWaveformPeaks } from '@/lib/api';
+
+interface WaveformProps {
+  peaksUrl: string;
+  /** Bars to draw; the sidecar's peaks are reduced to this many. */
+  bars?: number;
+  /** Played fraction, 0-1, drawn in the played colour. */
+  progress?: number;
+  /** Called with the clicked position as a fraction, 0-1. */
+  onSeek?: (fraction: number) => void;
+  className?: string;
+}
+
+// One fetch per sidecar, shared by every tile and modal that shows it.
+const peaksCache = new Map<string, Promise<number[] | null>>();
+
+function loadPeaks(url: string): Promise<number[] | null> {
+  let pending = peaksCache.get(url);
+  if (!pending) {
+    pending = getWaveformPeaks(url).then((data) => data?.peaks ?? null);
+    peaksCache.set(url, pending);
+  }
+  return pending;
+}
+
+function reduce(peaks: number[], bars: number): number[] {
+  if (peaks.length <= bars) return peaks;
+  const size = peaks.length / bars;
+  return Array.from({ length: bars }, (_, bar) => {
+    let loudest = 0;
+    for (let i = Math.floor(bar * size); i < Math.floor((bar + 1) * size); i++) {
+      loudest = Math.max(loudest, peaks[i]);
+    }
+    return loudest;
+  });
+}
+
+export default function Waveform({ peaksUrl, bars = 64, progress = 0, onSeek, className }: WaveformProps) {
+  const [peaks, setPeaks] = useState<number[] | null>(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    loadPeaks(peaksUrl).then((loaded) => {
+      if (!cancelled) setPeaks(loaded);
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [peaksUrl]);
+
+  const heights = useMemo(() => (peaks ? reduce(peaks, bars) : []), [peaks, bars]);
+  if (!heights.length) return null;
+
+  const playedBars = Math.round(progress * heights.length);
+
+  return (
+    <svg
+      viewBox={`0 0 ${heights.length * 2} 100`}
+      preserveAspectRatio="none"
+      className={className}
+      role={onSeek ? 'slider' : 'img'}
+      aria-label="Waveform"
+      aria-valuenow={onSeek ? Math.round(progress * 100) : undefined}
+      onClick={
+        onSeek
+          ? (event) => {
+              const box = event.currentTarget.getBoundingClientRect();
+              onSeek(Math.min(1, Math.max(0, (event.clientX - box.left) / box.width)));
+            }
+          : undefined
+      }
+      style={onSeek ? { cursor: 'pointer' } : undefined}
+    >
+      {heights.map((peak, index) => {
+        // Centre-aligned bars, with a floor so silence still reads as a line.
+        const height = Math.max(4, (peak / 255) * 100);
+        return (
+          <rect
+            key={index}
+            x={index * 2 + 0.25}
+            y={(100 - height) / 2}
+            width={1.5}
+            height={height}
+            rx={0.75}
+            fill={index < playedBars ? 'rgba(255,255,255,0.95)' : 'rgba(255,255,255,0.45)'}
+          />
+        );
+      })}
+    </svg>
+  );
+}
+
+export function formatDuration(seconds?: number): string | null {
+  if (seconds === undefined || !Number.isFinite(seconds)) return null;
+  const whole = Math.round(seconds);
+  return `${Math.floor(whole / 60)}:${String(whole % 60).padStart(2, '0')}`;
+}
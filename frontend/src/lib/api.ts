@@ -50,7 +50,7 @@ const buildUrl = (host: string): string => {
   return `https://${host}`;
 };
 
-const API_URL = buildUrl(resolveHost());
+export const API_URL = buildUrl(resolveHost());
 const POSTS_ENDPOINT = `${API_URL}/api/posts/`;
 
 /**
@@ -81,7 +81,53 @@ function apiErrorMessage(body: unknown, fallback: string): string {
 
 const ALBUMS_ENDPOINT = `${API_URL}/api/posts/albums/`;
 const UPLOAD_IMAGE_ENDPOINT = `${API_URL}/api/upload/image`;
+const UPLOAD_PRESIGN_ENDPOINT = `${API_URL}/api/upload/presign`;
+const UPLOAD_COMPLETE_ENDPOINT = `${API_URL}/api/upload/complete`;
+const UPLOAD_STATUS_ENDPOINT = `${API_URL}/api/upload/status`;
 const CREATE_ALBUM_ENDPOINT = `${API_URL}/api/albums/create-by-category`;
+const ALBUMS_BY_CATEGORY_ENDPOINT = `${API_URL}/api/albums/by-category/`;
+
+/** Precomputed at upload (see backend app/lib/images.py) so tiles can be laid
+ * out and painted before the image loads. Absent on posts not yet backfilled. */
+export interface MediaMeta {
+  width?: number;
+  height?: number;
+  /** Dominant colour, `#rrggbb`. */
+  color?: string;
+  /** Tiny preview as a data URL, for `next/image`'s `blurDataURL`. */
+  lqip?: string;
+  /** Audio posts: computed from the audio file (see backend app/lib/audio.py). */
+  audio?: AudioMeta;
+}
+
+export interface AudioMeta {
+  /** Seconds. */
+  duration?: number;
+  /** Average bits per second over the file. */
+  bitrate?: number;
+  sample_rate?: number;
+  channels?: number;
+  /** JSON sidecar holding the waveform, fetched with `getWaveformPeaks`. */
+  peaks_url?: string;
+}
+
+/** Waveform sidecar: `length` values, 0-255, loudest slice = 255. */
+export interface WaveformPeaks {
+  version: number;
+  duration: number;
+  length: number;
+  peaks: number[];
+}
+
+export async function getWaveformPeaks(peaksUrl: string): Promise<WaveformPeaks | null> {
+  try {
+    const response = await fetch(peaksUrl);
+    if (!response.ok) return null;
+    return (await response.json()) as WaveformPeaks;
+  } catch {
+    return null;
+  }
+}
 
 export interface Post {
   id: string;
@@ -104,6 +150,11 @@ export interface Post {
   is_active?: boolean;
   is_favorite?: boolean;
   cross_post_albums?: string[];
+  media_meta?: MediaMeta | null;
+  /** Notes only: the card preview, computed server-side from the body. */
+  excerpt?: string | null;
+  word_count?: number | null;
+  reading_minutes?: number | null;
 }
 
 export interface PostCreate {
@@ -125,6 +176,7 @@ export interface PostCreate {
   is_favorite?: boolean;
   post_type?: string;
   cross_post_albums?: string[];
+  media_meta?: MediaMeta | null;
 }
 
 export async function getPosts(params?: {
@@ -136,6 +188,8 @@ export async function getPosts(params?: {
   is_favorite?: boolean;
   tag?: string;
   sort_by?: string;
+  /** false: notes come without their body (content_url is ''); see getPost. */
+  include_body?: boolean;
 }): Promise<Post[]> {
   const queryParams = new URLSearchParams();
   if (params?.category) queryParams.append('category', params.category);
@@ -146,6 +200,7 @@ export async function getPosts(params?: {
   if (typeof params?.is_major === 'boolean') queryParams.append('is_major', params.is_major ? 'true' : 'false');
   if (typeof params?.is_favorite === 'boolean') queryParams.append('is_favorite', params.is_favorite ? 'true' : 'false');
   if (params?.sort_by) queryParams.append('sort_by', params.sort_by);
+  if (params?.include_body === false) queryParams.append('include_body', 'false');
 
   const response = await fetch(`${POSTS_ENDPOINT}?${queryParams.toString()}`);
   if (!response.ok) {
@@ -154,6 +209,51 @@ export async function getPosts(params?: {
   return response.json();
 }
 
+/**
+ * Tag -> post count, most used first. Served from a maintained aggregate, so it
+ * is cheap enough to call on every keystroke of the tag autocomplete.
+ */
+export async function getTagCounts(params?: {
+  category?: string;
+  prefix?: string;
+  limit?: number;
+}): Promise<Record<string, number>> {
+  const queryParams = new URLSearchParams();
+  if (params?.category) queryParams.append('category', params.category);
+  if (params?.prefix) queryParams.append('prefix', params.prefix);
+  if (params?.limit) queryParams.append('limit', params.limit.toString());
+
+  const response = await fetch(`${POSTS_ENDPOINT}tags?${queryParams.toString()}`);
+  if (!response.ok) {
+    throw new Error('Failed to fetch tags');
+  }
+  const data = await response.json();
+  return data.tags || {};
+}
+
+export interface HomePayload {
+  featured: Post | null;
+  latest_update: Post | null;
+  favorites: Post[];
+  categories: Record<string, Post[]>;
+}
+
+/**
+ * Everything the homepage/splash needs in one request: the featured major post,
+ * the latest update, favorites and the newest posts per category.
+ */
+export async function getHome(params?: { per_category?: number; favorites?: number }): Promise<HomePayload> {
+  const queryParams = new URLSearchParams();
+  if (typeof params?.per_category === 'number') queryParams.append('per_category', params.per_category.toString());
+  if (typeof params?.favorites === 'number') queryParams.append('favorites', params.favorites.toString());
+
+  const response = await fetch(`${API_URL}/api/home/?${queryParams.toString()}`);
+  if (!response.ok) {
+    throw new Error('Failed to fetch home');
+  }
+  return response.json();
+}
+
 export async function getPost(id: string): Promise<Post> {
   const response = await fetch(`${POSTS_ENDPOINT}${id}`);
   if (!response.ok) {
@@ -162,6 +262,18 @@ export async function getPost(id: string): Promise<Post> {
   return response.json();
 }
 
+/** "More like this": precomputed neighbours, best first. Empty on any error. */
+export async function getRelatedPosts(id: string, limit = 6): Promise<Post[]> {
+  try {
+    const response = await fetch(`${POSTS_ENDPOINT}${id}/related?limit=${limit}`);
+    if (!response.ok) return [];
+    return response.json();
+  } catch (err) {
+    console.error('[API] Error fetching related posts:', err);
+    return [];
+  }
+}
+
 export async function getPostBySlug(slug: string): Promise<Post> {
   const response = await fetch(`${POSTS_ENDPOINT}slug/${slug}`);
   if (!response.ok) {
@@ -234,6 +346,37 @@ export async function updatePost(id: string, post: Partial<PostCreate>, authToke
   return response.json();
 }
 
+/** A change set for bulkUpdatePosts: any updatePost field, plus tag edits. */
+export type PostBulkChanges = Partial<PostCreate> & { add_tags?: string[]; remove_tags?: string[] };
+
+/**
+ * Update many posts in one request and one transaction: either per-post
+ * `items`, or a `filter` (the getPosts filters, or `ids`) with one `changes`.
+ */
+export async function bulkUpdatePosts(
+  request:
+    | { items: { id: string; changes: PostBulkChanges }[] }
+    | {
+        filter: { ids?: string[]; category?: string; album?: string; tag?: string; is_major?: boolean; is_favorite?: boolean };
+        changes: PostBulkChanges;
+      },
+  authToken?: string,
+): Promise<Post[]> {
+  const response = await fetch(`${POSTS_ENDPOINT}bulk`, {
+    method: 'PATCH',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(authToken ? { Authorization: `Bearer ${authToken}` } : {}),
+    },
+    body: JSON.stringify(request),
+  });
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(apiErrorMessage(error, 'Failed to update posts'));
+  }
+  return response.json();
+}
+
 export async function deletePost(id: string, authToken?: string): Promise<void> {
   console.log('[API] deletePost called with id:', id);
   console.log('[API] Delete URL:', `${POSTS_ENDPOINT}${id}`);
@@ -292,9 +435,130 @@ export interface UploadResponse {
   filename: string;
   size: number;
   content_type: string;
+  /** Present for images, and for audio once its waveform is computed. */
+  media_meta?: MediaMeta | null;
+}
+
+type PresignResponse =
+  | { key: string; method: 'PUT'; url: string; headers: Record<string, string> }
+  | { key: string; method: 'MULTIPART'; upload_id: string; part_size: number; parts: { part_number: number; url: string }[] };
+
+interface UploadStatus {
+  status: 'processing' | 'ready' | 'failed';
+  url?: string;
+  size?: number;
+  content_type?: string;
+  media_meta?: MediaMeta | null;
+}
+
+// How long to wait for server-side image processing before giving up on it.
+const UPLOAD_PROCESSING_TIMEOUT_MS = 60_000;
+const UPLOAD_POLL_INTERVAL_MS = 750;
+const MULTIPART_CONCURRENCY = 4;
+
+async function uploadJson<T>(url: string, authToken: string, init: RequestInit = {}): Promise<T> {
+  const response = await fetch(url, {
+    ...init,
+    headers: {
+      'Content-Type': 'application/json',
+      Authorization: `Bearer ${authToken}`,
+    },
+  });
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}));
+    throw new Error(body?.detail || `HTTP ${response.status}: ${response.statusText}`);
+  }
+  return response.json();
+}
+
+async function putParts(file: File, presigned: Extract<PresignResponse, { method: 'MULTIPART' }>) {
+  const etags: { part_number: number; etag: string }[] = [];
+  const queue = [...presigned.parts];
+  const worker = async () => {
+    for (let part = queue.shift(); part; part = queue.shift()) {
+      const start = (part.part_number - 1) * presigned.part_size;
+      const response = await fetch(part.url, { method: 'PUT', body: file.slice(start, start + presigned.part_size) });
+      const etag = response.headers.get('ETag');
+      if (!response.ok || !etag) {
+        throw new Error(`Upload of part ${part.part_number} failed (HTTP ${response.status})`);
+      }
+      etags.push({ part_number: part.part_number, etag });
+    }
+  };
+  await Promise.all(Array.from({ length: MULTIPART_CONCURRENCY }, worker));
+  return etags;
+}
+
+/**
+ * Upload straight to S3 with a presigned URL; the API only signs and then
+ * post-processes. Images are optimized server-side after the upload, so this
+ * waits for that and returns the optimized URL and media_meta. If processing
+ * fails or takes too long, the original upload's URL is returned instead.
+ * Audio is analyzed the same way (duration, waveform peaks), but is usable
+ * without it, so a slow analysis just means no media_meta.
+ */
+export async function uploadDirect(file: File, folder: string | undefined, authToken: string): Promise<UploadResponse> {
+  const contentType = file.type || 'application/octet-stream';
+  const presigned = await uploadJson<PresignResponse>(UPLOAD_PRESIGN_ENDPOINT, authToken, {
+    method: 'POST',
+    body: JSON.stringify({ filename: file.name, content_type: contentType, size: file.size, folder }),
+  });
+
+  let parts: { part_number: number; etag: string }[] = [];
+  if (presigned.method === 'PUT') {
+    const response = await fetch(presigned.url, { method: 'PUT', headers: presigned.headers, body: file });
+    if (!response.ok) {
+      throw new Error(`Upload to storage failed (HTTP ${response.status})`);
+    }
+  } else {
+    parts = await putParts(file, presigned);
+  }
+
+  const completed = await uploadJson<UploadStatus & { key: string }>(UPLOAD_COMPLETE_ENDPOINT, authToken, {
+    method: 'POST',
+    body: JSON.stringify({
+      key: presigned.key,
+      upload_id: presigned.method === 'MULTIPART' ? presigned.upload_id : undefined,
+      parts,
+    }),
+  });
+
+  let status: UploadStatus = completed;
+  const deadline = Date.now() + UPLOAD_PROCESSING_TIMEOUT_MS;
+  while (status.status === 'processing' && Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, UPLOAD_POLL_INTERVAL_MS));
+    const statusUrl = new URL(UPLOAD_STATUS_ENDPOINT);
+    statusUrl.searchParams.set('key', presigned.key);
+    status = await uploadJson<UploadStatus>(statusUrl.toString(), authToken);
+  }
+  if (status.status === 'processing' && !status.url) {
+    throw new Error('Image processing is taking too long; please try again.');
+  }
+
+  const url = status.url || '';
+  return {
+    url,
+    filename: url.split('/').pop() || file.name,
+    size: status.size ?? file.size,
+    content_type: status.content_type || contentType,
+    media_meta: status.media_meta ?? null,
+  };
 }
 
 export async function uploadImage(file: File, folder?: string, authToken?: string): Promise<UploadResponse> {
+  if (authToken) {
+    try {
+      return await uploadDirect(file, folder, authToken);
+    } catch (err) {
+      // Most likely a bucket without CORS for direct uploads, or an API without
+      // the presign endpoint; the proxied upload still works in both cases.
+      console.warn('[API] Direct upload failed, falling back to upload through the API:', err);
+    }
+  }
+  return uploadViaApi(file, folder, authToken);
+}
+
+async function uploadViaApi(file: File, folder?: string, authToken?: string): Promise<UploadResponse> {
   console.log('[API] uploadImage called with:', { filename: file.name, size: file.size, type: file.type, folder });
   const uploadUrl = new URL(UPLOAD_IMAGE_ENDPOINT);
   if (folder) {
@@ -368,6 +632,15 @@ export interface Album {
   updated_at: string;
 }
 
+/** An album with what the album grid shows about its posts, from one query. */
+export interface AlbumWithStats extends Album {
+  /** Posts filed in the album, cross-posts included. */
+  post_count: number;
+  latest_post_date: string | null;
+  /** The album's cover image, else its newest post's thumbnail. */
+  cover_url: string | null;
+}
+
 export interface CreateAlbumRequest {
   category: string;
   name: string;
@@ -394,6 +667,19 @@ export async function getAlbumsByCategory(category: string): Promise<string[]> {
   }
 }
 
+export async function getAlbumsWithStats(category: string): Promise<AlbumWithStats[]> {
+  try {
+    const response = await fetch(`${ALBUMS_BY_CATEGORY_ENDPOINT}${encodeURIComponent(category)}?with_stats=true`);
+    if (!response.ok) {
+      throw new Error(`Failed to fetch albums: ${response.status} ${response.statusText}`);
+    }
+    return response.json();
+  } catch (err) {
+    console.error('[API] Error fetching albums with stats:', err);
+    return [];
+  }
+}
+
 export async function createAlbum(album: CreateAlbumRequest, authToken?: string): Promise<Album> {
   const response = await fetch(CREATE_ALBUM_ENDPOINT, {
     method: 'POST',
@@ -460,3 +746,41 @@ export async function embedNote(
   }
   return response.json();
 }
+
+// ---------------------------------------------------------------------------
+// Admin
+// ---------------------------------------------------------------------------
+
+/** Posts in one category, album or tag. */
+export interface StatsBucket {
+  key: string;
+  posts: number;
+  missing_thumbnails: number;
+}
+
+export interface AdminStats {
+  total_posts: number;
+  missing_thumbnails: number;
+  untagged: number;
+  major: number;
+  favorite: number;
+  /** Mirrored from w_notes vs authored here. */
+  from_notes: number;
+  authored: number;
+  categories: (StatsBucket & { albums: StatsBucket[] })[];
+  /** Most used first. */
+  tags: StatsBucket[];
+  generated_at: string;
+}
+
+/** Dashboard summary, computed server-side in one grouped query. */
+export async function getAdminStats(authToken?: string): Promise<AdminStats> {
+  const response = await fetch(`${API_URL}/api/admin/stats`, {
+    headers: { ...(authToken ? { Authorization: `Bearer ${authToken}` } : {}) },
+  });
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(apiErrorMessage(error, 'Could not load stats'));
+  }
+  return response.json();
+}
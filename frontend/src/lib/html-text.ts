@@ -2,8 +2,9 @@
  * Flatten a note's rich-text HTML body into plain text for feed-card excerpts.
  *
  * Ported deliberately from w_notes' own `src/lib/html-text.ts` so a note's
- * preview on the website reads the same as its preview in the app. Keep the two
- * in sync if the editor's tag subset changes.
+ * preview on the website reads the same as its preview in the app. The backend
+ * runs the same rules (`app/lib/html_text.py`) to store each note's excerpt at
+ * ingest. Keep all three in sync if the editor's tag subset changes.
  *
  * Runs on the server during SSR as well as in the browser, so it is pure string
  * work rather than DOM parsing.